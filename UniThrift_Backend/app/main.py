@@ -1,7 +1,6 @@
-from fastapi import APIRouter, Depends, FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import ORJSONResponse
@@ -9,6 +8,7 @@ from starlette.exceptions import HTTPException
 
 from app import __version__
 from app.server.config import config
+from app.server.database.monitoring import mongo_metrics
 from app.server.handler.error_handler import (
     CustomHTTPException,
     PermissionCustomHTTPException,
@@ -17,10 +17,12 @@ from app.server.handler.error_handler import (
     http_permission_exception_handler,
     validation_exception_handler,
 )
-from app.server.logger.custom_logger import logger
+from app.server.logger.custom_logger import log_pipeline, logger
+from app.server.middlewares.compression import CompressionMiddleware
+from app.server.middlewares.decompression import RequestDecompressionMiddleware
 from app.server.middlewares.exceptions import ExceptionHandlerMiddleware
-from app.server.middlewares.request_gzip import GzipRoute
-from app.server.middlewares.tracker import RequestsTrackerMiddleware
+from app.server.middlewares.loader import LoaderScopeMiddleware
+from app.server.middlewares.tracker import RequestsTrackerMiddleware, request_counters
 from app.server.routes.admin import router as ADMIN
 from app.server.routes.common import router as COMMON
 from app.server.routes.history import router as HISTORY
@@ -29,7 +31,7 @@ from app.server.routes.listing import router as LISTING
 from app.server.routes.queueing import router as QUEUEING
 from app.server.routes.student import router as STUDENT
 from app.server.utils import date_utils, mongo_utils
-from app.server.utils.token_util import authorize_docs
+from app.server.utils.token_util import authorize_docs, presence_updates
 
 app = FastAPI(
     docs_url=None,
@@ -41,10 +43,7 @@ app = FastAPI(
     default_response_class=ORJSONResponse,
 )
 
-GZIP_REQUEST_ROUTE = APIRouter(route_class=GzipRoute)
-
 # add routes
-app.include_router(GZIP_REQUEST_ROUTE)
 # app.include_router(AUTH_MANAGER, tags=['AUTH'], prefix='/api/v1')
 app.include_router(STUDENT, tags=['STUDENT'], prefix='/api/v1')
 app.include_router(ADMIN, tags=['ADMIN'], prefix='/api/v1')
@@ -60,10 +59,16 @@ app.add_exception_handler(HTTPException, http_exception_handler)
 app.add_exception_handler(CustomHTTPException, http_custom_exception_handler)
 app.add_exception_handler(PermissionCustomHTTPException, http_permission_exception_handler)
 
+# compression levels per route over the dynamic defaults, cheaper for the listing pages requested on every scroll and
+# higher for the admin reports which are rarely requested
+COMPRESSION_ROUTE_LEVELS = {'/api/v1/listing/get_listings': {'br': 2, 'zstd': 1, 'gzip': 4}, '/api/v1/admin': {'br': 6, 'zstd': 9, 'gzip': 9}}
+
 # add middlewares
+app.add_middleware(RequestDecompressionMiddleware)
+app.add_middleware(LoaderScopeMiddleware)
 app.add_middleware(ExceptionHandlerMiddleware)
 app.add_middleware(RequestsTrackerMiddleware)
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(CompressionMiddleware, route_levels=COMPRESSION_ROUTE_LEVELS)
 app.add_middleware(CORSMiddleware, allow_origins=['*'], allow_credentials=True, allow_methods=['*'], allow_headers=['*'])
 
 
@@ -89,16 +94,30 @@ async def openapi(_username: str = Depends(authorize_docs)):
     return get_openapi(title=app.title, version=app.version, tags=app.openapi_tags, routes=app.routes)
 
 
+@app.get('/internal/metrics', include_in_schema=False)
+async def internal_metrics(reset: bool = False, _username: str = Depends(authorize_docs)):
+    metrics = {'mongo': mongo_metrics.snapshot(), 'request_tracker': request_counters.stats(), 'presence': presence_updates.stats()}
+    if log_pipeline:
+        metrics['logging'] = log_pipeline.stats()
+    if reset:
+        mongo_metrics.reset()
+    return metrics
+
+
 @app.on_event('startup')
 async def startup_event():
     logger.debug(f'App startup: {str(date_utils.get_current_date_time())}')
-    await mongo_utils.create_indexes()
+    mongo_utils.create_indexes()
+    request_counters.start()
+    presence_updates.start()
     # await send_email(recipients=['gundakallirohit@@gmail.com'], subject='DEV_TEST', body='HELLO')
 
 
 @app.on_event('shutdown')
-def shutdown_event():
+async def shutdown_event():
     logger.debug(f'App shutdown: {str(date_utils.get_current_date_time())}')
+    await request_counters.stop()
+    await presence_updates.stop()
 
 
 @app.get('/', tags=['Root'], include_in_schema=False)
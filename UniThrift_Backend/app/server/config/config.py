@@ -8,12 +8,68 @@ APP_TITLE = 'UniThrift Backend'
 JWT_SECRET = os.environ.get('JWT_SECRET', os.urandom(32))
 LOG_FILE_NAME = os.environ.get('LOG_FILE_NAME', 'app')
 
+# Logging configuration, `direct` writes through loguru sinks and `batched` through a ring buffer and a writer thread.
+# The `batched` mode never blocks the caller: when more than LOG_BUFFER_SIZE records wait to be written the oldest
+# ones are dropped, counted per level in the `logging` metrics.
+LOG_MODE = os.environ.get('LOG_MODE', 'direct')
+LOG_BUFFER_SIZE = int(os.environ.get('LOG_BUFFER_SIZE', 10000))
+LOG_BATCH_SIZE = int(os.environ.get('LOG_BATCH_SIZE', 256))
+LOG_FLUSH_INTERVAL = float(os.environ.get('LOG_FLUSH_INTERVAL', 0.5))
+LOG_SAMPLE_RATES = os.environ.get('LOG_SAMPLE_RATES', '')  # e.g. DEBUG=0.1,INFO=0.5, ERROR and above are never sampled
+
+# Request logging configuration
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_LOG_SAMPLE_RATE', 0.1))  # failed and slow requests are always logged
+REQUEST_LOG_SLOW_MS = float(os.environ.get('REQUEST_LOG_SLOW_MS', 1000))  # negative to disable
+REQUEST_LOG_BODY_PREFIX_BYTES = int(os.environ.get('REQUEST_LOG_BODY_PREFIX_BYTES', 0))
+
 # Swagger Doc configuration
 DOC_USERNAME = os.environ.get('DOC_USERNAME', 'admin')
 DOC_PASSWORD = os.environ.get('DOC_PASSWORD', 'admin')
 
 # Mongo configuration
 MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/test-dev')
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ['MONGO_MAX_IDLE_TIME_MS']) if os.environ.get('MONGO_MAX_IDLE_TIME_MS') else None
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ['MONGO_WAIT_QUEUE_TIMEOUT_MS']) if os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS') else None
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 30000))
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')  # comma separated, e.g. zstd,snappy,zlib
+MONGO_METRICS_ENABLED = os.environ.get('MONGO_METRICS_ENABLED', 'true').lower() == 'true'
+MONGO_REBUILD_CHANGED_INDEXES = os.environ.get('MONGO_REBUILD_CHANGED_INDEXES', 'false').lower() == 'true'  # drop the indexes differing from static/indexes.py
+
+# Paging and slow query configuration
+PAGING_TOTAL_COUNT_TTL = int(os.environ.get('PAGING_TOTAL_COUNT_TTL', 60))
+PAGING_TOTAL_COUNT_CACHE_SIZE = int(os.environ.get('PAGING_TOTAL_COUNT_CACHE_SIZE', 1024))
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))  # negative to disable
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0.1))
+SLOW_QUERY_MAX_SHAPES = int(os.environ.get('SLOW_QUERY_MAX_SHAPES', 500))
+
+# Cache configuration
+ITEM_CATALOG_POLL_INTERVAL = float(os.environ.get('ITEM_CATALOG_POLL_INTERVAL', 5))
+AUTH_USER_CACHE_TTL = float(os.environ.get('AUTH_USER_CACHE_TTL', 60))
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', 10000))
+AUTH_USER_CACHE_POLL_INTERVAL = float(os.environ.get('AUTH_USER_CACHE_POLL_INTERVAL', 2))
+AUTH_USER_CACHE_CLOCK_SKEW_MS = int(os.environ.get('AUTH_USER_CACHE_CLOCK_SKEW_MS', 5000))
+JWT_VERIFY_CACHE_SIZE = int(os.environ.get('JWT_VERIFY_CACHE_SIZE', 10000))
+JWT_VERIFY_CACHE_TTL = float(os.environ.get('JWT_VERIFY_CACHE_TTL', 300))
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 1024))
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 60))
+UNIVERSITIES_CACHE_TTL = float(os.environ.get('UNIVERSITIES_CACHE_TTL', 300))
+
+# Write-behind configuration
+REQUEST_TRACKER_FLUSH_INTERVAL = float(os.environ.get('REQUEST_TRACKER_FLUSH_INTERVAL', 10))
+REQUEST_TRACKER_BUFFER_SIZE = int(os.environ.get('REQUEST_TRACKER_BUFFER_SIZE', 10000))
+PRESENCE_DEBOUNCE_WINDOW = float(os.environ.get('PRESENCE_DEBOUNCE_WINDOW', 60))
+PRESENCE_FLUSH_INTERVAL = float(os.environ.get('PRESENCE_FLUSH_INTERVAL', 5))
+PRESENCE_BUFFER_SIZE = int(os.environ.get('PRESENCE_BUFFER_SIZE', 10000))
+
+# Compression configuration
+REQUEST_MAX_DECOMPRESSED_SIZE = int(os.environ.get('REQUEST_MAX_DECOMPRESSED_SIZE', 20 * 1024 * 1024))
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get('COMPRESSION_MINIMUM_SIZE', 1000))
+
+# Password hashing configuration
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'scrypt')  # scrypt, pbkdf2-sha256 or argon2id when argon2-cffi is installed
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
 
 # AWS service configuration
 AWS_REGION = os.environ.get('AWS_REGION', 'ap-south-1')
@@ -21,6 +77,12 @@ AWS_ACCESS_ID = os.environ.get('AWS_ACCESS_ID', '')
 AWS_SECRET_KEY = os.environ.get('AWS_SECRET_KEY', '')
 AWS_STORAGE_BUCKET = os.environ.get('AWS_STORAGE_BUCKET', '')
 AWS_S3_PRESIGNED_EXPIRATION = int(os.environ.get('AWS_S3_PRESIGNED_EXPIRATION', 60))
+AWS_S3_ENDPOINT_URL = os.environ.get('AWS_S3_ENDPOINT_URL') or None  # e.g. a local S3 compatible server
+# also the number of storage threads, more threads per core mostly wait for the GIL and delay the event loop
+AWS_S3_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_S3_MAX_POOL_CONNECTIONS', min(10, 4 * (os.cpu_count() or 1))))
+AWS_S3_MAX_ATTEMPTS = int(os.environ.get('AWS_S3_MAX_ATTEMPTS', 5))
+AWS_S3_CONNECT_TIMEOUT = float(os.environ.get('AWS_S3_CONNECT_TIMEOUT', 5))
+AWS_S3_READ_TIMEOUT = float(os.environ.get('AWS_S3_READ_TIMEOUT', 30))
 EMAIL_SENDER = os.environ.get('EMAIL_SENDER', 'test@gmail.com')
 
 # Azure Service configuration
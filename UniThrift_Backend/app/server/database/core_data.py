@@ -1,55 +1,58 @@
-import copy
+import asyncio
+import hashlib
+import time
 from typing import Any, Optional, Union
 
+import orjson
 from bson.objectid import ObjectId
 from fastapi import HTTPException, status
-from fastapi.encoders import jsonable_encoder
 from motor.motor_asyncio import AsyncIOMotorClientSession
 from pymongo import UpdateOne
 from pymongo.errors import DuplicateKeyError
 
+from app.server.config import config
 from app.server.database.db import client, mongo
+from app.server.database.profiler import slow_query_log
+from app.server.encoder import json_encoder
 from app.server.models.core_data import CreateData
-from app.server.utils import date_utils
+from app.server.static.enums import TotalCount
+from app.server.utils import cursor_utils, date_utils, query_utils
+from app.server.utils.cache_utils import TTLCache
 
-# crud operations
+# total record counts of paginated queries, keyed by collection and filter hash
+_total_count_cache = TTLCache(maxsize=config.PAGING_TOTAL_COUNT_CACHE_SIZE, ttl=config.PAGING_TOTAL_COUNT_TTL)
 
+# stages which do not change the number of documents in a pipeline
+_COUNT_NEUTRAL_STAGES = {'$sort', '$project', '$addFields', '$set', '$unset'}
 
-def _prepare_update(update: dict[str, Any], timestamp: int) -> dict[str, Any]:
-    """
-    Prepare an update dictionary by adding a '$set' key if it doesn't exist,
-    and updating the 'updated_at' field with the provided timestamp.
+# crud operations
 
-    Args:
-        update (dict): The update dictionary.
-        timestamp (int): The timestamp to update the 'updated_at' field with.
 
-    Returns:
-        dict: The modified update dictionary.
+def _prepare_update(update: dict[str, Any], timestamp: int, upsert: bool = False) -> dict[str, Any]:
     """
-    update.setdefault('$set', {})
-    update['$set'].update({'updated_at': timestamp})
-    return update
+    Build the update document of a write, with `updated_at` in `$set` and, for upserts, the `_id`, `created_at` and
+    `is_deleted` defaults in `$setOnInsert`.
 
-
-def _prepare_upsert(update: dict[str, Any], timestamp: int) -> dict[str, Any]:
-    """
-    Generate a dictionary update for upsert operations.
+    The update of the caller is left untouched without copying it deeply: the top level dict and the two operators
+    that get the extra fields are new, the values of the other operators are shared.
 
     Args:
-        update (dict): The dictionary update.
-        timestamp (str): The timestamp string.
+        update (dict): The update dictionary.
+        timestamp (int): The timestamp to update the 'updated_at' field with.
+        upsert (bool): Whether the update is an upsert.
 
     Returns:
-        dict: The updated dictionary.
+        dict: The update dictionary to send.
     """
-    update.setdefault('$setOnInsert', {})
-    update['$setOnInsert'].update({'_id': str(ObjectId()), 'created_at': timestamp})
+    update_data = {**update, '$set': {**update.get('$set', {}), 'updated_at': timestamp}}
 
-    if 'is_deleted' not in update['$set']:
-        update['$setOnInsert'].update({'is_deleted': False})
+    if upsert:
+        set_on_insert = {**update.get('$setOnInsert', {}), '_id': str(ObjectId()), 'created_at': timestamp}
+        if 'is_deleted' not in update_data['$set']:
+            set_on_insert['is_deleted'] = False
+        update_data['$setOnInsert'] = set_on_insert
 
-    return update
+    return update_data
 
 
 async def get_session() -> AsyncIOMotorClientSession:
@@ -76,14 +79,15 @@ async def create_one(collection_name: str, data: dict[str, Any], options: dict[s
         HTTPException: If the document insertion fails.
 
     Returns:
-        dict[str, Any]: The inserted document.
+        dict[str, Any]: The inserted document, with the projection applied in process. Within a session the whole
+            document is returned as well, not only its `_id`.
     """
     # Get the collection
     collection = mongo.get_collection(collection_name)
 
     # Parse and encode the data
     data = CreateData.parse_obj(data)
-    data = jsonable_encoder(data)
+    data = json_encoder.serialize(data)
 
     # Try to insert the data into the collection
     model = None
@@ -96,13 +100,8 @@ async def create_one(collection_name: str, data: dict[str, Any], options: dict[s
     if not model.inserted_id:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f'{collection_name}: Failed to create')
 
-    # If a session was provided, return the inserted document ID
-    if session:
-        return {'_id': model.inserted_id}
-
-    # Fetch the inserted document from the collection
-    model = await collection.find_one({'_id': model.inserted_id}, options)
-    return model
+    # The encoded data is exactly what was stored, so return it without reading it back
+    return query_utils.apply_projection(data, options)
 
 
 async def create_many(collection_name: str, data: list[dict[str, Any]], session: AsyncIOMotorClientSession = None) -> dict[str, Any]:
@@ -127,7 +126,7 @@ async def create_many(collection_name: str, data: list[dict[str, Any]], session:
     data = [CreateData.parse_obj(indi_data) for indi_data in data]
 
     # Convert the data to JSON-serializable format
-    data = jsonable_encoder(data)
+    data = json_encoder.serialize(data)
 
     model = None
     try:
@@ -164,33 +163,55 @@ async def read_one(collection_name: str, data_filter: Union[dict[str, Any], str]
         options = None
 
     # Find the document that matches the filter and return it, or an empty dictionary if not found
+    started_at = time.perf_counter()
     model = await collection.find_one(data_filter, options)
+    slow_query_log.record(collection_name, 'read_one', started_at, data_filter=data_filter)
     return model or {}
 
 
 # pylint: disable=too-many-arguments
 async def read_many(
-    collection_name: str, data_filter: dict[str, Any], options: dict[str, Any] = None, sort: dict[str, Any] = None, page: Optional[int] = None, page_size: Optional[int] = None
-) -> list[dict[str, Any]]:
+    collection_name: str,
+    data_filter: dict[str, Any],
+    options: dict[str, Any] = None,
+    sort: dict[str, Any] = None,
+    page: Optional[int] = None,
+    page_size: Optional[int] = None,
+    cursor: Optional[str] = None,
+    paging_data: bool = False,
+) -> Union[list[dict[str, Any]], dict[str, Any]]:
     """
     Retrieve multiple documents from a database collection.
 
+    When a cursor is passed the page is located with a keyset filter on the sort keys (plus the `_id` tiebreaker)
+    instead of skipping documents, so deep pages cost the same as the first one. The sort keys must be part of the projection.
+
     Args:
         collection_name (str): Name of the collection.
         data_filter (dict): Dictionary of fields to apply a filter for.
         options (dict[str, Any]): A dictionary of fields with value 1 or 0. 1 - to select, 0 - de-select.
         sort (dict): Dictionary of fields to specify the sorting order.
-        page (int, optional): Page number for pagination. Defaults to None.
+        page (int, optional): Page number for pagination. Ignored when a cursor is passed. Defaults to None.
         page_size (int, optional): Number of documents per page for pagination. Defaults to None.
+        cursor (str, optional): Opaque cursor returned as `next_cursor` by the previous page. Defaults to None.
+        paging_data (bool, optional): Whether to include pagination metadata in the result. Defaults to False.
 
     Returns:
-        list[dict[str, Any]]: List of retrieved documents.
+        Union[list[dict[str, Any]], dict[str, Any]]: List of retrieved documents, or the documents and pagination metadata if paging_data is True.
     """
     collection = mongo.get_collection(collection_name)  # Get the collection object
 
     if not options:
         options = None
 
+    # Make the ordering total so that a cursor always points to a single position
+    if sort or cursor:
+        sort = cursor_utils.get_keyset_sort(sort)
+
+    # Resume after the document the cursor was created from
+    if cursor:
+        data_filter = cursor_utils.add_keyset_filter(data_filter, sort, cursor)
+
     # Retrieve the documents from the collection based on the filter and options
     models = collection.find(data_filter, options)
 
@@ -198,14 +219,26 @@ async def read_many(
         sort_query = list(sort.items())
         models.sort(sort_query)  # Sort the retrieved documents based on the specified order
 
-    if page and page > 0:
+    if page and page > 0 and not cursor:
         offset = page_size if page_size and page_size > 0 else 0
         models.skip((page - 1) * offset)  # Apply pagination by skipping documents
 
     if page_size and page_size > 0:
-        models.limit(page_size)  # Limit the number of documents per page
+        # Fetch one extra document to know whether a next page exists
+        models.limit(page_size + 1 if paging_data else page_size)  # Limit the number of documents per page
+
+    started_at = time.perf_counter()
+    result = await models.to_list(None)  # Return the list of retrieved documents
+    slow_query_log.record(collection_name, 'read_many', started_at, data_filter=data_filter, sort=sort)
+    if not paging_data:
+        return result
 
-    return await models.to_list(None)  # Return the list of retrieved documents
+    has_next_page = bool(page_size) and len(result) > page_size
+    data = result[:page_size] if has_next_page else result
+    metadata = {'page_size': page_size, 'has_next_page': has_next_page, 'next_cursor': cursor_utils.get_next_cursor(data, sort, has_next_page)}
+    if not cursor:
+        metadata['current_page'] = page or 1
+    return {'data': data, 'metadata': metadata}
 
 
 # pylint: disable=too-many-arguments
@@ -256,13 +289,8 @@ async def update_one(
     # Get the current timestamp
     timestamp = date_utils.get_current_timestamp()
 
-    # Prepare the update data
-    update_data = copy.deepcopy(update)
-    update_data = _prepare_update(update_data, timestamp)
-
-    # If upsert is True, prepare the data for upsert operation
-    if upsert:
-        update_data = _prepare_upsert(update_data, timestamp)
+    # Prepare the update data, with the upsert defaults if upsert is True
+    update_data = _prepare_update(update, timestamp, upsert)
 
     # If options is empty, set it to None
     if not options:
@@ -270,7 +298,9 @@ async def update_one(
 
     try:
         # Find one document and perform the update
+        started_at = time.perf_counter()
         model = await collection.find_one_and_update(data_filter, update_data, options, upsert=upsert, return_document=True, session=session)
+        slow_query_log.record(collection_name, 'update_one', started_at, data_filter=data_filter)
     except DuplicateKeyError as error:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f'{collection_name}: {error.details}') from error
 
@@ -281,6 +311,62 @@ async def update_one(
     return model
 
 
+async def update_one_lean(
+    collection_name: str,
+    record_id: str = None,
+    data_filter: dict[str, Any] = None,
+    update: dict[str, Any] = None,
+    upsert: bool = False,
+    session: AsyncIOMotorClientSession = None,
+    raise_error: bool = True,
+) -> dict[str, Any]:
+    """Update one document without returning it, for the callers which only need the write to be acknowledged.
+
+    Unlike `update_one` the server does not look up and send back the updated document.
+
+    Args:
+        collection_name (str): The name of the collection.
+        record_id (str): The ID of the document.
+        data_filter (dict[str, Any]): A dictionary of fields to apply a filter for.
+        update (dict[str, Any]): A dictionary of field data to be updated.
+        upsert (bool): Whether to perform an upsert operation.
+        session (AsyncIOMotorClientSession): The MongoDB session.
+        raise_error (bool): Whether to raise an exception if no document matched and none was inserted.
+
+    Raises:
+        HTTPException: Raised if the filter dict is not set.
+        HTTPException: Raised if the update dict is not set.
+        HTTPException: Raised if the update fails.
+
+    Returns:
+        dict[str, Any]: The matched and modified counts, and the `_id` of the inserted document on upsert.
+    """
+    collection = mongo.get_collection(collection_name)
+
+    if record_id:
+        data_filter = {'_id': record_id}
+
+    if not data_filter:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f'{collection_name}: filter params cannot be empty')
+
+    if not update:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f'{collection_name}: update params cannot be empty')
+
+    update_data = _prepare_update(update, date_utils.get_current_timestamp(), upsert)
+
+    try:
+        started_at = time.perf_counter()
+        result = await collection.update_one(data_filter, update_data, upsert=upsert, session=session)
+        slow_query_log.record(collection_name, 'update_one_lean', started_at, data_filter=data_filter)
+    except DuplicateKeyError as error:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f'{collection_name}: {error.details}') from error
+
+    if not result.matched_count and result.upserted_id is None and raise_error:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f'{collection_name}: Failed to update')
+
+    return {'matched_count': result.matched_count, 'modified_count': result.modified_count, 'upserted_id': result.upserted_id}
+
+
 async def update_many(collection_name: str, data_filter: dict[str, Any], update: dict[str, Any], upsert: bool = False, session: AsyncIOMotorClientSession = None) -> dict[str, Any]:
     """Update multiple documents in a collection.
 
@@ -302,12 +388,8 @@ async def update_many(collection_name: str, data_filter: dict[str, Any], update:
     collection = mongo.get_collection(collection_name)
     timestamp = date_utils.get_current_timestamp()
 
-    # Prepare update fields
-    update = _prepare_update(update, timestamp)
-
-    if upsert:
-        # Prepare upsert fields
-        update = _prepare_upsert(update, timestamp)
+    # Prepare update and upsert fields
+    update = _prepare_update(update, timestamp, upsert)
 
     try:
         model = await collection.update_many(data_filter, update, upsert=upsert, session=session)
@@ -399,20 +481,83 @@ async def count(collection_name: str, data_filter: dict[str, Any], session: Asyn
     """
     collection = mongo.get_collection(collection_name)
 
+    started_at = time.perf_counter()
     doc_count = await collection.count_documents(data_filter, session=session)
+    slow_query_log.record(collection_name, 'count', started_at, data_filter=data_filter)
     return {'count': doc_count}
 
 
-async def query_read(collection_name: str, aggregate: list[dict[str, Any]], page: Optional[int] = None, page_size: Optional[int] = None, paging_data: bool = False):
+async def _get_total_records(collection_name: str, count_stages: list[dict[str, Any]], total_count: TotalCount) -> Optional[int]:
+    """
+    Count the documents matched by a pipeline according to the requested total count mode.
+
+    Args:
+        collection_name (str): The name of the collection.
+        count_stages (list[dict[str, Any]]): The caller pipeline without sorting, pagination or cursor stages.
+        total_count (TotalCount): EXACT counts on every call, CACHED reuses a count for the same filter within the
+            configured TTL, ESTIMATED reads the collection metadata when the pipeline does not filter (and falls back
+            to CACHED otherwise), NONE skips the count.
+
+    Returns:
+        Optional[int]: The number of documents, None when the count is skipped.
+    """
+    if total_count == TotalCount.NONE:
+        return None
+
+    collection = mongo.get_collection(collection_name)
+    count_stages = [stage for stage in count_stages if '$sort' not in stage]
+
+    if total_count == TotalCount.ESTIMATED:
+        if all(next(iter(stage)) in _COUNT_NEUTRAL_STAGES for stage in count_stages):
+            return await collection.estimated_document_count()
+        total_count = TotalCount.CACHED
+
+    cache_key = None
+    if total_count == TotalCount.CACHED:
+        cache_key = (collection_name, hashlib.sha1(orjson.dumps(count_stages, option=orjson.OPT_SORT_KEYS, default=str)).hexdigest())
+        total_records = _total_count_cache.get(cache_key)
+        if total_records is not None:
+            return total_records
+
+    result = await collection.aggregate(count_stages + [{'$count': 'total'}]).to_list(None)
+    total_records = result[0]['total'] if result else 0
+
+    if cache_key:
+        _total_count_cache.set(cache_key, total_records)
+    return total_records
+
+
+async def query_read(  # pylint: disable=too-many-arguments
+    collection_name: str,
+    aggregate: list[dict[str, Any]],
+    page: Optional[int] = None,
+    page_size: Optional[int] = None,
+    paging_data: bool = False,
+    sort: Optional[dict[str, Any]] = None,
+    cursor: Optional[str] = None,
+    total_count: TotalCount = TotalCount.EXACT,
+    page_aggregate: Optional[list[dict[str, Any]]] = None,
+):
     """
     Read documents from a collection with optional pagination.
 
+    When a cursor is passed the page is located with a keyset `$match` on the sort keys (plus the `_id` tiebreaker)
+    instead of a `$skip`, and the total count is not computed. The sort keys must be present in the pipeline output.
+
+    The page itself is fetched with `page_size + 1` documents to detect a next page, the total count runs as a
+    separate query next to it so that it can be cached, estimated or skipped without touching the page fetch.
+
     Args:
         collection_name (str): The name of the collection.
         aggregate (list[dict[str, Any]]): The aggregation pipeline to apply.
-        page (int, optional): The page number for pagination. Defaults to None.
+        page (int, optional): The page number for pagination. Ignored when a cursor is passed. Defaults to None.
         page_size (int, optional): The number of documents per page for pagination. Defaults to None.
         paging_data (bool, optional): Whether to include pagination metadata in the result. Defaults to False.
+        sort (dict[str, Any], optional): Sorting order appended to the pipeline. Defaults to None.
+        cursor (str, optional): Opaque cursor returned as `next_cursor` by the previous page. Defaults to None.
+        total_count (TotalCount, optional): How `total_records` is computed for offset pages. Defaults to EXACT.
+        page_aggregate (list[dict[str, Any]], optional): Stages applied to the documents of the page only, after
+            `$skip`/`$limit`, such as `$lookup` joins. They must keep one output document per input document. Defaults to None.
 
     Returns:
         dict: The result of the query, including the documents and optional pagination metadata.
@@ -433,30 +578,52 @@ async def query_read(collection_name: str, aggregate: list[dict[str, Any]], page
     if not aggregate:
         aggregate = []
 
-    # If paging_data is True, add pagination metadata
-    if paging_data:
-        aggregate += [
-            {'$facet': {'data': [{'$skip': skip}, {'$limit': page_size + 1}], 'total_count': [{'$count': 'total'}]}},
-            {
-                '$addFields': {
-                    'metadata': {
-                        'current_page': page,
-                        'page_size': page_size,
-                        'total_records': {'$ifNull': [{'$arrayElemAt': ['$total_count.total', 0]}, 0]},
-                        'has_next_page': {'$gt': [{'$size': '$data'}, page_size]},
-                    }
-                }
-            },
-            {'$project': {'data': {'$slice': ['$data', page_size]}, 'metadata': 1}},
-        ]
-
-        # Execute the aggregation pipeline and return the result
+    # The caller pipeline is what the total count is computed on
+    count_stages = list(aggregate)
+
+    # Make the ordering total so that a cursor always points to a single position
+    if sort or cursor:
+        sort = cursor_utils.get_keyset_sort(sort)
+
+    # Resume after the document the cursor was created from
+    if cursor:
+        aggregate += [{'$match': cursor_utils.add_keyset_filter(None, sort, cursor)}]
+        skip = 0
+
+    if sort:
+        aggregate += [{'$sort': sort}]
+
+    # In cursor mode the next page is detected by fetching one extra document
+    if paging_data and cursor:
+        aggregate += [{'$limit': page_size + 1}] + (page_aggregate or [])
+        started_at = time.perf_counter()
         result = await collection.aggregate(aggregate).to_list(None)
-        return result[0]
+        slow_query_log.record(collection_name, 'query_read', started_at, sort=sort, pipeline=aggregate)
+        has_next_page = len(result) > page_size
+        data = result[:page_size]
+        return {'data': data, 'metadata': {'page_size': page_size, 'has_next_page': has_next_page, 'next_cursor': cursor_utils.get_next_cursor(data, sort, has_next_page)}}
+
+    # If paging_data is True, fetch one extra document for has_next_page and count the total separately
+    if paging_data:
+        aggregate += [{'$skip': skip}, {'$limit': page_size + 1}] + (page_aggregate or [])
+        started_at = time.perf_counter()
+        result, total_records = await asyncio.gather(collection.aggregate(aggregate).to_list(None), _get_total_records(collection_name, count_stages, total_count))
+        slow_query_log.record(collection_name, 'query_read', started_at, sort=sort, pipeline=aggregate)
+        has_next_page = len(result) > page_size
+        data = result[:page_size]
+
+        metadata = {'current_page': page, 'page_size': page_size, 'has_next_page': has_next_page}
+        if total_records is not None:
+            metadata['total_records'] = total_records
+        metadata['next_cursor'] = cursor_utils.get_next_cursor(data, sort, has_next_page)
+        return {'data': data, 'metadata': metadata}
 
     # If paging_data is False, perform simple aggregation and return the result
-    aggregate += [{'$skip': skip}, {'$limit': page_size}]
-    return await collection.aggregate(aggregate).to_list(None)
+    aggregate += [{'$skip': skip}, {'$limit': page_size}] + (page_aggregate or [])
+    started_at = time.perf_counter()
+    result = await collection.aggregate(aggregate).to_list(None)
+    slow_query_log.record(collection_name, 'query_read', started_at, sort=sort, pipeline=aggregate)
+    return result
 
 
 async def query_read_all(collection_name: str, aggregate: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -522,22 +689,19 @@ def update_query(record_id: str = None, data_filter: dict[str, Any] = None, upda
     if not update:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail='update params cannot be empty')
 
-    update_data = copy.deepcopy(update)
-    update_data = _prepare_update(update_data, timestamp)
-
-    if upsert:
-        update_data = _prepare_upsert(update_data, timestamp)
+    update_data = _prepare_update(update, timestamp, upsert)
 
     return UpdateOne(filter=data_filter, update=update_data, upsert=upsert)
 
 
-async def bulk_write(collection_name: str, operations: list[Any]) -> list[dict[str, Any]]:
+async def bulk_write(collection_name: str, operations: list[Any], ordered: bool = True) -> list[dict[str, Any]]:
     """
     Async function to perform bulk write operations on a collection.
 
     Args:
         collection_name (str): The name of the collection to perform the operations on.
         operations (list[Any]): List of operations to perform.
+        ordered (bool, optional): Whether to stop at the first failed operation. Defaults to True.
 
     Returns:
         list[dict[str, Any]]: List of results from the bulk write operations.
@@ -547,4 +711,4 @@ async def bulk_write(collection_name: str, operations: list[Any]) -> list[dict[s
     collection = mongo.get_collection(collection_name)
 
     # Perform the bulk write operations on the collection
-    return await collection.bulk_write(operations)
+    return await collection.bulk_write(operations, ordered=ordered)
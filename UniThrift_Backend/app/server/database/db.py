@@ -1,7 +1,23 @@
 import motor.motor_asyncio
 
 from app.server.config import config
+from app.server.database.monitoring import mongo_metrics
 
-client = motor.motor_asyncio.AsyncIOMotorClient(config.MONGO_URI)
+
+def get_client_options() -> dict:
+    """Connection pool options of the client, unset options keep the driver defaults"""
+    options = {
+        'maxPoolSize': config.MONGO_MAX_POOL_SIZE,
+        'minPoolSize': config.MONGO_MIN_POOL_SIZE,
+        'maxIdleTimeMS': config.MONGO_MAX_IDLE_TIME_MS,
+        'waitQueueTimeoutMS': config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        'serverSelectionTimeoutMS': config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        'compressors': config.MONGO_COMPRESSORS or None,
+        'event_listeners': [mongo_metrics] if config.MONGO_METRICS_ENABLED else None,
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
+client = motor.motor_asyncio.AsyncIOMotorClient(config.MONGO_URI, **get_client_options())
 
 mongo = client.get_database()
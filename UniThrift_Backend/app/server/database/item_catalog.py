@@ -0,0 +1,140 @@
+import asyncio
+import bisect
+import time
+from typing import Any, NamedTuple, Optional
+
+import app.server.database.core_data as core_service
+from app.server.config import config
+from app.server.logger.custom_logger import logger
+from app.server.static.collections import Collections
+
+
+class CatalogSnapshot(NamedTuple):
+    """Immutable view of the active items, replaced as a whole on refresh"""
+
+    version: int
+    items: list[dict[str, Any]]
+    items_by_id: dict[str, dict[str, Any]]
+    # lower cased item names sorted for prefix search, aligned with items
+    names: list[str]
+
+
+class ItemCatalog:
+    """Process local, versioned snapshot of the item catalog.
+
+    Reads are served from memory. Writes bump a version document in the `catalog_versions` collection, which the
+    other workers poll in the background at most every `ITEM_CATALOG_POLL_INTERVAL` seconds to pick up the change.
+    """
+
+    def __init__(self, poll_interval: float = config.ITEM_CATALOG_POLL_INTERVAL) -> None:
+        """
+        Args:
+            poll_interval (float): Minimum number of seconds between two checks of the version document.
+        """
+        self.poll_interval = poll_interval
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._stale = True
+        self._checked_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._poll_task: Optional[asyncio.Task] = None
+
+    async def get_snapshot(self) -> CatalogSnapshot:
+        """
+        Get the current snapshot, loading it only if it was never loaded or was invalidated by this worker.
+
+        Returns:
+            CatalogSnapshot: The current snapshot.
+        """
+        if self._stale:
+            async with self._refresh_lock:
+                if self._stale:
+                    await self.refresh()
+        elif time.monotonic() - self._checked_at >= self.poll_interval and (self._poll_task is None or self._poll_task.done()):
+            self._checked_at = time.monotonic()
+            self._poll_task = asyncio.create_task(self._poll())
+        return self._snapshot
+
+    async def refresh(self) -> None:
+        """Load the active items and the version they belong to"""
+        version = await _read_version()
+        items = await core_service.query_read_all(Collections.ITEMS, [{'$match': {'is_deleted': False}}])
+        items.sort(key=lambda item: item['item_name'].lower())
+
+        self._snapshot = CatalogSnapshot(version=version, items=items, items_by_id={item['_id']: item for item in items}, names=[item['item_name'].lower() for item in items])
+        self._stale = False
+        self._checked_at = time.monotonic()
+
+    async def invalidate(self) -> None:
+        """Publish a new catalog version after a write, this worker reloads on its next read and the others on their next poll"""
+        await core_service.update_one_lean(Collections.CATALOG_VERSIONS, data_filter={'collection': Collections.ITEMS}, update={'$inc': {'version': 1}}, upsert=True)
+        self._stale = True
+
+    async def _poll(self) -> None:
+        # nothing awaits the poll task, a failure is logged and the current snapshot is served until the next poll
+        try:
+            if await _read_version() != self._snapshot.version:
+                async with self._refresh_lock:
+                    await self.refresh()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Failed to poll the item catalog version')
+
+
+async def _read_version() -> int:
+    version = await core_service.read_one(Collections.CATALOG_VERSIONS, data_filter={'collection': Collections.ITEMS}, options={'version': 1})
+    return version.get('version', 0)
+
+
+catalog = ItemCatalog()
+
+
+async def get_item(item_id: str) -> Optional[dict[str, Any]]:
+    """
+    Get an active item of the catalog by id.
+
+    Args:
+        item_id (str): The id of the item.
+
+    Returns:
+        Optional[dict[str, Any]]: The item, or None if it does not exist or is deleted.
+    """
+    snapshot = await catalog.get_snapshot()
+    return snapshot.items_by_id.get(item_id)
+
+
+async def get_version() -> int:
+    """Version of the current snapshot, which changes whenever an item is added, updated or deleted"""
+    snapshot = await catalog.get_snapshot()
+    return snapshot.version
+
+
+async def search_items(search_query: Optional[str], page: int, page_size: int) -> dict[str, Any]:
+    """
+    Get a page of the active items sorted by name, optionally only those whose name starts with the search query.
+
+    Args:
+        search_query (Optional[str]): Case insensitive prefix of the item name.
+        page (int): The page number to retrieve.
+        page_size (int): The number of items to retrieve per page, limited to 100.
+
+    Returns:
+        dict[str, Any]: The items of the page and the pagination metadata, shaped like a paginated `query_read`.
+    """
+    snapshot = await catalog.get_snapshot()
+    page_size = min(page_size, 100) if page_size else 10
+    page = page or 1
+
+    start, end = 0, len(snapshot.names)
+    if search_query:
+        prefix = search_query.strip().lower()
+        start = bisect.bisect_left(snapshot.names, prefix)
+        end = bisect.bisect_right(snapshot.names, prefix + '\U0010ffff', lo=start)
+
+    offset = start + (page - 1) * page_size
+    data = [dict(item) for item in snapshot.items[offset : min(offset + page_size, end)]]
+    metadata = {'current_page': page, 'page_size': page_size, 'has_next_page': offset + page_size < end, 'total_records': end - start, 'next_cursor': None}
+    return {'data': data, 'metadata': metadata}
+
+
+async def invalidate() -> None:
+    """Publish a new catalog version after an item was added, updated or deleted"""
+    await catalog.invalidate()
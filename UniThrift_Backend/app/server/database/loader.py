@@ -0,0 +1,169 @@
+import asyncio
+import contextlib
+import copy
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Optional
+
+from app.server.database.db import mongo
+
+# loaders of the current request keyed by collection name, None outside of a request scope
+_request_loaders: ContextVar[Optional[dict[str, 'BatchLoader']]] = ContextVar('request_loaders', default=None)
+
+
+class BatchLoader:
+    """Coalesces the `_id` lookups of a collection issued within the same event loop tick into one `$in` query.
+
+    Loaded documents are cached for the lifetime of the loader, a document that is updated afterwards has to be
+    cleared with `clear` to be read again. Every load returns its own copy of the cached document, so a caller
+    can modify it without changing what later loads return.
+    """
+
+    def __init__(self, collection_name: str) -> None:
+        """
+        Args:
+            collection_name (str): The name of the collection to load documents from.
+        """
+        self.collection_name = collection_name
+        self._cache: dict[Any, asyncio.Future] = {}
+        self._queue: list[Any] = []
+        self._dispatch_task: Optional[asyncio.Task] = None
+
+    async def load(self, record_id: Any) -> dict[str, Any]:
+        """
+        Load a document by its `_id`.
+
+        Args:
+            record_id (Any): The `_id` of the document.
+
+        Returns:
+            dict[str, Any]: A copy of the document, or an empty dictionary if it does not exist.
+        """
+        return copy.deepcopy(await self._schedule(record_id))
+
+    def _schedule(self, record_id: Any) -> asyncio.Future:
+        if future := self._cache.get(record_id):
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[record_id] = future
+        self._queue.append(record_id)
+
+        # the first lookup of a tick schedules the dispatch for the next tick, later lookups join its batch
+        if len(self._queue) == 1:
+            self._dispatch_task = loop.create_task(self._dispatch())
+        return future
+
+    async def load_many(self, record_ids: list[Any]) -> list[dict[str, Any]]:
+        """
+        Load documents by their `_id`, in the order of the ids.
+
+        Args:
+            record_ids (list[Any]): The `_id` values of the documents.
+
+        Returns:
+            list[dict[str, Any]]: Copies of the documents, an empty dictionary for ids that do not exist.
+        """
+        return list(await asyncio.gather(*(self.load(record_id) for record_id in record_ids)))
+
+    def clear(self, record_id: Any = None) -> None:
+        """
+        Drop a cached document, or every cached document when no id is passed.
+
+        Args:
+            record_id (Any, optional): The `_id` of the document to drop. Defaults to None.
+        """
+        if record_id is None:
+            self._cache = {key: future for key, future in self._cache.items() if not future.done()}
+        elif (future := self._cache.get(record_id)) and future.done():
+            del self._cache[record_id]
+
+    async def _dispatch(self) -> None:
+        record_ids, self._queue = self._queue, []
+        try:
+            documents = await mongo.get_collection(self.collection_name).find({'_id': {'$in': record_ids}}).to_list(None)
+        except Exception as error:  # pylint: disable=broad-except
+            # failed lookups are not cached so that a later load retries them
+            for record_id in record_ids:
+                future = self._cache.pop(record_id)
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        documents_by_id = {document['_id']: document for document in documents}
+        # missing documents resolve to an empty dict like core_data.read_one
+        for record_id in record_ids:
+            future = self._cache[record_id]
+            if not future.done():
+                future.set_result(documents_by_id.get(record_id, {}))
+
+
+def get_loader(collection_name: str) -> BatchLoader:
+    """
+    Get the loader of a collection for the current request.
+
+    Outside of a request scope a new loader is returned on every call, so lookups are still batched within the
+    caller but nothing is cached beyond it.
+
+    Args:
+        collection_name (str): The name of the collection.
+
+    Returns:
+        BatchLoader: The loader of the collection.
+    """
+    loaders = _request_loaders.get()
+    if loaders is None:
+        return BatchLoader(collection_name)
+    if collection_name not in loaders:
+        loaders[collection_name] = BatchLoader(collection_name)
+    return loaders[collection_name]
+
+
+async def load_one(collection_name: str, record_id: Any) -> dict[str, Any]:
+    """
+    Read a document by its `_id` through the loader of the current request.
+
+    Args:
+        collection_name (str): The name of the collection.
+        record_id (Any): The `_id` of the document.
+
+    Returns:
+        dict[str, Any]: A copy of the document, or an empty dictionary if it does not exist, like `core_data.read_one`.
+    """
+    return await get_loader(collection_name).load(record_id)
+
+
+async def load_many(collection_name: str, record_ids: list[Any]) -> list[dict[str, Any]]:
+    """
+    Read documents by their `_id` through the loader of the current request, in the order of the ids.
+
+    Args:
+        collection_name (str): The name of the collection.
+        record_ids (list[Any]): The `_id` values of the documents.
+
+    Returns:
+        list[dict[str, Any]]: Copies of the documents, an empty dictionary for ids that do not exist.
+    """
+    return await get_loader(collection_name).load_many(record_ids)
+
+
+def clear(collection_name: str, record_id: Any = None) -> None:
+    """
+    Drop a cached document of the current request after it was modified.
+
+    Args:
+        collection_name (str): The name of the collection.
+        record_id (Any, optional): The `_id` of the document, every document of the collection when None. Defaults to None.
+    """
+    if (loaders := _request_loaders.get()) and collection_name in loaders:
+        loaders[collection_name].clear(record_id)
+
+
+@contextlib.asynccontextmanager
+async def request_scope() -> AsyncIterator[None]:
+    """Scope in which loaders and their cached documents are shared, entered once per request"""
+    token = _request_loaders.set({})
+    try:
+        yield
+    finally:
+        _request_loaders.reset(token)
@@ -0,0 +1,140 @@
+import threading
+from collections import defaultdict
+from typing import Any
+
+from pymongo import monitoring
+
+
+class LatencyStats:
+    """Count, error count, total and max of a latency series in milliseconds"""
+
+    __slots__ = ('count', 'errors', 'total_ms', 'max_ms')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, duration_ms: float, error: bool = False) -> None:
+        self.count += 1
+        self.errors += error
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'total_ms': round(self.total_ms, 3),
+        }
+
+
+class MongoMetrics(monitoring.ConnectionPoolListener, monitoring.CommandListener):
+    """Pool and command listener recording checkout wait, in use connections and command latency by collection and operation.
+
+    The driver publishes events from its worker threads, so every update happens under a lock.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[Any, int], str] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear every recorded value except the connections currently in use"""
+        with self._lock:
+            self.in_use = getattr(self, 'in_use', 0)
+            self.max_in_use = self.in_use
+            self.connections_created = 0
+            self.connections_closed = 0
+            # not named after the `pool_cleared` listener method, which the instance attribute would shadow
+            self.pool_clears = 0
+            self.checkout_wait = LatencyStats()
+            self.commands: dict[tuple[str, str], LatencyStats] = defaultdict(LatencyStats)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Get the recorded metrics.
+
+        Returns:
+            dict[str, Any]: Pool gauges and counters, checkout wait and per `collection.operation` command latency.
+        """
+        with self._lock:
+            return {
+                'pool': {
+                    'in_use': self.in_use,
+                    'max_in_use': self.max_in_use,
+                    'connections_created': self.connections_created,
+                    'connections_closed': self.connections_closed,
+                    'pool_clears': self.pool_clears,
+                    'checkout_wait': self.checkout_wait.to_dict(),
+                },
+                'commands': {f'{collection}.{operation}': stats.to_dict() for (collection, operation), stats in sorted(self.commands.items())},
+            }
+
+    # connection pool events
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        with self._lock:
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.checkout_wait.add(event.duration * 1000)
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        with self._lock:
+            self.checkout_wait.add(event.duration * 1000, error=True)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self.connections_closed += 1
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self._lock:
+            self.pool_clears += 1
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        pass
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    # command events
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        collection = event.command.get('collection') if event.command_name == 'getMore' else event.command.get(event.command_name)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = collection if isinstance(collection, str) else '-'
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._record(event, error=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._record(event, error=True)
+
+    def _record(self, event: Any, error: bool) -> None:
+        with self._lock:
+            collection = self._pending.pop((event.connection_id, event.request_id), '-')
+            self.commands[(collection, event.command_name)].add(event.duration_micros / 1000, error=error)
+
+
+mongo_metrics = MongoMetrics()
@@ -0,0 +1,258 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Optional
+
+import orjson
+from pymongo.errors import PyMongoError
+
+from app.server.config import config
+from app.server.database.db import mongo
+from app.server.logger.custom_logger import logger
+from app.server.static.indexes import INDEXES
+
+# operators whose operand is a list of sub filters
+_LOGICAL_OPERATORS = {'$and', '$or', '$nor'}
+# operators a compound index serves as an equality match
+_EQUALITY_OPERATORS = {'$eq', '$in'}
+
+
+def get_shape(value: Any) -> Any:
+    """
+    Strip the values of a filter, keeping its field names and operators.
+
+    Args:
+        value (Any): A filter, or any value inside of it.
+
+    Returns:
+        Any: The filter with every value replaced by `1`, e.g. `{'buyer_id': 1, 'status': {'$in': 1}}`.
+    """
+    if isinstance(value, dict):
+        return {key: [get_shape(item) for item in item_value] if key in _LOGICAL_OPERATORS and isinstance(item_value, list) else get_shape(item_value) for key, item_value in value.items()}
+    return 1
+
+
+def get_pipeline_filter(pipeline: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combined filter of the leading `$match` stages of a pipeline, the part the query planner can use an index for"""
+    matches = []
+    for stage in pipeline:
+        if '$match' not in stage:
+            break
+        matches.append(stage['$match'])
+    if len(matches) > 1:
+        return {'$and': matches}
+    return matches[0] if matches else {}
+
+
+def suggest_index(data_filter: dict[str, Any], sort: Optional[dict[str, int]] = None) -> list[tuple[str, int]]:
+    """
+    Propose the compound index serving a filter shape following the equality, sort, range rule.
+
+    Fields under `$or`/`$nor` are left out since every branch needs its own index.
+
+    Args:
+        data_filter (dict[str, Any]): The filter or its shape.
+        sort (Optional[dict[str, int]]): The sort specification of the query.
+
+    Returns:
+        list[tuple[str, int]]: The index keys, empty when the query is served by `_id` or has nothing to index.
+    """
+    equality, ranges = [], []
+
+    def collect(current: dict[str, Any]) -> None:
+        for key, value in current.items():
+            if key == '$and':
+                for item in value:
+                    collect(item)
+            elif key.startswith('$'):
+                continue
+            elif isinstance(value, dict) and any(operator.startswith('$') for operator in value):
+                (equality if set(value) <= _EQUALITY_OPERATORS else ranges).append(key)
+            else:
+                equality.append(key)
+
+    collect(data_filter or {})
+    if '_id' in equality:
+        return []
+
+    keys: list[tuple[str, int]] = []
+    for field, direction in [(field, 1) for field in equality] + list((sort or {}).items()) + [(field, 1) for field in ranges]:
+        if field != '_id' and field not in dict(keys):
+            keys.append((field, direction))
+    return keys
+
+
+def get_registered_index(collection_name: str, keys: list[tuple[str, int]]) -> Optional[str]:
+    """Name of the registered index whose leading keys match the suggested keys regardless of order of the equality fields"""
+    for index in INDEXES.get(collection_name, []):
+        index_keys = list(index.document['key'].items())
+        if len(index_keys) >= len(keys) and set(index_keys[: len(keys)]) == set(keys):
+            return index.document['name']
+    return None
+
+
+def summarize_plan(explain: dict[str, Any]) -> tuple[str, bool]:
+    """
+    Summarize the winning plan of an explain output as its stages from the leaf up, e.g. `IXSCAN {buyer_id: 1} > FETCH`.
+
+    Args:
+        explain (dict[str, Any]): The output of the explain command of a find or an aggregate.
+
+    Returns:
+        tuple[str, bool]: The plan summary and whether it scans the whole collection.
+    """
+    stages: list[str] = []
+
+    def walk_plan(plan: dict[str, Any]) -> None:
+        for child in plan.get('inputStages', []) + [plan[key] for key in ('inputStage', 'queryPlan') if key in plan]:
+            walk_plan(child)
+        if stage := plan.get('stage'):
+            stages.append(f"{stage} {orjson.dumps(plan['keyPattern']).decode()}" if 'keyPattern' in plan else stage)
+
+    def find_winning_plan(value: Any) -> None:
+        if isinstance(value, dict):
+            if 'winningPlan' in value:
+                walk_plan(value['winningPlan'])
+                return
+            for item in value.values():
+                find_winning_plan(item)
+        elif isinstance(value, list):
+            for item in value:
+                find_winning_plan(item)
+
+    find_winning_plan(explain)
+    return ' > '.join(stages), 'COLLSCAN' in stages
+
+
+class SlowQueryLog:
+    """Records core_data calls slower than `SLOW_QUERY_THRESHOLD_MS`, grouped by collection, operation and filter shape.
+
+    The first slow call of a shape, and then a sample of `SLOW_QUERY_EXPLAIN_SAMPLE_RATE` of them, is explained in the
+    background to keep the plan summary up to date.
+    """
+
+    def __init__(self, threshold_ms: float = config.SLOW_QUERY_THRESHOLD_MS, sample_rate: float = config.SLOW_QUERY_EXPLAIN_SAMPLE_RATE, max_shapes: int = config.SLOW_QUERY_MAX_SHAPES) -> None:
+        """
+        Args:
+            threshold_ms (float): Calls taking longer are recorded, a negative value disables the log.
+            sample_rate (float): Share of the recorded calls which are explained.
+            max_shapes (int): Maximum number of distinct shapes kept, new shapes are dropped once reached.
+        """
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._records: dict[tuple[str, str, str], dict[str, Any]] = {}
+        self._explain_tasks: set[asyncio.Task] = set()
+        # shapes with an explain in flight, so that a burst of slow calls explains a shape only once
+        self._explaining: set[tuple[str, str, str]] = set()
+
+    def record(self, collection_name: str, operation: str, started_at: float, data_filter: Any = None, sort: Optional[dict[str, int]] = None, pipeline: Optional[list[dict[str, Any]]] = None) -> None:
+        """
+        Record a call if it took longer than the threshold.
+
+        Args:
+            collection_name (str): The name of the collection.
+            operation (str): The core_data function, e.g. `read_many`.
+            started_at (float): `time.perf_counter()` taken before the call.
+            data_filter (Any, optional): The filter of the call. Defaults to None.
+            sort (Optional[dict[str, int]], optional): The sort of the call. Defaults to None.
+            pipeline (Optional[list[dict[str, Any]]], optional): The aggregation pipeline of the call. Defaults to None.
+        """
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        if self.threshold_ms < 0 or elapsed_ms < self.threshold_ms:
+            return
+
+        if pipeline is not None:
+            data_filter = get_pipeline_filter(pipeline)
+        if not isinstance(data_filter, dict):
+            data_filter = {'_id': data_filter}
+        shape = get_shape(data_filter)
+        key = (collection_name, operation, orjson.dumps({'filter': shape, 'sort': sort}, option=orjson.OPT_SORT_KEYS).decode())
+
+        with self._lock:
+            entry = self._records.get(key)
+            if entry is None:
+                if len(self._records) >= self.max_shapes:
+                    return
+                entry = self._records[key] = {
+                    'collection': collection_name,
+                    'operation': operation,
+                    'shape': shape,
+                    'sort': sort,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'plan': None,
+                    'collscan': None,
+                }
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            explain = key not in self._explaining and (entry['plan'] is None or random.random() < self.sample_rate)
+            if explain:
+                self._explaining.add(key)
+
+        logger.warning(f'Slow query {collection_name}.{operation} took {elapsed_ms:.1f} ms, shape: {key[2]}')
+        if explain:
+            task = asyncio.create_task(self._explain(key, collection_name, data_filter, sort, pipeline))
+            self._explain_tasks.add(task)
+            task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain(self, key: tuple[str, str, str], collection_name: str, data_filter: dict[str, Any], sort: Optional[dict[str, int]], pipeline: Optional[list[dict[str, Any]]]) -> None:
+        if pipeline is not None:
+            command = {'aggregate': collection_name, 'pipeline': pipeline, 'cursor': {}}
+        else:
+            command = {'find': collection_name, 'filter': data_filter, **({'sort': sort} if sort else {})}
+        try:
+            explain = await mongo.command('explain', command, verbosity='queryPlanner')
+        except PyMongoError as error:
+            logger.debug(f'Failed to explain slow query on {collection_name}: {error}')
+            return
+        finally:
+            with self._lock:
+                self._explaining.discard(key)
+
+        plan, collscan = summarize_plan(explain)
+        with self._lock:
+            if entry := self._records.get(key):
+                entry['plan'], entry['collscan'] = plan, collscan
+
+    def report(self) -> list[dict[str, Any]]:
+        """
+        Group the recorded shapes and propose the index that would serve each, slowest total time first.
+
+        Returns:
+            list[dict[str, Any]]: One entry per collection, operation and shape.
+        """
+        with self._lock:
+            entries = [dict(entry) for entry in self._records.values()]
+
+        report = []
+        for entry in sorted(entries, key=lambda item: item['total_ms'], reverse=True):
+            suggested = suggest_index(entry['shape'], entry['sort'])
+            report.append(
+                {
+                    'collection': entry['collection'],
+                    'operation': entry['operation'],
+                    'shape': entry['shape'],
+                    'sort': entry['sort'],
+                    'count': entry['count'],
+                    'mean_ms': round(entry['total_ms'] / entry['count'], 3),
+                    'max_ms': round(entry['max_ms'], 3),
+                    'plan': entry['plan'],
+                    'collscan': entry['collscan'],
+                    'suggested_index': suggested,
+                    'registered_index': get_registered_index(entry['collection'], suggested) if suggested else None,
+                }
+            )
+        return report
+
+    def reset(self) -> None:
+        """Remove every record"""
+        with self._lock:
+            self._records.clear()
+
+
+slow_query_log = SlowQueryLog()
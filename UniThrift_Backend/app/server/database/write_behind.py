@@ -0,0 +1,202 @@
+import abc
+import asyncio
+import contextlib
+import time
+from typing import Any, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+import app.server.database.core_data as core_service
+from app.server.logger.custom_logger import logger
+from app.server.utils import date_utils
+
+
+class WriteBehindBuffer(abc.ABC):
+    """Base of the in-process buffers which collect pending writes of a collection and flush them as one `bulk_write`.
+
+    A buffer is flushed every `flush_interval` seconds once started, early when it holds `max_size` pending writes,
+    and a last time on stop. At most one flush is in flight, pending writes arriving while the buffer is full and a
+    flush is still running are dropped and counted, and so are the writes of a failed flush, which is logged as an error.
+    """
+
+    def __init__(self, collection_name: str, flush_interval: float, max_size: int) -> None:
+        """
+        Args:
+            collection_name (str): The name of the collection written to.
+            flush_interval (float): Number of seconds between two periodic flushes.
+            max_size (int): Maximum number of pending writes held in memory.
+        """
+        self.collection_name = collection_name
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.flushed = 0
+        self.dropped = 0
+        self._run_task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Number of pending writes"""
+
+    @abc.abstractmethod
+    def _drain(self) -> list[UpdateOne]:
+        """Take the pending writes out of the buffer as update operations"""
+
+    def start(self) -> None:
+        """Start the periodic flush"""
+        if self._run_task is None or self._run_task.done():
+            self._run_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write what is still pending"""
+        if self._run_task:
+            self._run_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._run_task
+            self._run_task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write the pending writes, after the flush in flight if any.
+
+        Returns:
+            int: The number of update operations written.
+        """
+        if self._flush_task and not self._flush_task.done():
+            await asyncio.shield(self._flush_task)
+        # shielded so that stopping the periodic flush does not lose the writes already drained
+        self._flush_task = asyncio.create_task(self._write(self._drain()))
+        return await asyncio.shield(self._flush_task)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get the buffer counters.
+
+        Returns:
+            dict[str, Any]: The pending, flushed and dropped write counts.
+        """
+        return {'pending': len(self), 'flushed': self.flushed, 'dropped': self.dropped}
+
+    def _reserve(self) -> bool:
+        """Make room for a new pending write, flushing early when the buffer is full, False when it has to be dropped"""
+        if len(self) < self.max_size:
+            return True
+        if self._flush_task and not self._flush_task.done():
+            self.dropped += 1
+            return False
+        self._flush_task = asyncio.create_task(self._write(self._drain()))
+        return True
+
+    async def _write(self, operations: list[UpdateOne]) -> int:
+        if not operations:
+            return 0
+        try:
+            await core_service.bulk_write(self.collection_name, operations, ordered=False)
+        except PyMongoError as error:
+            self.dropped += len(operations)
+            logger.error(f'Failed to flush {len(operations)} buffered writes to {self.collection_name}: {error}')
+            return 0
+        self.flushed += len(operations)
+        return len(operations)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+class CounterBuffer(WriteBehindBuffer):
+    """Aggregates `$inc` counters keyed by a fixed set of fields, each key is flushed as one upsert incrementing `count`"""
+
+    def __init__(self, collection_name: str, fields: tuple[str, ...], flush_interval: float, max_size: int) -> None:
+        """
+        Args:
+            collection_name (str): The name of the collection written to.
+            fields (tuple[str, ...]): The fields identifying a counter document.
+            flush_interval (float): Number of seconds between two periodic flushes.
+            max_size (int): Maximum number of distinct keys held in memory.
+        """
+        super().__init__(collection_name, flush_interval, max_size)
+        self.fields = fields
+        self._counts: dict[tuple[Any, ...], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def increment(self, *values: Any, amount: int = 1) -> None:
+        """
+        Increment the counter of a key.
+
+        Args:
+            values (Any): The values of the key fields, in the order of `fields`.
+            amount (int, optional): The increment. Defaults to 1.
+        """
+        if values in self._counts:
+            self._counts[values] += amount
+        elif self._reserve():
+            self._counts[values] = amount
+
+    def _drain(self) -> list[UpdateOne]:
+        counts, self._counts = self._counts, {}
+        return [core_service.update_query(data_filter=dict(zip(self.fields, values)), update={'$inc': {'count': amount}}, upsert=True) for values, amount in counts.items()]
+
+
+class PresenceBuffer(WriteBehindBuffer):
+    """Debounces timestamp fields of user documents such as `last_active`, written at most once per user and field per window.
+
+    Touches of a field still pending only move its timestamp forward, touches within the window of its last flush are
+    skipped. Each flush writes one `$set` per user without returning the documents.
+    """
+
+    def __init__(self, collection_name: str, window: float, flush_interval: float, max_size: int) -> None:
+        """
+        Args:
+            collection_name (str): The name of the collection written to.
+            window (float): Minimum number of seconds between two writes of the same user and field.
+            flush_interval (float): Number of seconds between two periodic flushes.
+            max_size (int): Maximum number of users with pending writes held in memory.
+        """
+        super().__init__(collection_name, flush_interval, max_size)
+        self.window = window
+        self.debounced = 0
+        self._pending: dict[Any, dict[str, int]] = {}
+        self._written_at: dict[tuple[Any, str], float] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def touch(self, record_id: Any, field: str, timestamp: Optional[int] = None) -> None:
+        """
+        Schedule the update of a timestamp field of a document.
+
+        Args:
+            record_id (Any): The `_id` of the document.
+            field (str): The name of the timestamp field, e.g. `last_active`.
+            timestamp (Optional[int], optional): The value to set. Defaults to the current timestamp.
+        """
+        timestamp = timestamp or date_utils.get_current_timestamp()
+        if fields := self._pending.get(record_id):
+            fields[field] = max(fields.get(field, 0), timestamp)
+            return
+
+        written_at = self._written_at.get((record_id, field))
+        if written_at is not None and time.monotonic() - written_at < self.window:
+            self.debounced += 1
+            return
+
+        if self._reserve():
+            self._pending[record_id] = {field: timestamp}
+
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats(), 'debounced': self.debounced}
+
+    def _drain(self) -> list[UpdateOne]:
+        now = time.monotonic()
+        pending, self._pending = self._pending, {}
+        self._written_at = {key: written_at for key, written_at in self._written_at.items() if now - written_at < self.window}
+        for record_id, fields in pending.items():
+            for field in fields:
+                self._written_at[(record_id, field)] = now
+        return [core_service.update_query(record_id=record_id, update={'$set': fields}) for record_id, fields in pending.items()]
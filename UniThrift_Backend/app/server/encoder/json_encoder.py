@@ -1,41 +1,70 @@
-import json
-from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
 
-# from pandas import DataFrame as df
+import orjson
+from bson import ObjectId
+from pydantic import BaseModel
+from starlette.responses import Response
 
+# datetime, date, Enum, UUID and dataclasses are encoded by orjson natively, keys which are not strings are encoded
+# like values
+_OPTIONS = orjson.OPT_NON_STR_KEYS
 
-class JSONEncoder(json.JSONEncoder):
-    def default(self, o):
-        # if isinstance(o, np.integer):
-        #     return int(o)
-        # elif isinstance(o, np.floating):
-        #     return float(o)
-        # if isinstance(o, np.ndarray):
-        #     return o.tolist()
-        # if isinstance(o, df):
-        #     return o.to_json(orient='table')
-        return o.isoformat() if isinstance(o, (date, datetime)) else super().default(o)
 
+def default(obj: Any) -> Any:
+    """Encode the types orjson does not know, the way `jsonable_encoder` does"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.dict(by_alias=True)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
 
-def json_decoder(obj):
-    if '__type__' in obj and obj['__type__'] == '__datetime__':
-        return datetime.fromtimestamp(obj['epoch'])
-    return obj
 
+def json_dumps(obj: Any) -> bytes:
+    """
+    Encode a value as JSON in one pass of orjson.
 
-# Encoder function
+    Args:
+        obj (Any): Any combination of JSON types, ObjectId, datetime, Enum and pydantic models.
 
+    Returns:
+        bytes: The UTF-8 JSON document.
+    """
+    return orjson.dumps(obj, default=default, option=_OPTIONS)
 
-def json_dumps(obj):
-    return json.dumps(obj, cls=JSONEncoder)
 
+def json_loads(data: Any) -> Any:
+    """Decode a JSON document from bytes or str"""
+    return orjson.loads(data)
 
-# Decoder function
 
+def serialize(obj: Any) -> Any:
+    """
+    Convert a value to its JSON compatible form, the replacement of `jsonable_encoder` for documents and envelopes.
 
-def json_loads(obj):
-    return json.loads(obj, object_hook=json_decoder)
+    Args:
+        obj (Any): Any combination of JSON types, ObjectId, datetime, Enum and pydantic models.
 
+    Returns:
+        Any: The value made of dict, list, str, int, float, bool and None only.
+    """
+    return orjson.loads(json_dumps(obj))
 
-def serialize(obj):
-    return json_loads(json_dumps(obj))
+
+class FastJSONResponse(Response):
+    """JSON response encoded by `json_dumps`.
+
+    Returned from a route it skips the validation and the `jsonable_encoder` walk FastAPI applies to plain return
+    values, the content is encoded in one pass of orjson instead.
+    """
+
+    media_type = 'application/json'
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
@@ -3,10 +3,10 @@ import sys
 from typing import Any, Optional
 
 from fastapi import HTTPException, Request, status
-from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
+from app.server.encoder import json_encoder
 from app.server.logger.custom_logger import logger
 
 
@@ -32,6 +32,16 @@ class PermissionCustomHTTPException(CustomHTTPException):
         return f'{class_name}(status_code={self.status_code!r},identifier={self.identifier!r}, detail={self.detail!r}, missing_roles={self.missing_roles!r})'
 
 
+def _log_http_error(exc: HTTPException) -> None:
+    """Log an HTTP error, expected client errors as a one line warning"""
+    if (exc.status_code or status.HTTP_404_NOT_FOUND) < status.HTTP_500_INTERNAL_SERVER_ERROR:
+        logger.warning(exc.detail)
+        return
+    _type, _, _trace = sys.exc_info()
+    # workaround for HTTPException not being deserialized inside loguru using pickel
+    logger.opt(exception=(_type, HTTPException(exc.status_code, exc.detail), None)).error(exc.detail)
+
+
 async def validation_exception_handler(_request: Request, exc: RequestValidationError) -> JSONResponse:
     """Exception handler to handle Request validation errors
     Args:
@@ -48,7 +58,7 @@ async def validation_exception_handler(_request: Request, exc: RequestValidation
     else:
         # No error, default message
         error_message = 'Request validation error unknown'
-    logger.error(error_message)
+    logger.warning(error_message)
     return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=get_error_response(error_message, status.HTTP_422_UNPROCESSABLE_ENTITY, exc.errors()))
 
 
@@ -61,9 +71,7 @@ async def http_exception_handler(_request: Request, exc: HTTPException) -> JSONR
     Returns:
         JSONResponse: Returns error data in the desired format
     """
-    _type, _, _trace = sys.exc_info()
-    # workaround for HTTPException not being deserialized inside loguru using pickel
-    logger.opt(exception=(_type, HTTPException(exc.status_code, exc.detail), None)).error(exc.detail)
+    _log_http_error(exc)
     # logger.exception(exc)
     code = exc.status_code or status.HTTP_404_NOT_FOUND
     headers = {}
@@ -81,9 +89,7 @@ async def http_custom_exception_handler(_request: Request, exc: CustomHTTPExcept
     Returns:
         JSONResponse: Returns error data in the desired format
     """
-    _type, _, _trace = sys.exc_info()
-    # workaround for HTTPException not being deserialized inside loguru using pickel
-    logger.opt(exception=(_type, HTTPException(exc.status_code, exc.detail), None)).error(exc.detail)
+    _log_http_error(exc)
     # logger.exception(exc)
     code = exc.status_code or status.HTTP_404_NOT_FOUND
     headers = {}
@@ -102,9 +108,7 @@ async def http_permission_exception_handler(_request: Request, exc: PermissionCu
     Returns:
         JSONResponse: Returns error data in the desired format
     """
-    _type, _, _trace = sys.exc_info()
-    # workaround for HTTPException not being deserialized inside loguru using pickel
-    logger.opt(exception=(_type, HTTPException(exc.status_code, exc.detail), None)).error(exc.detail)
+    _log_http_error(exc)
     # logger.exception(exc)
     code = exc.status_code or status.HTTP_404_NOT_FOUND
     headers = {}
@@ -126,7 +130,7 @@ def get_custom_error_response(message: str, code: int, detail: Any = None, ident
     error = {'status': 'FAIL', 'errorData': {'errorCode': code, 'message': message, 'identifer': identifier}}
     if detail:
         error['errorData'].update({'detail': detail})
-    return jsonable_encoder(error)
+    return json_encoder.serialize(error)
 
 
 def get_permission_error_response(message: str, code: int, detail: Any = None, identifier: Any = None, missing_permissions: list[str] = None) -> dict[str, Any]:
@@ -140,7 +144,7 @@ def get_permission_error_response(message: str, code: int, detail: Any = None, i
     error = {'status': 'FAIL', 'errorData': {'errorCode': code, 'message': message, 'identifer': identifier, 'missingPermissions': missing_permissions}}
     if detail:
         error['errorData'].update({'detail': detail})
-    return jsonable_encoder(error)
+    return json_encoder.serialize(error)
 
 
 def get_error_response(message: str, code: int, detail: Any = None) -> dict[str, Any]:
@@ -156,4 +160,4 @@ def get_error_response(message: str, code: int, detail: Any = None) -> dict[str,
     error = {'status': 'FAIL', 'errorData': {'errorCode': code, 'message': message}}
     if detail:
         error['errorData'].update({'detail': detail})
-    return jsonable_encoder(error)
+    return json_encoder.serialize(error)
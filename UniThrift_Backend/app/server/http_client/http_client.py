@@ -1,8 +1,17 @@
+from typing import Any, Optional
+
 import httpx
 from fastapi import HTTPException, status
-from fastapi.encoders import jsonable_encoder
 
 from app.server.config import config
+from app.server.encoder import json_encoder
+
+
+def get_json_content(body: Any, headers: Optional[dict[str, str]]) -> dict[str, Any]:
+    """Request arguments sending the body encoded by orjson, without a body when it is None"""
+    if body is None:
+        return {'headers': headers}
+    return {'content': json_encoder.json_dumps(body), 'headers': {'Content-Type': 'application/json', **(headers or {})}}
 
 
 class RestClient:
@@ -17,8 +26,8 @@ class RestClient:
 
     async def post(self, end_point: str, params=None, body=None, headers=None):
         try:
-            response = await self.client.post(end_point, params=params, json=jsonable_encoder(body), headers=headers)
-            response = response.json()
+            response = await self.client.post(end_point, params=params, **get_json_content(body, headers))
+            response = json_encoder.json_loads(response.content)
             return response
         except httpx.ConnectError as error:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f'{error.request.url.port} service unavailable') from error
@@ -28,7 +37,7 @@ class RestClient:
     async def get(self, end_point: str, params=None, headers=None):
         try:
             response = await self.client.get(end_point, params=params, headers=headers)
-            response = response.json()
+            response = json_encoder.json_loads(response.content)
             return response
         except httpx.ConnectError as error:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f'{error.request.url.port} service unavailable') from error
@@ -37,8 +46,8 @@ class RestClient:
 
     async def patch(self, end_point: str, params=None, body=None, headers=None):
         try:
-            response = await self.client.patch(end_point, params=params, json=jsonable_encoder(body), headers=headers)
-            response = response.json()
+            response = await self.client.patch(end_point, params=params, **get_json_content(body, headers))
+            response = json_encoder.json_loads(response.content)
             return response
         except httpx.ConnectError as error:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f'{error.request.url.port} service unavailable') from error
@@ -47,8 +56,8 @@ class RestClient:
 
     async def put(self, end_point: str, params=None, body=None, headers=None):
         try:
-            response = await self.client.put(end_point, params=params, json=jsonable_encoder(body), headers=headers)
-            response = response.json()
+            response = await self.client.put(end_point, params=params, **get_json_content(body, headers))
+            response = json_encoder.json_loads(response.content)
             return response
         except httpx.ConnectError as error:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f'{error.request.url.port} service unavailable') from error
@@ -57,8 +66,8 @@ class RestClient:
 
     async def delete(self, end_point: str, params=None, body=None, headers=None):
         try:
-            response = await self.client.request('DELETE', end_point, params=params, json=jsonable_encoder(body), headers=headers)
-            response = response.json()
+            response = await self.client.request('DELETE', end_point, params=params, **get_json_content(body, headers))
+            response = json_encoder.json_loads(response.content)
             return response
         except httpx.ConnectError as error:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f'{error.request.url.port} service unavailable') from error
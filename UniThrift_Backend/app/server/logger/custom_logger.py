@@ -1,15 +1,30 @@
+import atexit
 import logging
 import sys
+from typing import Optional
 
 from loguru import logger
 
+from app.server.config import config
+from app.server.logger.pipeline import BatchedLogSink, parse_sample_rates
 from app.server.static import constants
 
 logging.getLogger('uvicorn').handlers.clear()
 
 FORMAT = '{level} | {time} | {message}'
 logger.remove(0)
-logger.add(sys.stdout, level='DEBUG', format=FORMAT, enqueue=True, backtrace=False, diagnose=False, serialize=1)
-logger.add('logs/app.log', rotation='10 MB', retention=5, format=FORMAT, enqueue=True, backtrace=False, diagnose=False, serialize=1)
-logger.add(sys.stderr, level='ERROR', format=FORMAT, enqueue=True, backtrace=False, diagnose=False, serialize=1)
+
+# batched sink of the `batched` log mode, None in the `direct` mode
+log_pipeline: Optional[BatchedLogSink] = None
+
+if config.LOG_MODE == 'batched':
+    log_pipeline = BatchedLogSink(
+        'logs/app.log', capacity=config.LOG_BUFFER_SIZE, batch_size=config.LOG_BATCH_SIZE, flush_interval=config.LOG_FLUSH_INTERVAL, sample_rates=parse_sample_rates(config.LOG_SAMPLE_RATES)
+    )
+    logger.add(log_pipeline, level='DEBUG', format='{message}', backtrace=False, diagnose=False)
+    atexit.register(logger.remove)
+else:
+    logger.add(sys.stdout, level='DEBUG', format=FORMAT, enqueue=True, backtrace=False, diagnose=False, serialize=1)
+    logger.add('logs/app.log', rotation='10 MB', retention=5, format=FORMAT, enqueue=True, backtrace=False, diagnose=False, serialize=1)
+    logger.add(sys.stderr, level='ERROR', format=FORMAT, enqueue=True, backtrace=False, diagnose=False, serialize=1)
 logger = logger.bind(service=constants.LOGGER_SERVICE_NAME)
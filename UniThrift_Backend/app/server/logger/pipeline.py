@@ -0,0 +1,155 @@
+import os
+import random
+import sys
+import threading
+import traceback
+from collections import Counter, deque
+from logging.handlers import RotatingFileHandler
+from typing import Any, Optional, TextIO
+
+import orjson
+
+# levels which are never sampled out
+_UNSAMPLED_LEVEL_NO = 40
+
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    """
+    Parse per level sample rates.
+
+    Args:
+        value (str): Comma separated `LEVEL=rate` pairs, e.g. `DEBUG=0.1,INFO=0.5`.
+
+    Returns:
+        dict[str, float]: The sample rate of each listed level, levels not listed are always kept.
+    """
+    rates = {}
+    for item in filter(None, (item.strip() for item in value.split(','))):
+        level, _, rate = item.partition('=')
+        rates[level.strip().upper()] = float(rate)
+    return rates
+
+
+def serialize(record: dict[str, Any]) -> str:
+    """Serialize a loguru record as one JSON line, the traceback of an attached exception included"""
+    data = {
+        'time': record['time'].isoformat(),
+        'level': record['level'].name,
+        'message': record['message'],
+        'name': record['name'],
+        'function': record['function'],
+        'line': record['line'],
+        'process': record['process'].id,
+        'thread': record['thread'].id,
+        'extra': record['extra'],
+    }
+    if exception := record['exception']:
+        data['exception'] = ''.join(traceback.format_exception(exception.type, exception.value, exception.traceback))
+    return orjson.dumps(data, default=str).decode() + '\n'
+
+
+class BatchedLogSink:
+    """Loguru sink which queues records in a bounded ring buffer and writes them in batches from a single thread.
+
+    The calling thread only samples and appends the record, serialization and I/O happen in the writer thread. When
+    the buffer is full the oldest record is overwritten and counted as dropped per level, logging never blocks the
+    event loop but records are lost when they are produced faster than they are written. The queued records are
+    written when the sink is stopped, which loguru does when the sink is removed.
+    """
+
+    def __init__(
+        self, file_name: str, capacity: int, batch_size: int, flush_interval: float, sample_rates: Optional[dict[str, float]] = None, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5
+    ) -> None:
+        """
+        Args:
+            file_name (str): Path of the rotating log file.
+            capacity (int): Maximum number of records waiting to be written.
+            batch_size (int): Number of queued records which wakes the writer before its interval.
+            flush_interval (float): Maximum number of seconds a record waits to be written.
+            sample_rates (Optional[dict[str, float]]): Share of the records of a level which are kept, ERROR and above
+                are always kept. Defaults to keeping everything.
+            max_bytes (int): Size at which the log file is rotated.
+            backup_count (int): Number of rotated log files kept.
+        """
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_rates = sample_rates or {}
+        self.written = 0
+        self.dropped: Counter = Counter()
+        self.sampled_out: Counter = Counter()
+        self._records: deque = deque(maxlen=capacity)
+        self._condition = threading.Condition()
+        self._stopped = False
+        os.makedirs(os.path.dirname(file_name) or '.', exist_ok=True)
+        self._file = RotatingFileHandler(file_name, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+        self._writer = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._writer.start()
+
+    def write(self, message: Any) -> None:
+        """Queue a record, called by loguru in the thread that logs"""
+        record = message.record
+        level = record['level']
+        if level.no < _UNSAMPLED_LEVEL_NO and random.random() >= self.sample_rates.get(level.name, 1.0):
+            self.sampled_out[level.name] += 1
+            return
+
+        with self._condition:
+            if len(self._records) == self.capacity:
+                self.dropped[self._records[0]['level'].name] += 1
+            self._records.append(record)
+            if len(self._records) >= self.batch_size:
+                self._condition.notify()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get the pipeline counters.
+
+        Returns:
+            dict[str, Any]: The queued and written record counts, and the dropped and sampled out counts per level.
+        """
+        return {'queued': len(self._records), 'written': self.written, 'dropped': dict(self.dropped), 'sampled_out': dict(self.sampled_out)}
+
+    def stop(self) -> None:
+        """Write the queued records and stop the writer thread"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._writer.join()
+        self._file.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._stopped and len(self._records) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                records = list(self._records)
+                self._records.clear()
+                stopped = self._stopped
+            if records:
+                self._write_batch(records)
+            if stopped:
+                return
+
+    def _write_batch(self, records: list[dict[str, Any]]) -> None:
+        lines = [serialize(record) for record in records]
+        errors = [line for record, line in zip(records, lines) if record['level'].no >= _UNSAMPLED_LEVEL_NO]
+        try:
+            self._write(sys.stdout, lines)
+            self._write(sys.stderr, errors)
+            if self._file.stream is None:
+                self._file.stream = self._file._open()  # pylint: disable=protected-access
+            self._write(self._file.stream, lines)
+            if self._file.stream.tell() >= self._file.maxBytes:
+                self._file.doRollover()
+        except (OSError, ValueError) as error:
+            # the logger cannot log its own failure, report it the way the logging module does
+            print(f'Failed to write {len(lines)} log records: {error}', file=sys.__stderr__)
+            return
+        self.written += len(records)
+
+    @staticmethod
+    def _write(stream: TextIO, lines: list[str]) -> None:
+        if lines:
+            stream.write(''.join(lines))
+            stream.flush()
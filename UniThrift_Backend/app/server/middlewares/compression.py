@@ -0,0 +1,117 @@
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.server.config import config
+from app.server.utils import compression_utils
+
+# content types which are already compressed or must not be buffered
+_SKIPPED_CONTENT_TYPES = ('image/', 'video/', 'audio/', 'application/zip', 'application/gzip', 'text/event-stream')
+
+
+class CompressionMiddleware:
+    """Compresses responses in the encoding negotiated from `Accept-Encoding`, brotli, zstd or gzip.
+
+    The level of each encoding is the one of the longest matching path prefix in `route_levels`, or else the cheap
+    `DYNAMIC_LEVELS`. Responses which already have a `Content-Encoding`, such as the precompressed responses of the
+    response cache, are sent as is.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = config.COMPRESSION_MINIMUM_SIZE, route_levels: Optional[dict[str, dict[str, int]]] = None) -> None:
+        """
+        Args:
+            app (ASGIApp): The application.
+            minimum_size (int): Bodies sent in one message and smaller than this are not compressed.
+            route_levels (Optional[dict[str, dict[str, int]]]): Compression levels per path prefix, overriding the
+                dynamic levels of the listed encodings.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        # longest prefixes first, so that the most specific policy wins
+        self.route_levels = sorted((route_levels or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = compression_utils.negotiate_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await CompressionResponder(self.app, encoding, self.get_level(scope['path'], encoding), self.minimum_size)(scope, receive, send)
+
+    def get_level(self, path: str, encoding: str) -> int:
+        """Compression level of an encoding for a request path"""
+        for prefix, levels in self.route_levels:
+            if path.startswith(prefix) and encoding in levels:
+                return levels[encoding]
+        return compression_utils.DYNAMIC_LEVELS[encoding]
+
+
+class CompressionResponder:
+    """Compresses the response of one request, whole when it is sent in one message and chunk by chunk otherwise"""
+
+    def __init__(self, app: ASGIApp, encoding: str, level: int, minimum_size: int) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.send: Send = unattached_send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[compression_utils.StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            headers = Headers(raw=message['headers'])
+            self.passthrough = 'content-encoding' in headers or headers.get('content-type', '').startswith(_SKIPPED_CONTENT_TYPES)
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # held back until the first body message tells whether the body is worth compressing
+                self.start_message = message
+            return
+
+        if message['type'] != 'http.response.body' or self.passthrough:
+            await self.send(message)
+            return
+
+        body, more_body = message.get('body', b''), message.get('more_body', False)
+        if self.start_message is not None:
+            start_message, self.start_message = self.start_message, None
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start_message)
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message['headers'])
+            headers['Content-Encoding'] = self.encoding
+            headers.add_vary_header('Accept-Encoding')
+            if not more_body:
+                body = compression_utils.compress(body, self.encoding, self.level)
+                headers['Content-Length'] = str(len(body))
+                await self.send(start_message)
+                await self.send({'type': 'http.response.body', 'body': body})
+                return
+
+            del headers['Content-Length']
+            self.compressor = compression_utils.StreamCompressor(self.encoding, self.level)
+            await self.send(start_message)
+
+        body = self.compressor.compress(body)
+        if not more_body:
+            body += self.compressor.flush()
+        if body or not more_body:
+            await self.send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+
+async def unattached_send(message: Message) -> None:  # pragma: no cover
+    raise RuntimeError('send awaitable not set')
@@ -0,0 +1,138 @@
+import zlib
+from typing import Optional
+
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.server.config import config
+from app.server.handler.error_handler import get_error_response
+from app.server.static import localization
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd request bodies are rejected as unsupported
+    zstandard = None
+
+# zstd output of a call cannot be bounded, so the input is fed in slices small enough to keep the overshoot of the
+# size limit to a few MB even for the most compressible input
+_ZSTD_INPUT_SLICE = 128
+
+
+class StreamDecompressor:
+    """Incremental decompressor of one request body which fails once the output exceeds a maximum size"""
+
+    def __init__(self, encoding: str, max_size: int) -> None:
+        """
+        Args:
+            encoding (str): The content encoding, `gzip`, `deflate` or `zstd`.
+            max_size (int): Maximum number of decompressed bytes.
+        """
+        self.encoding = encoding
+        self.max_size = max_size
+        self.size = 0
+        if encoding == 'zstd':
+            self._zstd = zstandard.ZstdDecompressor().decompressobj()
+            self._zlib = None
+        else:
+            self._zstd = None
+            self._zlib = zlib.decompressobj(16 + zlib.MAX_WBITS if encoding == 'gzip' else zlib.MAX_WBITS)
+
+    def decompress(self, data: bytes) -> bytes:
+        """
+        Decompress the next chunk of the body.
+
+        Args:
+            data (bytes): The compressed chunk.
+
+        Raises:
+            HTTPException: 413 if the decompressed body exceeds the maximum size, 400 if the data is not valid.
+
+        Returns:
+            bytes: The decompressed chunk.
+        """
+        try:
+            if self._zstd:
+                output = b''.join(self._add(self._zstd.decompress(data[offset : offset + _ZSTD_INPUT_SLICE])) for offset in range(0, len(data), _ZSTD_INPUT_SLICE))
+            else:
+                # asking for one byte more than the remaining budget detects an overflow without inflating it
+                output = self._add(self._zlib.decompress(data, self.max_size - self.size + 1))
+        except (zlib.error, getattr(zstandard, 'ZstdError', zlib.error)) as error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=localization.EXCEPTION_REQUEST_BODY_INVALID.format(encoding=self.encoding)) from error
+        return output
+
+    def finish(self) -> bytes:
+        """
+        Check that the body was complete and return the data still buffered.
+
+        Raises:
+            HTTPException: 400 if the compressed stream is truncated.
+
+        Returns:
+            bytes: The last decompressed bytes.
+        """
+        # both decompressors only reach eof once the end of the stream or frame was read
+        if not (self._zstd or self._zlib).eof:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=localization.EXCEPTION_REQUEST_BODY_INVALID.format(encoding=self.encoding))
+        return self._add(self._zlib.flush()) if self._zlib else b''
+
+    def _add(self, output: bytes) -> bytes:
+        self.size += len(output)
+        if self.size > self.max_size:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=localization.EXCEPTION_REQUEST_BODY_TOO_LARGE)
+        return output
+
+
+class RequestDecompressionMiddleware:
+    """Decompresses `gzip`, `deflate` and `zstd` request bodies of the routes under a path prefix as they are received.
+
+    The route sees a plain body without `Content-Encoding` and `Content-Length` headers. Decompression errors are
+    raised from `receive`, so they reach the route as an `HTTPException` and get the usual error envelope.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str = '/api/v1', max_size: int = config.REQUEST_MAX_DECOMPRESSED_SIZE) -> None:
+        """
+        Args:
+            app (ASGIApp): The application.
+            path_prefix (str): Prefix of the paths whose request bodies are decompressed.
+            max_size (int): Maximum number of decompressed bytes of a request body.
+        """
+        self.app = app
+        self.path_prefix = path_prefix
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not scope['path'].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = get_content_encoding(Headers(scope=scope))
+        if encoding in (None, 'identity'):
+            await self.app(scope, receive, send)
+            return
+
+        if encoding not in ('gzip', 'deflate') and not (encoding == 'zstd' and zstandard):
+            code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            await JSONResponse(status_code=code, content=get_error_response(localization.EXCEPTION_CONTENT_ENCODING_UNSUPPORTED, code))(scope, receive, send)
+            return
+
+        decompressor = StreamDecompressor(encoding, self.max_size)
+        scope = {**scope, 'headers': [(key, value) for key, value in scope['headers'] if key not in (b'content-encoding', b'content-length')]}
+
+        async def receive_decompressed() -> Message:
+            message = await receive()
+            if message['type'] == 'http.request':
+                body = decompressor.decompress(message.get('body', b''))
+                if not message.get('more_body', False):
+                    body += decompressor.finish()
+                message = {**message, 'body': body}
+            return message
+
+        await self.app(scope, receive_decompressed, send)
+
+
+def get_content_encoding(headers: Headers) -> Optional[str]:
+    """Content encoding of a request, the raw value when several encodings are chained so that it is rejected"""
+    encoding = headers.get('content-encoding')
+    return encoding.strip().lower() if encoding else None
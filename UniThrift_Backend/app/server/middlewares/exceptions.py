@@ -2,54 +2,80 @@ import contextlib
 import time
 from typing import Any
 
-from fastapi import HTTPException, Request, status
-from fastapi.encoders import jsonable_encoder
+from fastapi import HTTPException, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from jose import ExpiredSignatureError, JWTError
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.server.encoder import json_encoder
 from app.server.logger.custom_logger import logger
 from app.server.static import localization
 
 
-class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
-    """Middleware to handles exceptions in HTTP requests and responses."""
+class ExceptionHandlerMiddleware:
+    """Middleware to handles exceptions in HTTP requests and send the API process time over the response headers."""
 
-    async def dispatch(self, request: Request, call_next):
-        response = await handle_exceptions(request, call_next)
-        return response or await call_next(request)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
 
-async def handle_exceptions(request: Request, call_next) -> JSONResponse:
-    """Middleware to catch all the Exceptions and send API process time over response headers"""
-    try:
         start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        response.headers['X-Process-Time'] = f'{round(process_time * 1000, 2)}'
-    except RequestValidationError as error:
-        logger.exception(error)
-        response = JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=get_error_response('Request validation error', status.HTTP_422_UNPROCESSABLE_ENTITY, error.errors()))
-    except ValueError as error:
-        logger.exception(error)
-        response = JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=get_error_response(str(error), status.HTTP_422_UNPROCESSABLE_ENTITY))
-    except ExpiredSignatureError as error:
-        logger.exception(error)
-        response = JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content=get_error_response(localization.EXCEPTION_TOKEN_INVALID, status.HTTP_401_UNAUTHORIZED))
-    except JWTError as error:
-        logger.exception(error)
-        response = JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content=get_error_response(str(error), status.HTTP_401_UNAUTHORIZED))
-    except HTTPException as error:
+        response_started = False
+
+        async def send_with_process_time(message: Message) -> None:
+            nonlocal response_started
+            if message['type'] == 'http.response.start':
+                response_started = True
+                process_time = time.time() - start_time
+                MutableHeaders(scope=message).append('X-Process-Time', f'{round(process_time * 1000, 2)}')
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_process_time)
+        except Exception as error:  # pylint: disable=broad-except
+            # the status and headers are already sent, the error can only abort the response
+            if response_started:
+                raise
+            response = handle_exception(error)
+            await response(scope, receive, send)
+
+
+def log_exception(error: Exception, status_code: int) -> None:
+    """Log an exception turned into an error response, expected client errors as one line without their traceback"""
+    if status_code < status.HTTP_500_INTERNAL_SERVER_ERROR and isinstance(error, (RequestValidationError, JWTError, HTTPException)):
+        logger.warning(f'{type(error).__name__}: {error}')
+    else:
         logger.exception(error)
+
+
+def handle_exception(error: Exception) -> JSONResponse:
+    """Map an exception raised by the application to its error response"""
+    if isinstance(error, RequestValidationError):
+        log_exception(error, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=get_error_response('Request validation error', status.HTTP_422_UNPROCESSABLE_ENTITY, error.errors()))
+    if isinstance(error, ValueError):
+        log_exception(error, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=get_error_response(str(error), status.HTTP_422_UNPROCESSABLE_ENTITY))
+    if isinstance(error, ExpiredSignatureError):
+        log_exception(error, status.HTTP_401_UNAUTHORIZED)
+        return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content=get_error_response(localization.EXCEPTION_TOKEN_INVALID, status.HTTP_401_UNAUTHORIZED))
+    if isinstance(error, JWTError):
+        log_exception(error, status.HTTP_401_UNAUTHORIZED)
+        return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content=get_error_response(str(error), status.HTTP_401_UNAUTHORIZED))
+    if isinstance(error, HTTPException):
+        log_exception(error, error.status_code)
         headers = {}
         with contextlib.suppress(AttributeError):
             headers = error.headers
-        response = JSONResponse(status_code=error.status_code, content=get_error_response(str(error.detail), error.status_code), headers=headers)
-    except Exception as error:  # pylint: disable=broad-except
-        logger.exception(error)
-        response = JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=get_error_response(str(error), status.HTTP_500_INTERNAL_SERVER_ERROR))
-    return response
+        return JSONResponse(status_code=error.status_code, content=get_error_response(str(error.detail), error.status_code), headers=headers)
+    logger.exception(error)
+    return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=get_error_response(str(error), status.HTTP_500_INTERNAL_SERVER_ERROR))
 
 
 def get_error_response(message: str, code: int, detail: Any = None) -> dict[str, Any]:
@@ -65,4 +91,4 @@ def get_error_response(message: str, code: int, detail: Any = None) -> dict[str,
     error = {'status': 'FAIL', 'errorData': {'errorCode': code, 'message': message}}
     if detail:
         error['errorData'].update({'detail': detail})
-    return jsonable_encoder(error)
+    return json_encoder.serialize(error)
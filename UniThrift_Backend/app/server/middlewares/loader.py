@@ -0,0 +1,18 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.server.database import loader
+
+
+class LoaderScopeMiddleware:
+    """Opens a loader scope per HTTP request so that batched `_id` lookups are cached for the request only"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        async with loader.request_scope():
+            await self.app(scope, receive, send)
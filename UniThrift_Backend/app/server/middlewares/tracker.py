@@ -1,64 +1,147 @@
-import asyncio
-import contextlib
+import random
+import time
+from typing import Any
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import ClientDisconnect
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-import app.server.database.core_data as core_service
+from app.server.config import config
+from app.server.database.write_behind import CounterBuffer
 from app.server.logger.custom_logger import logger
 from app.server.static.collections import Collections
 from app.server.utils import token_util
 
+# request counts per user, ip and path, written to the request tracker collection in batches
+request_counters = CounterBuffer(Collections.REQUEST_TRACKER, ('user_id', 'ip', 'path'), config.REQUEST_TRACKER_FLUSH_INTERVAL, config.REQUEST_TRACKER_BUFFER_SIZE)
 
-class RequestsTrackerMiddleware(BaseHTTPMiddleware):
-    """Request tracker middleware to log IP addresses for each requests along with user id if the request as Authorization header"""
 
-    async def dispatch(self, request: Request, call_next):
-        asyncio.create_task(tract_request_address(request))
-        response = await call_next(request)
-        asyncio.create_task(logging_api_requests(request, response))
-        return response
+class RequestsTrackerMiddleware:
+    """Request tracker middleware to log IP addresses for each requests along with user id if the request as Authorization header.
 
+    Requests are logged for a sample of `REQUEST_LOG_SAMPLE_RATE` of them, and always when they fail or take at least
+    `REQUEST_LOG_SLOW_MS`. Sizes and timings are taken from the ASGI messages as they pass through, the bodies are
+    streamed untouched and only their first `REQUEST_LOG_BODY_PREFIX_BYTES` bytes are kept for the log.
+    """
 
-async def logging_api_requests(request: Request, response: Response):
-    if forwarded := request.headers.get('X-Forwarded-For'):
-        host = forwarded.split(',')[0]
+    def __init__(
+        self, app: ASGIApp, sample_rate: float = config.REQUEST_LOG_SAMPLE_RATE, slow_ms: float = config.REQUEST_LOG_SLOW_MS, body_prefix_bytes: int = config.REQUEST_LOG_BODY_PREFIX_BYTES
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.body_prefix_bytes = body_prefix_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        tract_request_address(scope)
+        exchange = RequestExchange(self.body_prefix_bytes)
+
+        async def receive_with_capture() -> Message:
+            message = await receive()
+            if message['type'] == 'http.request':
+                exchange.add_request_body(message.get('body', b''))
+            return message
+
+        async def send_with_capture(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                exchange.start_response(message)
+            elif message['type'] == 'http.response.body':
+                exchange.add_response_body(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_with_capture, send_with_capture)
+        except Exception:
+            exchange.failed = True
+            raise
+        finally:
+            slow = 0 <= self.slow_ms <= exchange.duration_ms()
+            if exchange.failed or exchange.status is None or exchange.status >= 400 or slow or random.random() < self.sample_rate:
+                logging_api_requests(scope, exchange, slow)
+
+
+class RequestExchange:
+    """Status, headers, sizes, timings and bounded body prefixes of a request and its response"""
+
+    __slots__ = ('body_prefix_bytes', 'started_at', 'first_byte_ms', 'status', 'response_headers', 'request_size', 'response_size', 'request_prefix', 'response_prefix', 'failed')
+
+    def __init__(self, body_prefix_bytes: int) -> None:
+        self.body_prefix_bytes = body_prefix_bytes
+        self.started_at = time.perf_counter()
+        self.first_byte_ms = None
+        self.status = None
+        self.response_headers = []
+        self.request_size = 0
+        self.response_size = 0
+        self.request_prefix = bytearray()
+        self.response_prefix = bytearray()
+        self.failed = False
+
+    def duration_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def add_request_body(self, body: bytes) -> None:
+        self.request_size += len(body)
+        self._add_prefix(self.request_prefix, body)
+
+    def start_response(self, message: Message) -> None:
+        self.first_byte_ms = (time.perf_counter() - self.started_at) * 1000
+        self.status = message['status']
+        self.response_headers = message.get('headers', [])
+
+    def add_response_body(self, body: bytes) -> None:
+        self.response_size += len(body)
+        self._add_prefix(self.response_prefix, body)
+
+    def _add_prefix(self, prefix: bytearray, body: bytes) -> None:
+        if len(prefix) < self.body_prefix_bytes:
+            prefix += body[: self.body_prefix_bytes - len(prefix)]
+
+
+def get_client_host(scope: Scope) -> str:
+    """Address of the client of a request, the first X-Forwarded-For entry when behind a proxy"""
+    if forwarded := Headers(scope=scope).get('X-Forwarded-For'):
+        return forwarded.split(',')[0]
+    client = scope.get('client')
+    return client[0] if client else ''
+
+
+def logging_api_requests(scope: Scope, exchange: RequestExchange, slow: bool = False):
+    url = f"{scope['path']}?{scope['query_string'].decode()}" if scope.get('query_string') else scope['path']
+    context: dict[str, Any] = {
+        'client_ip': get_client_host(scope),
+        'url': url,
+        'method': scope['method'],
+        'status': exchange.status,
+        'duration_ms': round(exchange.duration_ms(), 2),
+        'first_byte_ms': round(exchange.first_byte_ms, 2) if exchange.first_byte_ms is not None else None,
+        'request_size': exchange.request_size,
+        'response_size': exchange.response_size,
+        'request_headers': dict(Headers(scope=scope)),
+        'response_headers': dict(Headers(raw=exchange.response_headers)),
+    }
+    if exchange.body_prefix_bytes:
+        context['request_body'] = exchange.request_prefix.decode(errors='replace')
+        context['response_body'] = exchange.response_prefix.decode(errors='replace')
+
+    logger_ctx = logger.bind(**context)
+    if exchange.failed or exchange.status is None or exchange.status >= 500:
+        logger_ctx.error('Request failed')
+    elif exchange.status >= 400:
+        logger_ctx.warning('Request rejected')
+    elif slow:
+        logger_ctx.warning('Request slow')
     else:
-        host = request.client.host
-    request_headers = dict(request.headers)
-    request_body = b''
-    try:
-        async for chunk in request.stream():
-            request_body += chunk
-    except ClientDisconnect:
-        # Log client disconnect and return an appropriate response
-        logger.warning('Client disconnected during request body read')
-        return Response(content='Client disconnected', status_code=499)
-    response_headers = dict(response.headers)
-    response_body = b''
-    async for chunk in response.body_iterator:
-        response_body += chunk
-    logger_ctx = logger.bind(client_ip=host, url=request.url, method=request.method, status=response.status_code, request_headers=request_headers, response_headers=response_headers)
-    logger_ctx.debug('Request received')
-
-
-async def tract_request_address(request: Request):
-    host = ''
+        logger_ctx.debug('Request received')
+
+
+def tract_request_address(scope: Scope):
     user_id = ''
-    # extract user id from authorization header of the request
-    if 'authorization' in request.headers:
-        token = request.headers.get('authorization')
-        parts = token.split()
-        if len(parts) == 2 and parts[0].lower() == 'bearer' and parts[1] not in ['', ' ', 'null']:
-            token = token.split(' ')[-1]
-            with contextlib.suppress(Exception):
-                if user := token_util.verify_jwt_token(token):
-                    user_id = user['user_id']
-    if forwarded := request.headers.get('X-Forwarded-For'):
-        host = forwarded.split(',')[0]
-    else:
-        host = request.client.host
+    # extract user id from the authorization header, the claims are kept in the request state for JWTAuthUser
+    if user := token_util.get_request_claims(scope):
+        user_id = user.get('user_id', '')
 
-    data = {'user_id': user_id, 'ip': host, 'path': f"{request.scope['method']}:{request.scope['path']}"}
-    await core_service.update_one(Collections.REQUEST_TRACKER, data_filter=data, update={'$inc': {'count': 1}}, upsert=True)
+    request_counters.increment(user_id, get_client_host(scope), f"{scope['method']}:{scope['path']}")
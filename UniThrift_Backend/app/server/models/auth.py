@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import constr
 
 from app.server.models.custom_types import EmailStr
@@ -29,3 +31,4 @@ class OtpCreateDB(BaseModel):
     is_used: bool = False
     used_for: VerificationType
     expiry: int
+    expires_at: datetime  # date of `expiry` for the TTL index of the collection
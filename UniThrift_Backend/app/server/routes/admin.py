@@ -66,6 +66,12 @@ async def get_total_revenue(_token=Depends(JWTAuthUser(['ADMIN']))) -> dict[str,
     return {'data': data, 'status': 'SUCCESS'}
 
 
+@router.get('/admin/slow_queries', summary='Get recurring slow queries with the index proposed for each')
+async def get_slow_queries(reset: bool = False, _token=Depends(JWTAuthUser(['ADMIN']))) -> dict[str, Any]:
+    data = await admin.get_slow_queries(reset)
+    return {'data': data, 'status': 'SUCCESS'}
+
+
 @router.get('/admin/get_admin', summary='Get admin data')
 async def get_admin(user_data=Depends(JWTAuthUser([Role.ADMIN]))) -> dict[str, Any]:
     data = await admin.get_admin(user_data)
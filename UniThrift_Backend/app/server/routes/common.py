@@ -2,12 +2,17 @@ from typing import Any, Optional
 
 from fastapi import APIRouter
 
+from app.server.config import config
 from app.server.services import common
+from app.server.utils.response_cache import response_cache
 
 router = APIRouter()
 
 
 @router.get('/common/get_universities', summary='Gets list of all Universities')
-async def get_all_universities(page: int = 1, page_size: int = 10, search_query: Optional[str] = None) -> dict[str, Any]:
-    data = await common.get_universities(page=page, page_size=page_size, search_query=search_query)
-    return {'data': data, 'status': 'SUCCESS'}
+async def get_all_universities(page: int = 1, page_size: int = 10, search_query: Optional[str] = None, cursor: Optional[str] = None) -> dict[str, Any]:
+    cache_key = ('universities', page, page_size, search_query, cursor)
+    if cached := response_cache.get(cache_key):
+        return cached
+    data = await common.get_universities(page=page, page_size=page_size, search_query=search_query, cursor=cursor)
+    return response_cache.set(cache_key, {'data': data, 'status': 'SUCCESS'}, ttl=config.UNIVERSITIES_CACHE_TTL)
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends
 from app.server.models.item_categories import ItemCreateRequest, ItemUpdateRequest
 from app.server.services import item_categories
 from app.server.static.enums import Role
+from app.server.utils.response_cache import response_cache
 from app.server.utils.token_util import JWTAuthUser
 
 router = APIRouter()
@@ -12,8 +13,12 @@ router = APIRouter()
 
 @router.get('/item_categories/get_items', summary='Gets list of all items')
 async def get_all_items(search_query: Optional[str] = None, page: int = 1, page_size: int = 10) -> dict[str, Any]:
+    # keyed by the catalog version, so that a page is never served once an item changed
+    cache_key = ('item_categories', await item_categories.get_catalog_version(), search_query, page, page_size)
+    if cached := response_cache.get(cache_key):
+        return cached
     data = await item_categories.get_items(page=page, page_size=page_size, search_query=search_query)
-    return {'data': data, 'status': 'SUCCESS'}
+    return response_cache.set(cache_key, {'data': data, 'status': 'SUCCESS'})
 
 
 @router.post('/item_categories/get_item_details/{item_id}', summary='Gets item details')
@@ -2,6 +2,7 @@ from typing import Any, Optional
 
 from fastapi import APIRouter, Depends
 
+from app.server.encoder.json_encoder import FastJSONResponse
 from app.server.models.listing import ListingCreateRequest, ListingImageRequest, ListingUpdateRequest
 from app.server.services import listing
 from app.server.static.enums import Role
@@ -17,21 +18,21 @@ async def create_listing(params: ListingCreateRequest, user_data=Depends(JWTAuth
 
 
 @router.get('/listing/get_listings', summary='Gets all listings in paginated form')
-async def get_all_listings(item_id: Optional[str] = None, page: int = 1, page_size: int = 10, _token=Depends(JWTAuthUser([Role.STUDENT, Role.ADMIN]))) -> dict[str, Any]:
-    data = await listing.get_all_listings(item_id, page, page_size)
-    return {'data': data, 'status': 'SUCCESS'}
+async def get_all_listings(item_id: Optional[str] = None, page: int = 1, page_size: int = 10, cursor: Optional[str] = None, _token=Depends(JWTAuthUser([Role.STUDENT, Role.ADMIN]))) -> dict[str, Any]:
+    data = await listing.get_all_listings(item_id, page, page_size, cursor)
+    return FastJSONResponse({'data': data['data'], 'metadata': data['metadata'], 'status': 'SUCCESS'})
 
 
 @router.get('/listing/get_listing/{listing_id}', summary='Gets a listing by its id')
 async def get_listing_by_id(listing_id: str, _token=Depends(JWTAuthUser([Role.STUDENT, Role.ADMIN]))) -> dict[str, Any]:
     data = await listing.get_listing_by_id(listing_id)
-    return {'data': data, 'status': 'SUCCESS'}
+    return FastJSONResponse({'data': data, 'status': 'SUCCESS'})
 
 
 @router.get('/listing/get_user_listings', summary='Gets all listings of a user')
-async def get_listing_by_user(page: int = 1, page_size: int = 10, user_data=Depends(JWTAuthUser([Role.STUDENT]))) -> dict[str, Any]:
-    data = await listing.get_listings_by_user(user_data, page, page_size)
-    return {'data': data, 'status': 'SUCCESS'}
+async def get_listing_by_user(page: int = 1, page_size: int = 10, cursor: Optional[str] = None, user_data=Depends(JWTAuthUser([Role.STUDENT]))) -> dict[str, Any]:
+    data = await listing.get_listings_by_user(user_data, page, page_size, cursor)
+    return FastJSONResponse({'data': data['data'], 'metadata': data['metadata'], 'status': 'SUCCESS'})
 
 
 @router.put('/listing/update/{listing_id}', summary='Update a listing')
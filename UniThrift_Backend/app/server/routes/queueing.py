@@ -1,7 +1,8 @@
-from typing import Any
+from typing import Any, Optional
 
 from fastapi import APIRouter, Depends
 
+from app.server.encoder.json_encoder import FastJSONResponse
 from app.server.models.queueing import ApproveInterestRequest, MarkInterestedRequest, MarkSaleCompleteRequest
 from app.server.services import queueing
 from app.server.static.enums import Role
@@ -17,9 +18,9 @@ async def mark_interested(params: MarkInterestedRequest, user_data=Depends(JWTAu
 
 
 @router.get('/queueing/get_interested_listings', summary='Get all the listings that the user is interested in')
-async def get_interested_listings(page: int = 1, page_size: int = 10, user_data=Depends(JWTAuthUser([Role.STUDENT]))) -> dict[str, Any]:
-    data = await queueing.get_interested_listings(user_data, page, page_size)
-    return {'data': data, 'status': 'SUCCESS'}
+async def get_interested_listings(page: int = 1, page_size: int = 10, cursor: Optional[str] = None, user_data=Depends(JWTAuthUser([Role.STUDENT]))) -> dict[str, Any]:
+    data = await queueing.get_interested_listings(user_data, page, page_size, cursor)
+    return FastJSONResponse({'data': data['data'], 'metadata': data['metadata'], 'status': 'SUCCESS'})
 
 
 @router.put('/queueing/mark_sale_complete', summary='Mark a sale as complete and update all user status who are interested in the listing')
@@ -41,6 +42,6 @@ async def reject_interest(params: MarkSaleCompleteRequest, user_data=Depends(JWT
 
 
 @router.get('/queueing/get_listing_interactions/{listing_id}', summary='Get all the users who are interested in a listing or seller details in case of buyer')
-async def get_listing_interactions(listing_id: str, user_data=Depends(JWTAuthUser([Role.STUDENT]))) -> dict[str, Any]:
-    data = await queueing.get_listing_interactions(listing_id, user_data)
-    return {'data': data, 'status': 'SUCCESS'}
+async def get_listing_interactions(listing_id: str, page: int = 1, page_size: int = 10, cursor: Optional[str] = None, user_data=Depends(JWTAuthUser([Role.STUDENT]))) -> dict[str, Any]:
+    data = await queueing.get_listing_interactions(listing_id, user_data, page, page_size, cursor)
+    return FastJSONResponse({'data': data['data'], 'metadata': data['metadata'], 'status': 'SUCCESS'})
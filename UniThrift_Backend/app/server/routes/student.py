@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Optional
 
 from fastapi import APIRouter, Body, Depends
 
@@ -55,6 +55,6 @@ async def get_student(user_data=Depends(JWTAuthUser([Role.STUDENT]))) -> dict[st
 
 
 @router.get('/student/get_all_students', summary='Gets all users in paginated form')
-async def get_all_students(page: int = 1, page_size: int = 10, _token=Depends(JWTAuthUser([Role.ADMIN]))) -> dict[str, Any]:
-    data = await student.get_students(page=page, page_size=page_size)
+async def get_all_students(page: int = 1, page_size: int = 10, cursor: Optional[str] = None, _token=Depends(JWTAuthUser([Role.ADMIN]))) -> dict[str, Any]:
+    data = await student.get_students(page=page, page_size=page_size, cursor=cursor)
     return {'data': data, 'status': 'SUCCESS'}
@@ -1,17 +1,17 @@
-import asyncio
 from datetime import timedelta
 from typing import Any, Optional
 
 from fastapi import HTTPException, status
 
 import app.server.database.core_data as core_service
+from app.server.database.profiler import slow_query_log
 from app.server.models.auth import EmailLoginRequest, OtpCreateDB, OtpRequest, VerificationType, VerifyOtpRequest
 from app.server.models.password import PasswordCreateDB
 from app.server.models.users import AdminUpdateDB, AdminUpdateRequest, AdminUserCreateDB, AdminUserCreateRequest
 from app.server.static import constants, localization
 from app.server.static.collections import Collections
-from app.server.static.enums import Role, TokenType
-from app.server.utils import crypto_utils, date_utils, password_utils, template_util, token_util
+from app.server.static.enums import Role, TokenType, TotalCount
+from app.server.utils import auth_cache, date_utils, password_utils, template_util, token_util
 from app.server.vendor.twilio import email as email_service
 
 
@@ -42,8 +42,7 @@ async def create_user(params: AdminUserCreateRequest) -> dict[str, Any]:
     user_data['user_type'] = Role.ADMIN
     user_data['is_verified'] = False
     password = user_data.pop('password')
-    # password = crypto_utils.sha1(password)
-    encrypted_password = crypto_utils.sha256(password)
+    encrypted_password = await password_utils.hash_password(password)
     # Running transactions in mongo. Transactions require cluster setup.
     # If any db operation within the content of a transaction fails, the entire transaction is rolled back.
     async with await core_service.get_session() as session:
@@ -54,7 +53,7 @@ async def create_user(params: AdminUserCreateRequest) -> dict[str, Any]:
             password_data = {'user_id': create_user_res['_id'], 'password': encrypted_password}
             password_data = PasswordCreateDB(**password_data)
             password_data = password_data.dict(exclude_none=True)
-            await core_service.update_one(Collections.PASSWORD, data_filter={'user_id': create_user_res['_id']}, update={'$set': password_data}, upsert=True, session=session)
+            await core_service.update_one_lean(Collections.PASSWORD, data_filter={'user_id': create_user_res['_id']}, update={'$set': password_data}, upsert=True, session=session)
 
     return {'message': 'Admin user created successfully'}
 
@@ -92,10 +91,11 @@ async def login(params: EmailLoginRequest) -> dict[str, Any]:
     if not existing_password:
         raise HTTPException(status.HTTP_404_NOT_FOUND, localization.EXCEPTION_USER_NOT_FOUND)
 
-    password_utils.check_password(params.password, existing_password['password'])
+    if new_password_hash := await password_utils.check_password(params.password, existing_password['password']):
+        await core_service.update_one_lean(Collections.PASSWORD, data_filter={'user_id': existing_user['_id']}, update={'$set': {'password': new_password_hash}})
     token_payload = {'user_id': existing_user['_id'], 'user_type': existing_user['user_type']}
     token_data = await create_login_token(token_payload)
-    asyncio.create_task(core_service.update_one(Collections.USERS, data_filter={'_id': existing_user['_id']}, update={'$set': {'last_login': date_utils.get_current_timestamp()}}))
+    token_util.update_last_login(existing_user['_id'])
     return {**token_data, 'user_id': existing_user['_id'], 'user_type': existing_user['user_type']}
 
 
@@ -137,6 +137,7 @@ async def refresh_access_token(token: str):
     access_token, access_token_expiry = token_util.create_jwt_token(refresh_token_payload, timedelta(days=1))
     del refresh_token_payload['token_type']
     await core_service.create_one(Collections.ACCESS_TOKENS, {**refresh_token_payload, 'access_token': access_token, 'refresh_token': token})
+    await auth_cache.invalidate_user(refresh_token_payload['user_id'])
     return {'access_token': access_token, 'access_token_expiry': access_token_expiry}
 
 
@@ -159,11 +160,18 @@ async def send_otp(params: OtpRequest):
 
     otp = password_utils.generate_random_otp(6)
 
-    otp_data = {'user_id': existing_user['_id'], 'otp': otp, 'is_used': False, 'used_for': params.verification_type, 'expiry': date_utils.get_timestamp(expires_delta=timedelta(hours=1))}
+    otp_data = {
+        'user_id': existing_user['_id'],
+        'otp': otp,
+        'is_used': False,
+        'used_for': params.verification_type,
+        'expiry': date_utils.get_timestamp(expires_delta=timedelta(hours=1)),
+        'expires_at': date_utils.get_date_time(expires_delta=timedelta(hours=1)),
+    }
 
     otp_data = OtpCreateDB(**otp_data)
     otp_data = otp_data.dict(exclude_none=True)
-    await core_service.update_one(Collections.OTP, data_filter={'user_id': existing_user['_id']}, update={'$set': otp_data}, upsert=True)
+    await core_service.update_one_lean(Collections.OTP, data_filter={'user_id': existing_user['_id']}, update={'$set': otp_data}, upsert=True)
 
     # send email with default password and unique id
     if params.verification_type == VerificationType.AUTHENTICATION:
@@ -213,26 +221,25 @@ async def verify_otp(params: VerifyOtpRequest):
 
     if user_data['verification_type'] == VerificationType.FORGOT_PASSWORD:
         password = user_data['password']
-        # password = crypto_utils.sha1(password)
-        encrypted_password = crypto_utils.sha256(password)
+        encrypted_password = await password_utils.hash_password(password)
         password_data = {'user_id': existing_user['_id'], 'password': encrypted_password}
         password_data = PasswordCreateDB(**password_data)
         password_data = password_data.dict(exclude_none=True)
-        await core_service.update_one(Collections.PASSWORD, data_filter={'user_id': password_data['user_id']}, update={'$set': password_data}, upsert=True)
+        await core_service.update_one_lean(Collections.PASSWORD, data_filter={'user_id': password_data['user_id']}, update={'$set': password_data}, upsert=True)
 
         # return {'message': 'Password updated successfully'}
 
     else:
         async with await core_service.get_session() as session:
             async with session.start_transaction():
-                await core_service.update_one(Collections.USERS, data_filter={'_id': existing_user['_id']}, update={'$set': {'is_verified': True}}, upsert=True, session=session)
+                await core_service.update_one_lean(Collections.USERS, data_filter={'_id': existing_user['_id']}, update={'$set': {'is_verified': True}}, upsert=True, session=session)
 
-                await core_service.update_one(Collections.OTP, data_filter={'user_id': existing_user['_id']}, update={'$set': {'is_used': True}}, upsert=True, session=session)
+                await core_service.update_one_lean(Collections.OTP, data_filter={'user_id': existing_user['_id']}, update={'$set': {'is_used': True}}, upsert=True, session=session)
 
     return {'message': 'User verified successfully'}
 
 
-async def get_users_paginated(page: int, page_size: int, search_query: Optional[str]) -> list[dict[str, Any]]:
+async def get_users_paginated(page: int, page_size: int, search_query: Optional[str], cursor: Optional[str] = None) -> list[dict[str, Any]]:
     """
     Get a paginated list of users.
 
@@ -240,6 +247,7 @@ async def get_users_paginated(page: int, page_size: int, search_query: Optional[
         page (int): The page number to retrieve.
         page_size (int): The number of items to retrieve per page.
         search_query (Optional[str]): A query string to filter the users by name.
+        cursor (Optional[str]): Cursor of the page to retrieve, takes precedence over page.
 
     Returns:
         list[dict[str, Any]]: A list of dictionaries representing the users.
@@ -247,9 +255,11 @@ async def get_users_paginated(page: int, page_size: int, search_query: Optional[
     Raises:
         None
     """
-    aggregate_query: list[dict[str, Any]] = [{'$match': {'name': {'$regex': search_query, '$options': 'i'}}}, {'$sort': {'name': 1}}] if search_query else [{'$sort': {'name': 1}}]
+    aggregate_query: list[dict[str, Any]] = [{'$match': {'name': {'$regex': search_query, '$options': 'i'}}}] if search_query else []
 
-    return await core_service.query_read(collection_name=Collections.USERS, aggregate=aggregate_query, page=page, page_size=page_size, paging_data=True)
+    return await core_service.query_read(
+        collection_name=Collections.USERS, aggregate=aggregate_query, page=page, page_size=page_size, paging_data=True, sort={'name': 1}, cursor=cursor, total_count=TotalCount.CACHED
+    )
 
 
 async def get_an_user(user_id: str) -> dict[str, Any]:
@@ -291,12 +301,13 @@ async def admin_update(params: AdminUpdateRequest, user_data) -> dict[str, Any]:
     params = AdminUpdateDB(**params)
 
     # await core_service.update_one(Collections.USERS, data_filter={'email': params.email}, update={'$set': user_data}, upsert=True)
-    await core_service.update_one(Collections.USERS, data_filter={'_id': user_data.get('user_id')}, update={'$set': params.dict(exclude_none=True)}, upsert=True)
+    await core_service.update_one_lean(Collections.USERS, data_filter={'_id': user_data.get('user_id')}, update={'$set': params.dict(exclude_none=True)}, upsert=True)
+    await auth_cache.invalidate_user(user_data.get('user_id'))
 
     return {'message': 'User updated successfully'}
 
 
-async def get_users(page: int, page_size: int, search_query: Optional[str]) -> list[dict[str, Any]]:
+async def get_users(page: int, page_size: int, search_query: Optional[str], cursor: Optional[str] = None) -> list[dict[str, Any]]:
     """
     Get a paginated list of students.
 
@@ -304,6 +315,7 @@ async def get_users(page: int, page_size: int, search_query: Optional[str]) -> l
         page (int): The page number to retrieve.
         page_size (int): The number of items to retrieve per page.
         search_query (Optional[str]): A query string to filter the students by name.
+        cursor (Optional[str]): Cursor of the page to retrieve, takes precedence over page.
 
     Returns:
         list[dict[str, Any]]: A list of dictionaries representing the students.
@@ -311,9 +323,11 @@ async def get_users(page: int, page_size: int, search_query: Optional[str]) -> l
     Raises:
         None
     """
-    aggregate_query: list[dict[str, Any]] = [{'$match': {'name': {'$regex': search_query, '$options': 'i'}}}, {'$sort': {'name': 1}}] if search_query else [{'$sort': {'name': 1}}]
+    aggregate_query: list[dict[str, Any]] = [{'$match': {'name': {'$regex': search_query, '$options': 'i'}}}] if search_query else []
 
-    return await core_service.query_read(collection_name=Collections.USERS, aggregate=aggregate_query, page=page, page_size=page_size, paging_data=True)
+    return await core_service.query_read(
+        collection_name=Collections.USERS, aggregate=aggregate_query, page=page, page_size=page_size, paging_data=True, sort={'name': 1}, cursor=cursor, total_count=TotalCount.CACHED
+    )
 
 
 async def get_user(user_data: dict[str, Any]) -> dict[str, Any]:
@@ -403,6 +417,25 @@ async def get_total_revenue() -> dict[str, Any]:
     return await core_service.query_read(collection_name=Collections.LISTINGS, aggregate=aggregate_query, paging_data=False)
 
 
+async def get_slow_queries(reset: bool = False) -> list[dict[str, Any]]:
+    """
+    Retrieve the slow queries recorded by this worker, grouped by collection, operation and filter shape.
+
+    Each entry holds the call count and latency, the last sampled plan summary with its COLLSCAN flag, the compound
+    index proposed for the shape and the registered index already covering it, if any.
+
+    Args:
+        reset (bool): Whether to clear the recorded queries after reading them.
+
+    Returns:
+        list[dict[str, Any]]: The recorded shapes, slowest total time first.
+    """
+    report = slow_query_log.report()
+    if reset:
+        slow_query_log.reset()
+    return report
+
+
 async def get_admin(user_data: dict[str, Any]) -> dict[str, Any]:
     """Get student details
 
@@ -1,4 +1,5 @@
-from typing import Any
+import asyncio
+from typing import Any, Optional
 
 from fastapi import HTTPException, status
 
@@ -7,29 +8,52 @@ from app.server.static import localization
 from app.server.static.collections import Collections
 from app.server.static.enums import ListingStatus
 
+# only the fields shown on the listing details page are read from the related documents, `_id` is kept in the user
+# projection so a user without a name still reads back as an existing document
+USER_NAME_OPTIONS = {'first_name': 1, 'last_name': 1}
+TRANSACTION_COMMENTS_OPTIONS = {'_id': 0, 'comments': 1}
 
-async def get_sold_listings(user_data: dict[str, Any], page: int, page_size: int) -> list[dict[str, Any]]:
+
+async def get_sold_listings(user_data: dict[str, Any], page: int, page_size: int, cursor: Optional[str] = None) -> dict[str, Any]:
     """Get a paginated list of Listings that the buyer is interested in.
     Args:
         user_data (dict[str, Any]): User token data
         page (int): The page number to retrieve.
         page_size (int): The number of items to retrieve per page.
+        cursor (Optional[str]): Cursor of the page to retrieve, takes precedence over page.
     Returns:
-        dict[str, Any]: _description_
+        dict[str, Any]: The Listings of the page and the pagination metadata.
     """
-    return await core_service.read_many(collection_name=Collections.LISTINGS, data_filter={'seller_id': user_data['user_id'], 'status': ListingStatus.SOLD}, page=page, page_size=page_size)
+    return await core_service.read_many(
+        collection_name=Collections.LISTINGS,
+        data_filter={'seller_id': user_data['user_id'], 'status': ListingStatus.SOLD},
+        sort={'updated_at': -1},
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        paging_data=True,
+    )
 
 
-async def get_purchased_listings(user_data: dict[str, Any], page: int, page_size: int) -> list[dict[str, Any]]:
+async def get_purchased_listings(user_data: dict[str, Any], page: int, page_size: int, cursor: Optional[str] = None) -> dict[str, Any]:
     """Get a paginated list of Listings that the buyer is interested in.
     Args:
         user_data (dict[str, Any]): User token data
         page (int): The page number to retrieve.
         page_size (int): The number of items to retrieve per page.
+        cursor (Optional[str]): Cursor of the page to retrieve, takes precedence over page.
     Returns:
-        dict[str, Any]: _description_
+        dict[str, Any]: The Listings of the page and the pagination metadata.
     """
-    return await core_service.read_many(collection_name=Collections.LISTINGS, data_filter={'buyer_id': user_data['user_id'], 'status': ListingStatus.SOLD}, page=page, page_size=page_size)
+    return await core_service.read_many(
+        collection_name=Collections.LISTINGS,
+        data_filter={'buyer_id': user_data['user_id'], 'status': ListingStatus.SOLD},
+        sort={'updated_at': -1},
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        paging_data=True,
+    )
 
 
 async def get_listing_details(listing_id: str, user_data: dict[str, Any]) -> dict[str, Any]:
@@ -46,9 +70,11 @@ async def get_listing_details(listing_id: str, user_data: dict[str, Any]) -> dic
         raise HTTPException(status.HTTP_404_NOT_FOUND, localization.EXCEPTION_LISTING_NOT_FOUND)
     if user_data['user_id'] != listing_details['seller_id'] and user_data['user_id'] != listing_details['buyer_id']:
         raise HTTPException(status.HTTP_403_FORBIDDEN, localization.EXCEPTION_FORBIDDEN_ACCESS)
-    seller_data = await core_service.read_one(Collections.USERS, data_filter={'_id': listing_details['seller_id']})
-    buyer_data = await core_service.read_one(Collections.USERS, data_filter={'_id': listing_details['buyer_id']})
-    transaction_data = await core_service.read_one(Collections.TRANSACTIONS, data_filter={'listing_id': listing_id, 'buyer_id': listing_details['buyer_id']})
+    seller_data, buyer_data, transaction_data = await asyncio.gather(
+        core_service.read_one(Collections.USERS, data_filter={'_id': listing_details['seller_id']}, options=USER_NAME_OPTIONS),
+        core_service.read_one(Collections.USERS, data_filter={'_id': listing_details['buyer_id']}, options=USER_NAME_OPTIONS),
+        core_service.read_one(Collections.TRANSACTIONS, data_filter={'listing_id': listing_id, 'buyer_id': listing_details['buyer_id']}, options=TRANSACTION_COMMENTS_OPTIONS),
+    )
     if not seller_data or not buyer_data:
         raise HTTPException(status.HTTP_404_NOT_FOUND, localization.EXCEPTION_USER_NOT_FOUND)
     seller_first_name = seller_data.get('first_name', '').strip() or 'N/A'
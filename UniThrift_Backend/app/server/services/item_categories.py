@@ -5,6 +5,7 @@ from bson import ObjectId
 from fastapi import HTTPException, status
 
 import app.server.database.core_data as core_service
+from app.server.database import item_catalog
 from app.server.models.item_categories import ItemCreateDB, ItemCreateRequest, ItemUpdateDB, ItemUpdateRequest
 from app.server.static import localization
 from app.server.static.collections import Collections
@@ -12,30 +13,30 @@ from app.server.static.collections import Collections
 pydantic.json.ENCODERS_BY_TYPE[ObjectId] = str
 
 
-async def get_items(page: int, page_size: int, search_query: Optional[str]) -> list[dict[str, Any]]:
+async def get_items(page: int, page_size: int, search_query: Optional[str]) -> dict[str, Any]:
     """
-    Get a paginated list of students.
+    Get a paginated list of items from the in memory catalog.
     Args:
         page (int): The page number to retrieve.
         page_size (int): The number of items to retrieve per page.
-        search_query (Optional[str]): A query string to filter the students by name.
+        search_query (Optional[str]): A case insensitive prefix to filter the items by name.
 
     Returns:
-        list[dict[str, Any]]: A list of dictionaries representing the students.
+        dict[str, Any]: The items of the page sorted by name, and the pagination metadata.
     Raises:
         None
     """
-    data_filter = {'is_deleted': False}
+    return await item_catalog.search_items(search_query, page, page_size)
 
-    if search_query:
-        data_filter['item_name'] = {'$regex': search_query, '$options': 'i'}
 
-    pipeline: list[dict[str, Any]] = [{'$match': data_filter}, {'$sort': {'name': 1}}]
-    # aggregate_query: list[dict[str, Any]] = [{'$match': base_filter}, {'$sort': {'name': 1}}]
-
-    # aggregate_query: list[dict[str, Any]] = [{'$match': {'name': {'$regex': search_query, '$options': 'i'}}}, {'$sort': {'name': 1}}] if search_query else [{'$sort': {'name': 1}}]
+async def get_catalog_version() -> int:
+    """
+    Get the version of the item catalog, to key the cached pages of items.
 
-    return await core_service.query_read(collection_name=Collections.ITEMS, aggregate=pipeline, page=page, page_size=page_size, paging_data=True)
+    Returns:
+        int: The version of the catalog snapshot served by this worker.
+    """
+    return await item_catalog.get_version()
 
 
 async def get_item_details(item_data: str) -> dict[str, Any]:
@@ -62,7 +63,8 @@ async def add_item(params: ItemCreateRequest) -> dict[str, Any]:
     if existing_item:
         raise HTTPException(status.HTTP_409_CONFLICT, localization.EXCEPTION_EXISTING_ITEM)
     item_data = ItemCreateDB(**item_data).dict(exclude_none=True)
-    await core_service.update_one(Collections.ITEMS, data_filter={'item_name': params.item_name}, update={'$set': item_data}, upsert=True)
+    await core_service.update_one_lean(Collections.ITEMS, data_filter={'item_name': params.item_name}, update={'$set': item_data}, upsert=True)
+    await item_catalog.invalidate()
     return {'message': 'Item created successfully'}
 
 
@@ -81,7 +83,8 @@ async def update_item_details(item_id: str, params: ItemUpdateRequest) -> dict[s
     if not item_data:
         raise HTTPException(status.HTTP_404_NOT_FOUND, localization.EXCEPTION_ITEM_NOT_FOUND)
     params = ItemUpdateDB(**params.dict(exclude_none=True))
-    await core_service.update_one(Collections.ITEMS, data_filter={'_id': item_data.get('_id')}, update={'$set': params.dict(exclude_none=True)}, upsert=True)
+    await core_service.update_one_lean(Collections.ITEMS, data_filter={'_id': item_data.get('_id')}, update={'$set': params.dict(exclude_none=True)}, upsert=True)
+    await item_catalog.invalidate()
 
     return {'message': 'Item updated successfully'}
 
@@ -99,5 +102,6 @@ async def delete_item(item_id: str) -> dict[str, Any]:
     item_data = await core_service.read_one(collection_name=Collections.ITEMS, data_filter={'_id': item_id, 'is_deleted': False})
     if not item_data:
         raise HTTPException(status.HTTP_404_NOT_FOUND, localization.EXCEPTION_ITEM_NOT_FOUND)
-    await core_service.update_one(Collections.ITEMS, data_filter={'_id': item_id}, update={'$set': params}, upsert=False)
+    await core_service.update_one_lean(Collections.ITEMS, data_filter={'_id': item_id}, update={'$set': params}, upsert=False)
+    await item_catalog.invalidate()
     return {'message': 'Item deleted successfully'}
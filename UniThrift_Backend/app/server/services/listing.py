@@ -3,6 +3,7 @@ from typing import Any, Optional
 from fastapi import HTTPException, status
 
 import app.server.database.core_data as core_service
+from app.server.database import item_catalog
 from app.server.models.listing import ListingCreateDB, ListingCreateRequest, ListingImageRequest, ListingUpdateDB, ListingUpdateRequest
 from app.server.static import localization
 from app.server.static.collections import Collections
@@ -26,7 +27,7 @@ async def create_listing(params: ListingCreateRequest, user_data: dict[str, any]
     """
     listing_data = params.dict()
 
-    existing_item = await core_service.read_one(Collections.ITEMS, data_filter={'_id': params.item_id})
+    existing_item = await item_catalog.get_item(params.item_id)
     if not existing_item:
         raise HTTPException(status.HTTP_404_NOT_FOUND, localization.EXCEPTION_ITEM_NOT_FOUND)
 
@@ -42,7 +43,7 @@ async def create_listing(params: ListingCreateRequest, user_data: dict[str, any]
     return {'listing_id': listing_data.get('_id')}
 
 
-async def get_all_listings(item_id: Optional[str], page: int, page_size: int) -> list[dict[str, Any]]:
+async def get_all_listings(item_id: Optional[str], page: int, page_size: int, cursor: Optional[str] = None) -> dict[str, Any]:
     """
     Get a paginated list of Listings.
 
@@ -50,9 +51,10 @@ async def get_all_listings(item_id: Optional[str], page: int, page_size: int) ->
         item_id (Optional[str]): Optional item id to filter the listings.
         page (int): The page number to retrieve.
         page_size (int): The number of items to retrieve per page.
+        cursor (Optional[str]): Cursor of the page to retrieve, takes precedence over page.
 
     Returns:
-        list[dict[str, Any]]: A list of dictionaries representing the Listings.
+        dict[str, Any]: The Listings of the page and the pagination metadata.
 
     Raises:
         None
@@ -60,14 +62,14 @@ async def get_all_listings(item_id: Optional[str], page: int, page_size: int) ->
     # data_filter = {{"status": {"$in": [ListingStatus.ON_HOLD, ListingStatus.NEW]}}, 'is_deleted': False}
     data_filter = {'$and': [{'status': {'$in': [ListingStatus.ON_HOLD, ListingStatus.NEW]}}, {'status': {'$ne': ListingStatus.SOLD}}], 'is_deleted': False}
     if item_id:
-        item_details = await core_service.read_one(Collections.ITEMS, data_filter={'_id': item_id, 'is_deleted': False})
+        item_details = await item_catalog.get_item(item_id)
         if not item_details:
             raise HTTPException(status.HTTP_404_NOT_FOUND, localization.EXCEPTION_ITEM_NOT_FOUND)
 
         data_filter['item_name'] = item_details['item_name']
 
     sort_filter = {'updated_at': -1}
-    return await core_service.read_many(collection_name=Collections.LISTINGS, data_filter=data_filter, sort=sort_filter, page=page, page_size=page_size)
+    return await core_service.read_many(collection_name=Collections.LISTINGS, data_filter=data_filter, sort=sort_filter, page=page, page_size=page_size, cursor=cursor, paging_data=True)
 
 
 async def get_listing_by_id(listing_id: str) -> dict[str, Any]:
@@ -86,19 +88,26 @@ async def get_listing_by_id(listing_id: str) -> dict[str, Any]:
     return await core_service.read_one(collection_name=Collections.LISTINGS, data_filter={'_id': listing_id, 'is_deleted': False})
 
 
-async def get_listings_by_user(user_data: dict[str, Any], page: int, page_size: int) -> list[dict[str, Any]]:
+async def get_listings_by_user(user_data: dict[str, Any], page: int, page_size: int, cursor: Optional[str] = None) -> dict[str, Any]:
     """Get all listing of a user
 
     Args:
         user_data (dict[str, Any]): User token data
         page (int): The page number to retrieve.
         page_size (int): The number of items to retrieve per page.
+        cursor (Optional[str]): Cursor of the page to retrieve, takes precedence over page.
 
     Returns:
-        dict[str, Any]: _description_
+        dict[str, Any]: The Listings of the page and the pagination metadata.
     """
     return await core_service.read_many(
-        collection_name=Collections.LISTINGS, data_filter={'seller_id': user_data['user_id'], 'is_deleted': False}, sort={'updated_at': -1}, page=page, page_size=page_size
+        collection_name=Collections.LISTINGS,
+        data_filter={'seller_id': user_data['user_id'], 'is_deleted': False},
+        sort={'updated_at': -1},
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        paging_data=True,
     )
 
 
@@ -126,7 +135,7 @@ async def update_listing(listing_id: str, params: ListingUpdateRequest, user_dat
 
     params = ListingUpdateDB(**params.dict(exclude_none=True))
 
-    await core_service.update_one(Collections.LISTINGS, data_filter={'_id': listing_data.get('_id')}, update={'$set': params.dict(exclude_none=True)}, upsert=True)
+    await core_service.update_one_lean(Collections.LISTINGS, data_filter={'_id': listing_data.get('_id')}, update={'$set': params.dict(exclude_none=True)}, upsert=True)
 
     return {'message': 'Listing updated successfully'}
 
@@ -158,7 +167,7 @@ async def delete_listing(listing_id: str, user_data: dict[str, Any]) -> dict[str
 
     params = {'is_deleted': True}
 
-    await core_service.update_one(Collections.LISTINGS, data_filter={'_id': listing_id}, update={'$set': params}, upsert=False)
+    await core_service.update_one_lean(Collections.LISTINGS, data_filter={'_id': listing_id}, update={'$set': params}, upsert=False)
 
     return {'message': 'Listing deleted successfully'}
 
@@ -189,7 +198,7 @@ async def generate_image_upload_url(params: ListingImageRequest, user_data: dict
         async with session.start_transaction():
             params = ListingUpdateDB(**params.dict(exclude_none=True))
 
-            await core_service.update_one(Collections.LISTINGS, data_filter={'_id': listing_data.get('_id')}, update={'$set': params.dict(exclude_none=True)}, upsert=True)
+            await core_service.update_one_lean(Collections.LISTINGS, data_filter={'_id': listing_data.get('_id')}, update={'$set': params.dict(exclude_none=True)}, upsert=True)
 
             presigned_put_url = await generate_presigned_put(key)
 
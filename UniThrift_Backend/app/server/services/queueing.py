@@ -1,8 +1,9 @@
-from typing import Any
+from typing import Any, Optional
 
 from fastapi import HTTPException, status
 
 import app.server.database.core_data as core_service
+from app.server.database import loader
 from app.server.models.queueing import MarkInterestedRequest, MarkSaleCompleteRequest, TransactionCreateDB
 from app.server.static import localization
 from app.server.static.collections import Collections
@@ -39,26 +40,36 @@ async def mark_interested(params: MarkInterestedRequest, user_data: dict[str, an
     return {'message': 'Seller has been notified about your interest in the item'}
 
 
-async def get_interested_listings(user_data: dict[str, Any], page: int, page_size: int) -> list[dict[str, Any]]:
+async def get_interested_listings(user_data: dict[str, Any], page: int, page_size: int, cursor: Optional[str] = None) -> dict[str, Any]:
     """Get a paginated list of Listings that the buyer is interested in.
 
+    The listing details are joined to the transactions of the page in the same aggregation.
+
     Args:
         user_data (dict[str, Any]): User token data
         page (int): The page number to retrieve.
         page_size (int): The number of items to retrieve per page.
+        cursor (Optional[str]): Cursor of the page to retrieve, takes precedence over page.
 
     Returns:
-        dict[str, Any]: _description_
+        dict[str, Any]: The transactions with the listing title, seller_id and price, and the pagination metadata.
     """
-    interested_listings = await core_service.read_many(
-        collection_name=Collections.TRANSACTIONS, data_filter={'buyer_id': user_data['user_id'], 'status': {'$in': [SaleStatus.INTERESTED, SaleStatus.SHARE_DETAILS]}}, page=page, page_size=page_size
+    aggregate_query = [{'$match': {'buyer_id': user_data['user_id'], 'status': {'$in': [SaleStatus.INTERESTED, SaleStatus.SHARE_DETAILS]}}}]
+    listing_lookup = [
+        {
+            '$lookup': {
+                'from': Collections.LISTINGS,
+                'let': {'listing_id': '$listing_id'},
+                'pipeline': [{'$match': {'$expr': {'$eq': ['$_id', '$$listing_id']}}}, {'$project': {'_id': 0, 'title': 1, 'seller_id': 1, 'price': 1}}],
+                'as': 'listing',
+            }
+        },
+        {'$addFields': {field: {'$arrayElemAt': [f'$listing.{field}', 0]} for field in ('title', 'seller_id', 'price')}},
+        {'$project': {'listing': 0}},
+    ]
+    return await core_service.query_read(
+        collection_name=Collections.TRANSACTIONS, aggregate=aggregate_query, page=page, page_size=page_size, paging_data=True, sort={'updated_at': -1}, cursor=cursor, page_aggregate=listing_lookup
     )
-    for listing in interested_listings:
-        listing_details = await core_service.read_one(Collections.LISTINGS, data_filter={'_id': listing['listing_id']})
-        listing['title'] = listing_details['title']
-        listing['seller_id'] = listing_details['seller_id']
-        listing['price'] = listing_details['price']
-    return interested_listings
 
 
 async def mark_sale_complete(params: MarkSaleCompleteRequest, user_data: dict[str, any]) -> dict[str, Any]:
@@ -87,8 +98,8 @@ async def mark_sale_complete(params: MarkSaleCompleteRequest, user_data: dict[st
     interest_reject_update = {'status': SaleStatus.REJECTED}
     async with await core_service.get_session() as session:
         async with session.start_transaction():
-            await core_service.update_one(Collections.LISTINGS, data_filter={'_id': params.listing_id}, update={'$set': sale_update}, upsert=False, session=session)
-            await core_service.update_one(
+            await core_service.update_one_lean(Collections.LISTINGS, data_filter={'_id': params.listing_id}, update={'$set': sale_update}, upsert=False, session=session)
+            await core_service.update_one_lean(
                 Collections.TRANSACTIONS, data_filter={'listing_id': params.listing_id, 'buyer_id': params.buyer_id}, update={'$set': interest_sale_update}, upsert=False, session=session
             )
             await core_service.update_many(
@@ -123,8 +134,8 @@ async def share_contact(params: MarkSaleCompleteRequest, user_data: dict[str, an
     interest_sale_update = {'status': SaleStatus.SHARE_DETAILS}
     async with await core_service.get_session() as session:
         async with session.start_transaction():
-            await core_service.update_one(Collections.LISTINGS, data_filter={'_id': params.listing_id}, update={'$set': sale_update}, upsert=False, session=session)
-            await core_service.update_one(
+            await core_service.update_one_lean(Collections.LISTINGS, data_filter={'_id': params.listing_id}, update={'$set': sale_update}, upsert=False, session=session)
+            await core_service.update_one_lean(
                 Collections.TRANSACTIONS, data_filter={'listing_id': params.listing_id, 'buyer_id': params.buyer_id}, update={'$set': interest_sale_update}, upsert=False, session=session
             )
     return {'message': 'Your contact details have been shared with the buyer'}
@@ -153,35 +164,74 @@ async def reject_interest(params: MarkSaleCompleteRequest, user_data: dict[str,
         raise HTTPException(status.HTTP_403_FORBIDDEN, localization.EXCEPTION_INTEREST_NOT_FOUND)
 
     interest_sale_update = {'status': SaleStatus.REJECTED}
-    await core_service.update_one(Collections.TRANSACTIONS, data_filter={'listing_id': params.listing_id, 'buyer_id': params.buyer_id}, update={'$set': interest_sale_update}, upsert=False)
+    await core_service.update_one_lean(Collections.TRANSACTIONS, data_filter={'listing_id': params.listing_id, 'buyer_id': params.buyer_id}, update={'$set': interest_sale_update}, upsert=False)
 
     return {'message': 'Interest rejected successfully'}
 
 
-async def get_listing_interactions(listing_id: str, user_data: dict[str, Any]) -> dict[str, Any]:
+async def get_listing_interactions(listing_id: str, user_data: dict[str, Any], page: int, page_size: int, cursor: Optional[str] = None) -> dict[str, Any]:
     """Get all interactions between buyer and seller related to a listing.
 
+    The listing is probed once to find out whether the user is its seller, anyone else is treated as a buyer.
+
     Args:
         user_data (dict[str, Any]): User token data
         listing_id (str): The listing id to retrieve interactions
+        page (int): The page number of interested buyers to retrieve, seller only.
+        page_size (int): The number of interested buyers to retrieve per page, seller only.
+        cursor (Optional[str]): Cursor of the page to retrieve, takes precedence over page, seller only.
     Returns:
-        dict[str, Any]: All interested buyers and their details in case of seller.
-                        Status updates from seller in case of buyer
+        dict[str, Any]: A page of interested buyers with their names and the pagination metadata in case of seller.
+                        Status updates from seller in case of buyer, with empty metadata
     """
-    result = {}
-    is_seller = await core_service.read_one(Collections.LISTINGS, data_filter={'_id': listing_id, 'seller_id': user_data['user_id']})
-    is_buyer = await core_service.read_one(Collections.TRANSACTIONS, data_filter={'listing_id': listing_id, 'buyer_id': user_data['user_id']})
-    if is_seller:
-        result = await core_service.read_many(Collections.TRANSACTIONS, data_filter={'listing_id': listing_id})
-        for user in result:
-            user_details = await core_service.read_one(Collections.USERS, data_filter={'_id': user['buyer_id']})
-            user['buyer_name'] = user_details['first_name'] + ' ' + user_details['last_name']
-    elif is_buyer:
-        result = await core_service.read_one(Collections.TRANSACTIONS, data_filter={'listing_id': listing_id, 'buyer_id': user_data['user_id']})
-        if result['status'] == SaleStatus.SHARE_DETAILS:
-            listing_details = await core_service.read_one(Collections.LISTINGS, data_filter={'_id': listing_id})
-            seller_details = await core_service.read_one(Collections.USERS, data_filter={'_id': listing_details['seller_id']})
-            result['seller_name'] = seller_details['first_name'] + ' ' + seller_details['last_name']
-            result['seller_email'] = seller_details['email']
-            result['seller_phone'] = seller_details['phone']
-    return result
+    listing_details = await loader.load_one(Collections.LISTINGS, listing_id)
+    if not listing_details:
+        return {'data': {}, 'metadata': None}
+
+    if listing_details['seller_id'] == user_data['user_id']:
+        return await get_interested_buyers(listing_id, page, page_size, cursor)
+
+    result = await core_service.read_one(Collections.TRANSACTIONS, data_filter={'listing_id': listing_id, 'buyer_id': user_data['user_id']})
+    if result and result['status'] == SaleStatus.SHARE_DETAILS:
+        seller_details = await loader.load_one(Collections.USERS, listing_details['seller_id'])
+        result['seller_name'] = seller_details['first_name'] + ' ' + seller_details['last_name']
+        result['seller_email'] = seller_details['email']
+        result['seller_phone'] = seller_details['phone']
+    return {'data': result or {}, 'metadata': None}
+
+
+async def get_interested_buyers(listing_id: str, page: int, page_size: int, cursor: Optional[str] = None) -> dict[str, Any]:
+    """Get a paginated list of the transactions of a listing, with the buyer names joined in the same aggregation.
+
+    Args:
+        listing_id (str): The listing id to retrieve interactions
+        page (int): The page number to retrieve.
+        page_size (int): The number of items to retrieve per page.
+        cursor (Optional[str]): Cursor of the page to retrieve, takes precedence over page.
+
+    Returns:
+        dict[str, Any]: The transactions with the buyer_name, and the pagination metadata.
+    """
+    buyer_lookup = [
+        {
+            '$lookup': {
+                'from': Collections.USERS,
+                'let': {'buyer_id': '$buyer_id'},
+                'pipeline': [{'$match': {'$expr': {'$eq': ['$_id', '$$buyer_id']}}}, {'$project': {'_id': 0, 'first_name': 1, 'last_name': 1}}],
+                'as': 'buyer',
+            }
+        },
+        {'$addFields': {'buyer': {'$arrayElemAt': ['$buyer', 0]}}},
+        {'$addFields': {'buyer_name': {'$concat': ['$buyer.first_name', ' ', '$buyer.last_name']}}},
+        {'$project': {'buyer': 0}},
+    ]
+    return await core_service.query_read(
+        collection_name=Collections.TRANSACTIONS,
+        aggregate=[{'$match': {'listing_id': listing_id}}],
+        page=page,
+        page_size=page_size,
+        paging_data=True,
+        sort={'created_at': 1},
+        cursor=cursor,
+        page_aggregate=buyer_lookup,
+    )
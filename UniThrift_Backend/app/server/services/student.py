@@ -1,6 +1,5 @@
-import asyncio
 from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 
 from fastapi import HTTPException, status
 
@@ -10,8 +9,8 @@ from app.server.models.password import PasswordCreateDB
 from app.server.models.users import UserCreateDB, UserCreateRequest, UserUpdateDB, UserUpdateRequest
 from app.server.static import constants, localization
 from app.server.static.collections import Collections
-from app.server.static.enums import Role, TokenType
-from app.server.utils import crypto_utils, date_utils, password_utils, template_util, token_util
+from app.server.static.enums import Role, TokenType, TotalCount
+from app.server.utils import auth_cache, date_utils, password_utils, template_util, token_util
 from app.server.vendor.twilio import email as email_service
 
 
@@ -44,8 +43,7 @@ async def create_user(params: UserCreateRequest) -> dict[str, Any]:
     user_data['user_type'] = Role.STUDENT
     user_data['is_verified'] = False
     password = user_data.pop('password')
-    # password = crypto_utils.sha1(password)
-    encrypted_password = crypto_utils.sha256(password)
+    encrypted_password = await password_utils.hash_password(password)
     # Running transactions in mongo. Transactions require cluster setup.
     # If any db operation within the content of a transaction fails, the entire transaction is rolled back.
     async with await core_service.get_session() as session:
@@ -56,7 +54,7 @@ async def create_user(params: UserCreateRequest) -> dict[str, Any]:
             password_data = {'user_id': create_user_res['_id'], 'password': encrypted_password}
             password_data = PasswordCreateDB(**password_data)
             password_data = password_data.dict(exclude_none=True)
-            await core_service.update_one(Collections.PASSWORD, data_filter={'user_id': create_user_res['_id']}, update={'$set': password_data}, upsert=True, session=session)
+            await core_service.update_one_lean(Collections.PASSWORD, data_filter={'user_id': create_user_res['_id']}, update={'$set': password_data}, upsert=True, session=session)
 
     return {'message': 'User created successfully'}
 
@@ -99,6 +97,7 @@ async def refresh_access_token(token: str):
     access_token, access_token_expiry = token_util.create_jwt_token(refresh_token_payload, timedelta(days=1))
     del refresh_token_payload['token_type']
     await core_service.create_one(Collections.ACCESS_TOKENS, {**refresh_token_payload, 'access_token': access_token, 'refresh_token': token})
+    await auth_cache.invalidate_user(refresh_token_payload['user_id'])
     return {'access_token': access_token, 'access_token_expiry': access_token_expiry}
 
 
@@ -133,10 +132,11 @@ async def login(params: EmailLoginRequest) -> dict[str, Any]:
     if not existing_password:
         raise HTTPException(status.HTTP_404_NOT_FOUND, localization.EXCEPTION_USER_NOT_FOUND)
 
-    password_utils.check_password(params.password, existing_password['password'])
+    if new_password_hash := await password_utils.check_password(params.password, existing_password['password']):
+        await core_service.update_one_lean(Collections.PASSWORD, data_filter={'user_id': existing_user['_id']}, update={'$set': {'password': new_password_hash}})
     token_payload = {'user_id': existing_user['_id'], 'user_type': existing_user['user_type']}
     token_data = await create_login_token(token_payload)
-    asyncio.create_task(core_service.update_one(Collections.USERS, data_filter={'_id': existing_user['_id']}, update={'$set': {'last_login': date_utils.get_current_timestamp()}}))
+    token_util.update_last_login(existing_user['_id'])
     return {**token_data, 'user_id': existing_user['_id'], 'user_type': existing_user['user_type']}
 
 
@@ -159,11 +159,18 @@ async def send_otp(params: OtpRequest):
 
     otp = password_utils.generate_random_otp(6)
 
-    otp_data = {'user_id': existing_user['_id'], 'otp': otp, 'is_used': False, 'used_for': params.verification_type, 'expiry': date_utils.get_timestamp(expires_delta=timedelta(hours=1))}
+    otp_data = {
+        'user_id': existing_user['_id'],
+        'otp': otp,
+        'is_used': False,
+        'used_for': params.verification_type,
+        'expiry': date_utils.get_timestamp(expires_delta=timedelta(hours=1)),
+        'expires_at': date_utils.get_date_time(expires_delta=timedelta(hours=1)),
+    }
 
     otp_data = OtpCreateDB(**otp_data)
     otp_data = otp_data.dict(exclude_none=True)
-    await core_service.update_one(Collections.OTP, data_filter={'user_id': existing_user['_id']}, update={'$set': otp_data}, upsert=True)
+    await core_service.update_one_lean(Collections.OTP, data_filter={'user_id': existing_user['_id']}, update={'$set': otp_data}, upsert=True)
     # send email with default password and unique id
     if params.verification_type == VerificationType.AUTHENTICATION:
         template_path = constants.VERIFICATION_TEMPLATE_PATH
@@ -212,37 +219,36 @@ async def verify_otp(params: VerifyOtpRequest):
 
     if user_data['verification_type'] == VerificationType.FORGOT_PASSWORD:
         password = user_data['password']
-        # password = crypto_utils.sha1(password)
-        encrypted_password = crypto_utils.sha256(password)
+        encrypted_password = await password_utils.hash_password(password)
         password_data = {'user_id': existing_user['_id'], 'password': encrypted_password}
         password_data = PasswordCreateDB(**password_data)
         password_data = password_data.dict(exclude_none=True)
         async with await core_service.get_session() as session:
             async with session.start_transaction():
-                await core_service.update_one(Collections.PASSWORD, data_filter={'user_id': password_data['user_id']}, update={'$set': password_data}, upsert=True)
+                await core_service.update_one_lean(Collections.PASSWORD, data_filter={'user_id': password_data['user_id']}, update={'$set': password_data}, upsert=True)
 
-                await core_service.update_one(Collections.OTP, data_filter={'user_id': existing_user['_id']}, update={'$set': {'is_used': True}}, upsert=True, session=session)
+                await core_service.update_one_lean(Collections.OTP, data_filter={'user_id': existing_user['_id']}, update={'$set': {'is_used': True}}, upsert=True, session=session)
 
         # return {'message': 'Password updated successfully'}
 
     else:
         async with await core_service.get_session() as session:
             async with session.start_transaction():
-                await core_service.update_one(Collections.USERS, data_filter={'_id': existing_user['_id']}, update={'$set': {'is_verified': True}}, upsert=True, session=session)
+                await core_service.update_one_lean(Collections.USERS, data_filter={'_id': existing_user['_id']}, update={'$set': {'is_verified': True}}, upsert=True, session=session)
 
-                await core_service.update_one(Collections.OTP, data_filter={'user_id': existing_user['_id']}, update={'$set': {'is_used': True}}, upsert=True, session=session)
+                await core_service.update_one_lean(Collections.OTP, data_filter={'user_id': existing_user['_id']}, update={'$set': {'is_used': True}}, upsert=True, session=session)
 
     return {'message': 'User verified successfully'}
 
 
-async def get_students(page: int, page_size: int) -> list[dict[str, Any]]:
+async def get_students(page: int, page_size: int, cursor: Optional[str] = None) -> list[dict[str, Any]]:
     """
     Get a paginated list of students.
 
     Args:
         page (int): The page number to retrieve.
         page_size (int): The number of items to retrieve per page.
-        search_query (Optional[str]): A query string to filter the students by name.
+        cursor (Optional[str]): Cursor of the page to retrieve, takes precedence over page.
 
     Returns:
         list[dict[str, Any]]: A list of dictionaries representing the students.
@@ -252,7 +258,7 @@ async def get_students(page: int, page_size: int) -> list[dict[str, Any]]:
     """
     aggregate_query: list[dict[str, Any]] = [{'$match': {'user_type': Role.STUDENT}}]
 
-    return await core_service.query_read(Collections.USERS, aggregate=aggregate_query, page=page, page_size=page_size, paging_data=True)
+    return await core_service.query_read(Collections.USERS, aggregate=aggregate_query, page=page, page_size=page_size, paging_data=True, sort={'_id': 1}, cursor=cursor, total_count=TotalCount.CACHED)
 
 
 async def get_student(user_data: dict[str, Any]) -> dict[str, Any]:
@@ -291,6 +297,7 @@ async def student_update(params: UserUpdateRequest, user_data: dict[str, Any]) -
 
     params = UserUpdateDB(**params)
 
-    await core_service.update_one(Collections.USERS, data_filter={'_id': user_data.get('user_id')}, update={'$set': params.dict(exclude_none=True)}, upsert=True)
+    await core_service.update_one_lean(Collections.USERS, data_filter={'_id': user_data.get('user_id')}, update={'$set': params.dict(exclude_none=True)}, upsert=True)
+    await auth_cache.invalidate_user(user_data.get('user_id'))
 
     return {'message': 'User updated successfully'}
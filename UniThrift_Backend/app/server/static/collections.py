@@ -14,3 +14,5 @@ class Collections:
     LISTINGS = 'listings'
     UNIVERSITIES = 'universities'
     TRANSACTIONS = 'transactions'
+    CATALOG_VERSIONS = 'catalog_versions'
+    AUTH_INVALIDATIONS = 'auth_invalidations'
@@ -44,3 +44,10 @@ class SaleStatus(str, Enum):
     SHARE_DETAILS = 'SHARE_DETAILS'
     SOLD = 'SOLD'
     REJECTED = 'REJECTED'
+
+
+class TotalCount(str, Enum):
+    EXACT = 'EXACT'
+    CACHED = 'CACHED'
+    ESTIMATED = 'ESTIMATED'
+    NONE = 'NONE'
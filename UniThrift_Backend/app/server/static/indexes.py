@@ -0,0 +1,47 @@
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+from app.server.static.collections import Collections
+
+# partial filter of indexes which only cover documents that are not soft deleted
+ACTIVE_ONLY = {'is_deleted': False}
+
+# the expired OTPs are kept a day so that they are still answered as expired rather than not found
+OTP_RETENTION_SECONDS = 24 * 60 * 60
+# the invalidations are polled by the auth caches every few seconds, a day covers a worker stalled for long
+AUTH_INVALIDATION_RETENTION_SECONDS = 24 * 60 * 60
+
+# Declarative index registry, every index is named explicitly so that it can be diffed against the existing indexes.
+# Options map to `createIndexes`: `unique`, `partialFilterExpression` and `expireAfterSeconds` (TTL, date fields only).
+# Timestamps are stored as epoch milliseconds which TTL indexes ignore, so the expiring collections also store a date.
+INDEXES: dict[str, list[IndexModel]] = {
+    Collections.USERS: [
+        IndexModel([('first_name', TEXT), ('last_name', TEXT)], name='first_name_text_last_name_text'),
+        IndexModel([('email', ASCENDING)], name='email_1_active', partialFilterExpression=ACTIVE_ONLY),
+        IndexModel([('email', ASCENDING), ('user_type', ASCENDING)], name='email_1_user_type_1'),
+        IndexModel([('university_id', ASCENDING)], name='university_id_1_active', partialFilterExpression=ACTIVE_ONLY),
+        IndexModel([('phone', ASCENDING)], name='phone_1_active', partialFilterExpression=ACTIVE_ONLY),
+    ],
+    Collections.LISTINGS: [
+        IndexModel([('seller_id', ASCENDING), ('updated_at', DESCENDING)], name='seller_id_1_updated_at_-1_active', partialFilterExpression=ACTIVE_ONLY),
+        IndexModel([('seller_id', ASCENDING), ('status', ASCENDING), ('updated_at', DESCENDING)], name='seller_id_1_status_1_updated_at_-1'),
+        IndexModel([('buyer_id', ASCENDING), ('status', ASCENDING), ('updated_at', DESCENDING)], name='buyer_id_1_status_1_updated_at_-1'),
+        IndexModel([('status', ASCENDING), ('item_name', ASCENDING), ('updated_at', DESCENDING)], name='status_1_item_name_1_updated_at_-1_active', partialFilterExpression=ACTIVE_ONLY),
+    ],
+    Collections.TRANSACTIONS: [
+        IndexModel([('listing_id', ASCENDING), ('buyer_id', ASCENDING)], name='listing_id_1_buyer_id_1'),
+        IndexModel([('buyer_id', ASCENDING), ('status', ASCENDING)], name='buyer_id_1_status_1'),
+    ],
+    Collections.ACCESS_TOKENS: [
+        IndexModel([('user_id', ASCENDING), ('access_token', ASCENDING)], name='user_id_1_access_token_1'),
+        IndexModel([('user_id', ASCENDING), ('refresh_token', ASCENDING)], name='user_id_1_refresh_token_1'),
+    ],
+    Collections.PASSWORD: [IndexModel([('user_id', ASCENDING)], name='user_id_1')],
+    Collections.OTP: [IndexModel([('user_id', ASCENDING)], name='user_id_1'), IndexModel([('expires_at', ASCENDING)], name='expires_at_1_ttl', expireAfterSeconds=OTP_RETENTION_SECONDS)],
+    Collections.CATALOG_VERSIONS: [IndexModel([('collection', ASCENDING)], name='collection_1', unique=True)],
+    Collections.AUTH_INVALIDATIONS: [
+        IndexModel([('user_id', ASCENDING)], name='user_id_1', unique=True),
+        IndexModel([('updated_at', ASCENDING)], name='updated_at_1'),
+        IndexModel([('invalidated_at', ASCENDING)], name='invalidated_at_1_ttl', expireAfterSeconds=AUTH_INVALIDATION_RETENTION_SECONDS),
+    ],
+    Collections.REQUEST_TRACKER: [IndexModel([('user_id', ASCENDING), ('ip', ASCENDING), ('path', ASCENDING)], name='user_id_1_ip_1_path_1', unique=True)],
+}
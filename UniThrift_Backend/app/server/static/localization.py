@@ -46,3 +46,7 @@ EXCEPTION_ITEM_SOLD = 'Item already sold'
 EXCEPTION_INTEREST_NOT_FOUND = 'Interest not found'
 EXCEPTION_UNAUTHORIZED_SALE = 'User is not authorized to mark sale as complete'
 EXCEPTION_UNAUTHORIZED_INTEREST = 'Seller not allowed to mark interest'
+EXCEPTION_CURSOR_INVALID = 'Invalid pagination cursor'
+EXCEPTION_REQUEST_BODY_TOO_LARGE = 'Request body is too large'
+EXCEPTION_REQUEST_BODY_INVALID = 'Request body is not valid {encoding} data'
+EXCEPTION_CONTENT_ENCODING_UNSUPPORTED = 'Unsupported content encoding'
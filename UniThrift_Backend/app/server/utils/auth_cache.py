@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import time
+from typing import Any, Optional
+
+from pymongo.errors import PyMongoError
+
+import app.server.database.core_data as core_service
+from app.server.config import config
+from app.server.logger.custom_logger import logger
+from app.server.static.collections import Collections
+from app.server.utils import date_utils
+from app.server.utils.cache_utils import TTLCache
+
+
+def get_token_digest(token: str) -> str:
+    """Digest of a token, so that the raw tokens are not kept in memory as cache keys"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class AuthUserCache:
+    """Process local cache of the users resolved from access tokens, keyed by token digest.
+
+    Entries live at most `AUTH_USER_CACHE_TTL` seconds and never beyond the expiry of their token. A user is
+    invalidated locally at once, and in the other workers through the `auth_invalidations` collection which every
+    worker polls in the background at most every `AUTH_USER_CACHE_POLL_INTERVAL` seconds.
+    """
+
+    def __init__(self, maxsize: int = config.AUTH_USER_CACHE_SIZE, ttl: float = config.AUTH_USER_CACHE_TTL, poll_interval: float = config.AUTH_USER_CACHE_POLL_INTERVAL) -> None:
+        """
+        Args:
+            maxsize (int): Maximum number of cached tokens.
+            ttl (float): Maximum number of seconds a user is served from the cache.
+            poll_interval (float): Minimum number of seconds between two checks of the invalidations of other workers.
+        """
+        self.poll_interval = poll_interval
+        self._users = TTLCache(maxsize=maxsize, ttl=ttl)
+        # digests of the cached tokens of each user, to invalidate every token of a user at once
+        self._digests: dict[str, set[str]] = {}
+        self._checked_at = time.monotonic()
+        self._polled_at = date_utils.get_current_timestamp()
+        self._poll_task: Optional[asyncio.Task] = None
+
+    def get(self, token: str) -> Optional[dict[str, Any]]:
+        """
+        Get the cached user of a token.
+
+        Args:
+            token (str): The access token.
+
+        Returns:
+            Optional[dict[str, Any]]: The user, None if it is not cached.
+        """
+        if time.monotonic() - self._checked_at >= self.poll_interval and (self._poll_task is None or self._poll_task.done()):
+            self._checked_at = time.monotonic()
+            self._poll_task = asyncio.create_task(self._poll())
+        return self._users.get(get_token_digest(token))
+
+    def set(self, token: str, user: dict[str, Any], expires_at: Optional[float] = None) -> None:
+        """
+        Cache the user of a token.
+
+        Args:
+            token (str): The access token.
+            user (dict[str, Any]): The user resolved from the token.
+            expires_at (Optional[float], optional): The `exp` claim of the token in seconds since the epoch. Defaults to None.
+        """
+        ttl = self._users.ttl if expires_at is None else min(self._users.ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        digest = get_token_digest(token)
+        self._users.set(digest, user, ttl=ttl)
+        self._digests.setdefault(user['_id'], set()).add(digest)
+
+    def evict(self, user_id: str) -> None:
+        """Drop every cached token of a user in this worker"""
+        for digest in self._digests.pop(user_id, ()):
+            self._users.pop(digest)
+
+    async def invalidate(self, user_id: str) -> None:
+        """
+        Drop every cached token of a user in every worker, after the user or its tokens changed.
+
+        Args:
+            user_id (str): The id of the user.
+        """
+        self.evict(user_id)
+        # invalidated_at is the date field of the TTL index, the invalidations are only polled for a few seconds
+        update = {'$inc': {'version': 1}, '$set': {'invalidated_at': date_utils.get_current_date_time()}}
+        await core_service.update_one_lean(Collections.AUTH_INVALIDATIONS, data_filter={'user_id': user_id}, update=update, upsert=True)
+
+    def clear(self) -> None:
+        """Drop every cached token in this worker"""
+        self._users.clear()
+        self._digests.clear()
+
+    async def _poll(self) -> None:
+        # overlap the previous poll so that invalidations written by workers with a slightly late clock are not missed
+        polled_at = date_utils.get_current_timestamp()
+        since = self._polled_at - config.AUTH_USER_CACHE_CLOCK_SKEW_MS
+        try:
+            invalidations = await core_service.read_many(Collections.AUTH_INVALIDATIONS, data_filter={'updated_at': {'$gt': since}}, options={'_id': 0, 'user_id': 1})
+        except PyMongoError as error:
+            logger.error(f'Failed to read the auth cache invalidations: {error}')
+            return
+        for invalidation in invalidations:
+            self.evict(invalidation['user_id'])
+        self._polled_at = polled_at
+        # drop the digest sets of users whose tokens have all expired or been evicted
+        self._digests = {user_id: digests for user_id, digests in self._digests.items() if any(digest in self._users for digest in digests)}
+
+
+auth_user_cache = AuthUserCache()
+
+
+async def invalidate_user(user_id: str) -> None:
+    """
+    Drop the cached tokens of a user in every worker after its profile, status or tokens changed.
+
+    Args:
+        user_id (str): The id of the user.
+    """
+    await auth_user_cache.invalidate(user_id)
@@ -0,0 +1,105 @@
+import zlib
+from collections.abc import Iterable
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is only offered when installed
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd is only offered when installed
+    zstandard = None
+
+# supported response encodings, most preferred first when the client accepts several with the same weight
+ENCODINGS: tuple[str, ...] = tuple(encoding for encoding, available in (('br', brotli), ('zstd', zstandard), ('gzip', True)) if available)
+
+# levels of the responses compressed per request, cheap enough to stay below the cost of sending the body
+DYNAMIC_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 6}
+# levels of the responses compressed once and served many times from a cache, the highest levels of brotli and zstd
+# are left out since they take hundreds of ms on a large page, on the event loop
+STATIC_LEVELS = {'br': 9, 'zstd': 12, 'gzip': 9}
+
+
+def negotiate_encoding(accept_encoding: str, encodings: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """
+    Choose the response encoding from the `Accept-Encoding` header of a request.
+
+    Args:
+        accept_encoding (str): The header value, e.g. `gzip, deflate, br;q=0.9`.
+        encodings (Iterable[str]): The encodings the response is available in, most preferred first.
+
+    Returns:
+        Optional[str]: The accepted encoding with the highest weight, None to send the response uncompressed.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        coding, _, parameters = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for parameter in parameters.split(';'):
+            name, _, value = parameter.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    """
+    Compress a whole body.
+
+    Args:
+        data (bytes): The body.
+        encoding (str): One of `ENCODINGS`.
+        level (int): The compression level of the encoding.
+
+    Returns:
+        bytes: The compressed body.
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class StreamCompressor:
+    """Incremental compressor of a body sent in several chunks"""
+
+    def __init__(self, encoding: str, level: int) -> None:
+        """
+        Args:
+            encoding (str): One of `ENCODINGS`.
+            level (int): The compression level of the encoding.
+        """
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=level)
+            self._compress, self._flush = self._compressor.process, self._compressor.finish
+        elif encoding == 'zstd':
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+            self._compress, self._flush = self._compressor.compress, self._compressor.flush
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress, self._flush = self._compressor.compress, self._compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress the next chunk, the output may be empty until enough data was buffered"""
+        return self._compress(data)
+
+    def flush(self) -> bytes:
+        """Finish the stream and return the buffered output"""
+        return self._flush()
@@ -0,0 +1,130 @@
+import base64
+import binascii
+from typing import Any, Optional
+
+import orjson
+from fastapi import HTTPException, status
+
+from app.server.static import localization
+
+TIEBREAKER_KEY = '_id'
+
+
+def get_keyset_sort(sort: Optional[dict[str, int]]) -> dict[str, int]:
+    """
+    Returns the sort specification with the `_id` tiebreaker appended so that the ordering is total.
+
+    Args:
+        sort (Optional[dict[str, int]]): Dictionary of fields to specify the sorting order.
+
+    Returns:
+        dict[str, int]: Sort specification ending with the `_id` key.
+    """
+    sort = dict(sort or {})
+    sort.setdefault(TIEBREAKER_KEY, 1)
+    return sort
+
+
+def encode_cursor(document: dict[str, Any], sort: dict[str, int]) -> str:
+    """
+    Encodes the sort key values of a document into an opaque cursor token.
+
+    Args:
+        document (dict[str, Any]): The last document of the current page.
+        sort (dict[str, int]): The keyset sort specification used to fetch the page.
+
+    Returns:
+        str: A url safe cursor token.
+    """
+    payload = {'k': list(sort), 'v': [document.get(key) for key in sort]}
+    return base64.urlsafe_b64encode(orjson.dumps(payload)).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: dict[str, int]) -> list[Any]:
+    """
+    Decodes a cursor token into the sort key values it was created from.
+
+    Args:
+        cursor (str): The cursor token received from the client.
+        sort (dict[str, int]): The keyset sort specification of the current query.
+
+    Raises:
+        HTTPException: If the cursor is malformed or was created for a different sort order.
+
+    Returns:
+        list[Any]: Sort key values in the order of the sort specification.
+    """
+    try:
+        payload = orjson.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        keys, values = payload['k'], payload['v']
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError, ValueError) as error:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, localization.EXCEPTION_CURSOR_INVALID) from error
+
+    if keys != list(sort) or len(values) != len(keys):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, localization.EXCEPTION_CURSOR_INVALID)
+    return values
+
+
+def get_keyset_filter(sort: dict[str, int], values: list[Any]) -> dict[str, Any]:
+    """
+    Builds the filter matching every document positioned after the cursor values for the given sort.
+
+    For sort keys (a, b, _id) this produces
+    `a > va OR (a == va AND b > vb) OR (a == va AND b == vb AND _id > vid)`, with the comparison flipped for descending keys.
+    Null and missing values sort before every other value, so they come after the cursor value of a descending key.
+
+    Args:
+        sort (dict[str, int]): The keyset sort specification.
+        values (list[Any]): Sort key values decoded from the cursor.
+
+    Returns:
+        dict[str, Any]: Filter to be combined with the query filter.
+    """
+    clauses = []
+    equality: dict[str, Any] = {}
+    for (key, direction), value in zip(sort.items(), values):
+        if value is None:
+            # null sorts before every other value, so only non null values come after it in ascending order
+            if direction == 1:
+                clauses.append({**equality, key: {'$ne': None}})
+        elif direction == 1:
+            clauses.append({**equality, key: {'$gt': value}})
+        else:
+            # `$lt` never matches null, the null and missing values which sort last in descending order are matched apart
+            clauses.append({**equality, key: {'$lt': value}})
+            clauses.append({**equality, key: None})
+        equality[key] = value
+    return {'$or': clauses} if clauses else {TIEBREAKER_KEY: {'$exists': False}}
+
+
+def add_keyset_filter(data_filter: Optional[dict[str, Any]], sort: dict[str, int], cursor: str) -> dict[str, Any]:
+    """
+    Combines the query filter with the keyset filter of the given cursor.
+
+    Args:
+        data_filter (Optional[dict[str, Any]]): The query filter.
+        sort (dict[str, int]): The keyset sort specification.
+        cursor (str): The cursor token received from the client.
+
+    Returns:
+        dict[str, Any]: The combined filter.
+    """
+    keyset_filter = get_keyset_filter(sort, decode_cursor(cursor, sort))
+    return {'$and': [data_filter, keyset_filter]} if data_filter else keyset_filter
+
+
+def get_next_cursor(documents: list[dict[str, Any]], sort: Optional[dict[str, int]], has_next_page: bool) -> Optional[str]:
+    """
+    Returns the cursor pointing after the last document of the page, if there is a next page.
+
+    Args:
+        documents (list[dict[str, Any]]): Documents of the current page.
+        sort (Optional[dict[str, int]]): The keyset sort specification.
+        has_next_page (bool): Whether more documents are available after this page.
+
+    Returns:
+        Optional[str]: The next cursor token.
+    """
+    if not (has_next_page and documents and sort):
+        return None
+    return encode_cursor(documents[-1], sort)
@@ -56,6 +56,19 @@ def get_timestamp(expires_delta: timedelta = timedelta(hours=1)) -> int:
     return int(timestamp_seconds * 1000)
 
 
+def get_date_time(expires_delta: timedelta = timedelta(hours=1)) -> datetime.datetime:
+    """
+    Returns the date and time in UTC timezone after the given time delta, stored as a BSON date for TTL indexes.
+
+    Args:
+        expires_delta: A timedelta object representing the time delta to add to the current time. Defaults to 1 hour.
+
+    Returns:
+        datetime.datetime: A datetime object in UTC timezone.
+    """
+    return datetime.datetime.now(timezone.utc) + expires_delta
+
+
 def get_current_date_time() -> datetime.datetime:
     """
     Returns the current date and time in UTC timezone.
@@ -1,8 +1,114 @@
-import pymongo
+import asyncio
+from typing import Any, Optional
 
+from pymongo import TEXT, IndexModel
+from pymongo.errors import PyMongoError
+
+from app.server.config import config
 from app.server.database.db import mongo
-from app.server.static.collections import Collections
+from app.server.logger.custom_logger import logger
+from app.server.static.indexes import INDEXES
+
+# options which define an index, a change in any of them requires the index to be rebuilt
+_INDEX_OPTIONS = ('unique', 'partialFilterExpression', 'sparse')
+
+# reference to the background index build so that it is not garbage collected while running
+_index_build_task: Optional[asyncio.Task] = None
+
+
+def _is_same_key(current: dict[str, Any], document: dict[str, Any]) -> bool:
+    """Whether an existing index has the keys of the declared index, text indexes are stored as `_fts` with weights"""
+    key = list(document['key'].items())
+    if any(direction == TEXT for _, direction in key):
+        return set(current.get('weights', {})) == {field for field, direction in key if direction == TEXT}
+    return [tuple(item) for item in current['key']] == key
+
+
+def _get_index_changes(existing: dict[str, dict[str, Any]], indexes: list[IndexModel]) -> tuple[list[IndexModel], list[IndexModel], list[str]]:
+    """
+    Diff the declared indexes of a collection against its existing indexes.
+
+    Args:
+        existing (dict[str, dict[str, Any]]): The existing indexes keyed by name, as returned by `index_information`.
+        indexes (list[IndexModel]): The declared indexes of the collection.
+
+    Returns:
+        tuple[list[IndexModel], list[IndexModel], list[str]]: The indexes to build, the indexes whose TTL changed and the
+            names of the indexes which differ from their declaration and have to be rebuilt manually.
+    """
+    missing, ttl_changed, conflicts = [], [], []
+    for index in indexes:
+        document = index.document
+        current = existing.get(document['name'])
+        if current is None:
+            missing.append(index)
+        elif not _is_same_key(current, document) or any(current.get(option) != document.get(option) for option in _INDEX_OPTIONS):
+            conflicts.append(document['name'])
+        elif current.get('expireAfterSeconds') != document.get('expireAfterSeconds'):
+            ttl_changed.append(index)
+    return missing, ttl_changed, conflicts
+
+
+async def sync_collection_indexes(collection_name: str, indexes: list[IndexModel], rebuild_changed: bool = config.MONGO_REBUILD_CHANGED_INDEXES) -> list[str]:
+    """
+    Build the declared indexes of a collection which do not exist yet and update changed TTLs.
+
+    Existing indexes that are not declared are left untouched. An index whose keys or options differ from its
+    declaration is only reported unless `rebuild_changed` is set, since dropping it could make a hot query fall back to
+    a collection scan until it is built again.
+
+    Args:
+        collection_name (str): The name of the collection.
+        indexes (list[IndexModel]): The declared indexes of the collection.
+        rebuild_changed (bool): Whether to drop and rebuild the indexes which differ from their declaration.
+
+    Returns:
+        list[str]: The names of the indexes created.
+    """
+    collection = mongo.get_collection(collection_name)
+    existing = await collection.index_information()
+    missing, ttl_changed, conflicts = _get_index_changes(existing, indexes)
+
+    for name in conflicts:
+        if not rebuild_changed:
+            logger.warning(f'Index {collection_name}.{name} does not match its declaration, drop it to rebuild')
+            continue
+        logger.warning(f'Index {collection_name}.{name} does not match its declaration, rebuilding it')
+        await collection.drop_index(name)
+        missing.extend(index for index in indexes if index.document['name'] == name)
+
+    for index in ttl_changed:
+        document = index.document
+        await mongo.command('collMod', collection_name, index={'name': document['name'], 'expireAfterSeconds': document['expireAfterSeconds']})
+
+    if not missing:
+        return []
+    return await collection.create_indexes(missing)
+
+
+async def sync_indexes(registry: dict[str, list[IndexModel]] = None) -> None:
+    """
+    Sync the indexes of every collection in the registry, a failure on one collection does not stop the others.
+
+    Args:
+        registry (dict[str, list[IndexModel]], optional): Declared indexes keyed by collection. Defaults to INDEXES.
+    """
+    for collection_name, indexes in (registry or INDEXES).items():
+        try:
+            if created := await sync_collection_indexes(collection_name, indexes):
+                logger.debug(f'Created indexes on {collection_name}: {created}')
+        except PyMongoError as error:
+            logger.error(f'Failed to sync indexes of {collection_name}: {error}')
+
 
+def create_indexes() -> asyncio.Task:
+    """
+    Start building the missing indexes in the background so that the application startup is not blocked.
 
-async def create_indexes():
-    await mongo.get_collection(Collections.USERS).create_index([('first_name', pymongo.TEXT), ('last_name', pymongo.TEXT)], background=True)
+    Returns:
+        asyncio.Task: The background index build.
+    """
+    global _index_build_task  # pylint: disable=global-statement
+    if _index_build_task is None or _index_build_task.done():
+        _index_build_task = asyncio.create_task(sync_indexes())
+    return _index_build_task
@@ -1,12 +1,25 @@
+import abc
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
 import secrets
 import string
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from fastapi import HTTPException, status
 
+from app.server.config import config
 from app.server.static import localization
 from app.server.utils import crypto_utils
 
+try:
+    import argon2
+except ImportError:  # pragma: no cover - argon2 is only offered when installed
+    argon2 = None
+
 
 def generate_random_password(length):
     # Combine all alphanumeric characters (letters and digits)
@@ -21,9 +34,215 @@ def generate_random_otp(length):
     return ''.join(secrets.choice(characters) for _ in range(length))
 
 
-def check_password(password: Optional[str], password_hash: Optional[str]):
-    # password = crypto_utils.sha1(password)
-    password_received = crypto_utils.sha256(password)
-    if password_received != password_hash:
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip('=')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + '=' * (-len(data) % 4))
+
+
+class PasswordVerifier(abc.ABC):
+    """Checks passwords against the stored hashes of one algorithm, `identify` tells the hashes it is able to verify"""
+
+    algorithm: str = ''
+
+    @abc.abstractmethod
+    def verify(self, password: str, password_hash: str) -> bool:
+        """Whether the password matches the hash, False as well when the stored hash is malformed"""
+
+    @abc.abstractmethod
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Whether the hash uses other parameters than the configured ones"""
+
+    def identify(self, password_hash: str) -> bool:
+        """Whether the hash was produced by this algorithm"""
+        return password_hash.startswith(f'${self.algorithm}$')
+
+
+class PasswordHasher(PasswordVerifier):
+    """Key derivation function producing self describing hash strings, `$<algorithm>$<parameters>$<salt>$<digest>`.
+
+    The algorithm and parameters stored in a hash are the ones used to verify it, so the configured hasher or its cost
+    can change while the existing hashes keep working, `needs_rehash` tells the ones to upgrade on the next login.
+    """
+
+    @abc.abstractmethod
+    def hash(self, password: str) -> str:
+        """Hash a password with a new random salt"""
+
+
+class ScryptHasher(PasswordHasher):
+    algorithm = 'scrypt'
+
+    def __init__(self, log_n: int = 14, r: int = 8, p: int = 1, salt_size: int = 16, digest_size: int = 32) -> None:
+        self.log_n, self.r, self.p = log_n, r, p
+        self.salt_size, self.digest_size = salt_size, digest_size
+
+    def _derive(self, password: str, salt: bytes, log_n: int, r: int, p: int, digest_size: int) -> bytes:
+        n = 1 << log_n
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=digest_size)
+
+    def _parameters(self) -> str:
+        return f'ln={self.log_n},r={self.r},p={self.p}'
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(self.salt_size)
+        digest = self._derive(password, salt, self.log_n, self.r, self.p, self.digest_size)
+        return f'${self.algorithm}${self._parameters()}${_b64encode(salt)}${_b64encode(digest)}'
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        try:
+            _, _, parameters, salt, digest = password_hash.split('$')
+            values = dict(parameter.split('=') for parameter in parameters.split(','))
+            expected = _b64decode(digest)
+            derived = self._derive(password, _b64decode(salt), int(values['ln']), int(values['r']), int(values['p']), len(expected))
+        except (ValueError, KeyError, binascii.Error):
+            return False
+        return hmac.compare_digest(derived, expected)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return password_hash.split('$')[2] != self._parameters()
+
+
+class Pbkdf2Hasher(PasswordHasher):
+    algorithm = 'pbkdf2-sha256'
+
+    def __init__(self, iterations: int = 600000, salt_size: int = 16, digest_size: int = 32) -> None:
+        self.iterations, self.salt_size, self.digest_size = iterations, salt_size, digest_size
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(self.salt_size)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, self.iterations, self.digest_size)
+        return f'${self.algorithm}${self.iterations}${_b64encode(salt)}${_b64encode(digest)}'
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        try:
+            _, _, iterations, salt, digest = password_hash.split('$')
+            expected = _b64decode(digest)
+            derived = hashlib.pbkdf2_hmac('sha256', password.encode(), _b64decode(salt), int(iterations), len(expected))
+        except (ValueError, binascii.Error):
+            return False
+        return hmac.compare_digest(derived, expected)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return int(password_hash.split('$')[2]) != self.iterations
+
+
+class Argon2Hasher(PasswordHasher):
+    """Argon2id through `argon2-cffi`, whose hashes already follow the `$argon2id$v=19$m=...,t=...,p=...$...` format"""
+
+    algorithm = 'argon2id'
+
+    def __init__(self, **parameters) -> None:
+        self._hasher = argon2.PasswordHasher(**parameters)
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        try:
+            return self._hasher.verify(password_hash, password)
+        except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHashError):
+            return False
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self._hasher.check_needs_rehash(password_hash)
+
+
+class LegacySha256Verifier(PasswordVerifier):
+    """The unsalted SHA256 hex digests stored before the key derivation functions, only verified and always rehashed"""
+
+    algorithm = 'sha256'
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        # compared as bytes, strings with non ASCII characters are refused by compare_digest
+        return hmac.compare_digest(crypto_utils.sha256(password).encode(), password_hash.encode())
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return True
+
+    def identify(self, password_hash: str) -> bool:
+        return not password_hash.startswith('$')
+
+
+HASHERS: dict[str, type[PasswordHasher]] = {'scrypt': ScryptHasher, 'pbkdf2-sha256': Pbkdf2Hasher}
+if argon2:
+    HASHERS['argon2id'] = Argon2Hasher
+
+
+def _create_hasher(name: str) -> PasswordHasher:
+    """
+    Create the hasher configured by `PASSWORD_HASHER`.
+
+    Args:
+        name (str): The algorithm name.
+
+    Raises:
+        ValueError: Raised if the algorithm is unknown, or is argon2id without `argon2-cffi` installed.
+
+    Returns:
+        PasswordHasher: The hasher of the new hashes.
+    """
+    if name == Argon2Hasher.algorithm and not argon2:
+        raise ValueError('PASSWORD_HASHER=argon2id requires the argon2-cffi package')
+    if name not in HASHERS:
+        raise ValueError(f'Unknown PASSWORD_HASHER {name!r}, expected one of {", ".join(HASHERS)}')
+    return HASHERS[name]()
+
+
+# the hasher of the new hashes, and the ones the stored hashes are verified with
+hasher: PasswordHasher = _create_hasher(config.PASSWORD_HASHER)
+_verifiers: list[PasswordVerifier] = [hasher] + [hasher_class() for name, hasher_class in HASHERS.items() if name != config.PASSWORD_HASHER] + [LegacySha256Verifier()]
+
+# scrypt, PBKDF2 and argon2 release the GIL, a few threads hash in parallel without blocking the event loop while the
+# bounded number of workers keeps a burst of logins from taking every core
+_executor = ThreadPoolExecutor(max_workers=config.PASSWORD_HASH_WORKERS, thread_name_prefix='password-hasher')
+
+
+def _get_verifier(password_hash: str) -> PasswordVerifier:
+    for verifier in _verifiers:
+        if verifier.identify(password_hash):
+            return verifier
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=localization.EXCEPTION_PASSWORD_INVALID)
+
+
+def _check_password(password: str, password_hash: str) -> Optional[str]:
+    verifier = _get_verifier(password_hash)
+    if not verifier.verify(password, password_hash):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=localization.EXCEPTION_PASSWORD_INVALID)
+    if verifier is not hasher or hasher.needs_rehash(password_hash):
+        return hasher.hash(password)
+    return None
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hash a password with the configured hasher, on the password hashing pool.
+
+    Args:
+        password (str): The plain text password.
+
+    Returns:
+        str: The versioned hash string to store.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_executor, hasher.hash, password)
+
+
+async def check_password(password: Optional[str], password_hash: Optional[str]) -> Optional[str]:
+    """
+    Verify a password against its stored hash, on the password hashing pool.
+
+    Args:
+        password (Optional[str]): The plain text password.
+        password_hash (Optional[str]): The stored hash, of any supported algorithm.
+
+    Raises:
+        HTTPException: Raised if the password does not match.
+
+    Returns:
+        Optional[str]: A new hash to store when the stored one uses an older algorithm or cost, None otherwise.
+    """
+    if not password or not password_hash:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=localization.EXCEPTION_PASSWORD_INVALID)
-    return True
+    return await asyncio.get_running_loop().run_in_executor(_executor, _check_password, password, password_hash)
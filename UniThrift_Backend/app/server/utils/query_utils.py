@@ -1,3 +1,7 @@
+import copy
+from typing import Any, Optional
+
+
 def get_agg_projections(*args, include=True):
     projection = get_projections(*args, include)
     return {'$project': projection}
@@ -5,3 +9,56 @@ def get_agg_projections(*args, include=True):
 
 def get_projections(*args, include=True):
     return {arg: 1 if include else 0 for arg in args}
+
+
+def apply_projection(document: dict[str, Any], projection: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Applies a find projection of fields with value 1 or 0 to a document in process, `_id` is kept unless excluded.
+
+    Args:
+        document (dict[str, Any]): The document to project.
+        projection (Optional[dict[str, Any]]): Fields with value 1 to select or 0 to de-select, dotted paths allowed.
+
+    Returns:
+        dict[str, Any]: A new document with the projection applied.
+    """
+    if not projection:
+        return dict(document)
+
+    fields = {key: bool(value) for key, value in projection.items() if key != '_id'}
+    # a projection of `_id` alone selects it, like `find` does
+    include = any(fields.values()) if fields else bool(projection.get('_id', 1))
+    if include:
+        projected = _project_paths(document, [key.split('.') for key, value in fields.items() if value])
+    else:
+        projected = copy.deepcopy(document) if any('.' in key for key in fields) else dict(document)
+        for key in fields:
+            _remove_path(projected, key.split('.'))
+
+    if projection.get('_id', 1):
+        if '_id' in document:
+            projected = {'_id': document['_id'], **projected}
+    else:
+        projected.pop('_id', None)
+    return projected
+
+
+def _project_paths(document: dict[str, Any], paths: list[list[str]]) -> dict[str, Any]:
+    projected: dict[str, Any] = {}
+    for key in document:
+        nested = [path[1:] for path in paths if path[0] == key]
+        if not nested:
+            continue
+        if any(not path for path in nested):
+            projected[key] = document[key]
+        elif isinstance(document[key], dict):
+            projected[key] = _project_paths(document[key], nested)
+    return projected
+
+
+def _remove_path(document: dict[str, Any], path: list[str]) -> None:
+    for key in path[:-1]:
+        document = document.get(key)
+        if not isinstance(document, dict):
+            return
+    document.pop(path[-1], None)
@@ -0,0 +1,89 @@
+from collections.abc import Hashable
+from typing import Any, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.server.config import config
+from app.server.encoder import json_encoder
+from app.server.utils import compression_utils
+from app.server.utils.cache_utils import TTLCache
+
+
+class PrecompressedResponse(Response):
+    """JSON response rendered once and compressed in every supported encoding, which can be sent any number of times.
+
+    The encoding is negotiated per request from `Accept-Encoding`, so serving it costs no serialization nor
+    compression. The compression middleware sends it as is since it has a `Content-Encoding`.
+    """
+
+    media_type = 'application/json'
+
+    def __init__(self, content: Any, status_code: int = 200, minimum_size: int = config.COMPRESSION_MINIMUM_SIZE) -> None:
+        """
+        Args:
+            content (Any): The response data.
+            status_code (int): The status code.
+            minimum_size (int): Bodies smaller than this are only kept uncompressed.
+        """
+        super().__init__(content=content, status_code=status_code)
+        self.variants: dict[str, bytes] = {}
+        if len(self.body) >= minimum_size:
+            self.variants = {encoding: compression_utils.compress(self.body, encoding, compression_utils.STATIC_LEVELS[encoding]) for encoding in compression_utils.ENCODINGS}
+
+    def render(self, content: Any) -> bytes:
+        return json_encoder.json_dumps(content)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # the instance is shared between requests, the headers of the chosen variant are built per request
+        encoding = compression_utils.negotiate_encoding(Headers(scope=scope).get('accept-encoding', ''), self.variants)
+        body = self.variants[encoding] if encoding else self.body
+        headers = [(key, value) for key, value in self.raw_headers if key != b'content-length']
+        headers.append((b'content-length', str(len(body)).encode()))
+        if self.variants:
+            headers.append((b'vary', b'Accept-Encoding'))
+        if encoding:
+            headers.append((b'content-encoding', encoding.encode()))
+
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+class ResponseCache:
+    """Process local cache of precompressed JSON responses, for the responses identical for every user"""
+
+    def __init__(self, maxsize: int = config.RESPONSE_CACHE_SIZE, ttl: float = config.RESPONSE_CACHE_TTL) -> None:
+        """
+        Args:
+            maxsize (int): Maximum number of cached responses.
+            ttl (float): Default number of seconds a response is served from the cache.
+        """
+        self._responses = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: Hashable) -> Optional[PrecompressedResponse]:
+        """Get the cached response of a key, None if it is missing or expired"""
+        return self._responses.get(key)
+
+    def set(self, key: Hashable, content: Any, ttl: Optional[float] = None) -> PrecompressedResponse:
+        """
+        Render, compress and cache a response.
+
+        Args:
+            key (Hashable): The cache key, identifying the route and its parameters.
+            content (Any): The response data.
+            ttl (Optional[float], optional): Number of seconds the response is served from the cache. Defaults to the cache ttl.
+
+        Returns:
+            PrecompressedResponse: The response, to be returned by the route.
+        """
+        response = PrecompressedResponse(content)
+        self._responses.set(key, response, ttl=ttl)
+        return response
+
+    def clear(self) -> None:
+        """Drop every cached response"""
+        self._responses.clear()
+
+
+response_cache = ResponseCache()
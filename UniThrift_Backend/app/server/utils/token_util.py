@@ -1,23 +1,37 @@
-import asyncio
+import contextlib
 import secrets
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Optional
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
 from fastapi.param_functions import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBasic, HTTPBasicCredentials, HTTPBearer
-from jose import jwt
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.types import Scope
 
 import app.server.database.core_data as core_service
 from app.server.config import config
+from app.server.database.write_behind import PresenceBuffer
 from app.server.handler.error_handler import CustomHTTPException
 from app.server.static import error_identifier, localization
 from app.server.static.collections import Collections
 from app.server.static.enums import TokenType
-from app.server.utils import date_utils
+from app.server.utils.auth_cache import auth_user_cache, get_token_digest
+from app.server.utils.cache_utils import TTLCache
 
 security_basic = HTTPBasic()
 
+# claims of recently verified tokens keyed by token digest, kept no longer than the token expiry
+_verified_tokens = TTLCache(maxsize=config.JWT_VERIFY_CACHE_SIZE, ttl=config.JWT_VERIFY_CACHE_TTL)
+
+# request state key of the claims of the bearer token of the request
+REQUEST_CLAIMS_KEY = 'token_claims'
+
+# debounced last_active and last_login updates of the users
+presence_updates = PresenceBuffer(Collections.USERS, config.PRESENCE_DEBOUNCE_WINDOW, config.PRESENCE_FLUSH_INTERVAL, config.PRESENCE_BUFFER_SIZE)
+
 
 def authorize_docs(credentials: HTTPBasicCredentials = Depends(security_basic)):
     correct_username = secrets.compare_digest(credentials.username, config.DOC_USERNAME)
@@ -47,7 +61,7 @@ def create_jwt_token(payload: dict[str, Any], expires_delta: timedelta = timedel
 
 
 def verify_jwt_token(token: str, remove_reserved_claims: bool = False) -> dict[str, Any]:
-    """Verifies jwt token signature
+    """Verifies jwt token signature, tokens verified recently are served from a cache until they expire
 
     Args:
         token (jwt-token): token that needs to be verified
@@ -55,7 +69,15 @@ def verify_jwt_token(token: str, remove_reserved_claims: bool = False) -> dict[s
     Returns:
         [JSON]: JSON payload of the decoded token
     """
-    decoded_token = jwt.decode(token, config.JWT_SECRET, algorithms=['HS256'])
+    digest = get_token_digest(token)
+    claims = _verified_tokens.get(digest)
+    if claims is None:
+        claims = jwt.decode(token, config.JWT_SECRET, algorithms=['HS256'])
+        ttl = min(_verified_tokens.ttl, claims['exp'] - time.time()) if 'exp' in claims else _verified_tokens.ttl
+        _verified_tokens.set(digest, claims, ttl=ttl)
+
+    # callers modify the payload, the cached claims are kept intact
+    decoded_token = dict(claims)
     if remove_reserved_claims:
         reserved_claims = ['iss', 'sub', 'aud', 'exp', 'nbf', 'iat', 'jti']
         for key in reserved_claims:
@@ -64,11 +86,53 @@ def verify_jwt_token(token: str, remove_reserved_claims: bool = False) -> dict[s
     return decoded_token
 
 
-async def update_last_active(user_id: int) -> None:
-    await core_service.update_one(Collections.USERS, data_filter={'_id': user_id}, update={'$set': {'last_active': date_utils.get_current_timestamp()}})
+def get_bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Token of a `Bearer <token>` authorization header, None if the header is missing or malformed"""
+    parts = authorization.split() if authorization else []
+    if len(parts) == 2 and parts[0].lower() == 'bearer' and parts[1] != 'null':
+        return parts[1]
+    return None
+
+
+def get_request_claims(scope: Scope) -> Optional[dict[str, Any]]:
+    """Verified claims of the bearer token of a request, decoded once per request and kept in the request state
+
+    Args:
+        scope (Scope): The ASGI scope of the request
+
+    Returns:
+        Optional[dict[str, Any]]: The claims, None if the request has no valid bearer token
+    """
+    state = scope.setdefault('state', {})
+    if REQUEST_CLAIMS_KEY not in state:
+        state[REQUEST_CLAIMS_KEY] = None
+        if token := get_bearer_token(Headers(scope=scope).get('authorization')):
+            with contextlib.suppress(JWTError):
+                state[REQUEST_CLAIMS_KEY] = verify_jwt_token(token)
+    return state[REQUEST_CLAIMS_KEY]
+
+
+def update_last_active(user_id: str) -> None:
+    presence_updates.touch(user_id, 'last_active')
+
+
+def update_last_login(user_id: str) -> None:
+    presence_updates.touch(user_id, 'last_login')
 
 
 async def get_current_user(user_data: dict[str, Any], token: str) -> dict[str, Any]:
+    """Get the active user an access token was issued to, from the auth cache when possible
+
+    Args:
+        user_data (dict[str, Any]): The verified claims of the token
+        token (str): The access token
+
+    Returns:
+        dict[str, Any]: The user, or an empty dictionary if the token is not stored or the user does not exist
+    """
+    if user := auth_user_cache.get(token):
+        return user
+
     pipelines: list[dict[str, Any]] = [
         {'$match': {'user_id': user_data['user_id'], 'user_type': user_data['user_type'], 'access_token': token}},
         {
@@ -83,7 +147,11 @@ async def get_current_user(user_data: dict[str, Any], token: str) -> dict[str, A
         {'$replaceRoot': {'newRoot': '$user'}},
     ]
     users = await core_service.query_read(Collections.ACCESS_TOKENS, pipelines)
-    return users[0] if users else {}
+    if not users:
+        return {}
+
+    auth_user_cache.set(token, users[0], expires_at=user_data.get('exp'))
+    return users[0]
 
 
 class JWTAuthUser:
@@ -110,12 +178,13 @@ class JWTAuthUser:
         self.access_levels = access_levels
         self.token_type = token_type
 
-    async def __call__(self, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    async def __call__(self, request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
         """
         Callable method to verify the authorization token and check the
         user's access levels.
 
         Args:
+            request (Request): The request, whose claims may already be decoded by the middlewares.
             credentials (HTTPAuthorizationCredentials, optional): HTTP authorization
                 credentials obtained from the HTTP Bearer token.
 
@@ -129,8 +198,10 @@ class JWTAuthUser:
         # Extract the token from the credentials
         token = credentials.credentials
 
-        # Verify the JWT token
-        token_data = verify_jwt_token(token.strip())
+        # Reuse the claims decoded earlier in the request, verify the token again only to raise its error
+        token_data = get_request_claims(request.scope)
+        if token_data is None:
+            token_data = verify_jwt_token(token.strip())
 
         # Check if the token type matches the expected token type
         if token_data['token_type'] != self.token_type:
@@ -152,6 +223,6 @@ class JWTAuthUser:
             raise CustomHTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=localization.EXCEPTION_FORBIDDEN_ACCESS, identifier=error_identifier.FORBIDDEN_ACCESS)
 
         # Update the last active time for the user
-        asyncio.create_task(update_last_active(token_data['user_id']))
+        update_last_active(token_data['user_id'])
 
         return token_data
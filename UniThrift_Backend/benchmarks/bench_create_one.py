@@ -0,0 +1,41 @@
+"""
+Latency of core_data.create_one against the previous insert + find_one read back.
+
+    python -m benchmarks.bench_create_one --latency-ms 1
+"""
+import asyncio
+
+from fastapi.encoders import jsonable_encoder
+
+import app.server.database.core_data as core_service
+from app.server.models.core_data import CreateData
+from benchmarks.mongo_latency import get_database, get_parser, measure
+
+COLLECTION = 'benchmark_create_one'
+
+
+def get_listing(i: int) -> dict:
+    return {'title': f'Listing {i}', 'item_name': 'Books', 'description': 'Description', 'price': 100, 'images': [], 'status': 'NEW', 'seller_id': 'user123'}
+
+
+async def create_one_read_back(i: int) -> dict:
+    collection = core_service.mongo.get_collection(COLLECTION)
+    data = jsonable_encoder(CreateData.parse_obj(get_listing(i)))
+    result = await collection.insert_one(data)
+    return await collection.find_one({'_id': result.inserted_id})
+
+
+async def main() -> None:
+    args = get_parser(__doc__).parse_args()
+    core_service.mongo = database = get_database(args)
+    await database.get_collection(COLLECTION).drop()
+
+    before = await measure('insert_one + find_one', args.iterations, create_one_read_back)
+    after = await measure('create_one', args.iterations, lambda i: core_service.create_one(COLLECTION, get_listing(i)))
+    print(f'saved per insert: {sum(before) / len(before) - sum(after) / len(after):.3f} ms')
+
+    await database.get_collection(COLLECTION).drop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+Cost of encoding a listing page, through FastAPI's `jsonable_encoder` path against the orjson encoding layer.
+
+The route level numbers call a FastAPI app returning the page either as a dict, validated and walked by
+`jsonable_encoder` before `ORJSONResponse` renders it, or as a `FastJSONResponse`. The document level numbers compare
+the encoding of a `CreateData` document in `core_data.create_one`.
+
+    python -m benchmarks.bench_json_encoding --iterations 2000 --rows 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Callable
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+from app.server.encoder import json_encoder
+from app.server.encoder.json_encoder import FastJSONResponse
+from app.server.models.core_data import CreateData
+from app.server.static.enums import ListingStatus
+
+
+def get_page(rows: int) -> dict[str, Any]:
+    listings = [
+        {
+            '_id': str(ObjectId()),
+            'title': f'Listing {index}',
+            'item_id': str(ObjectId()),
+            'item_name': 'Books',
+            'description': 'Gently used, pick up on campus ' * 3,
+            'price': 100 + index,
+            'images': [f'listings/{index}/{image}.jpg' for image in range(3)],
+            'status': ListingStatus.NEW,
+            'seller_id': str(ObjectId()),
+            'is_deleted': False,
+            'created_at': 1700000000000 + index,
+            'updated_at': 1700000000000 + index,
+        }
+        for index in range(rows)
+    ]
+    return {'data': listings, 'metadata': {'current_page': 1, 'page_size': rows, 'has_next_page': True, 'total_records': 5000, 'next_cursor': None}}
+
+
+def get_app(page: dict[str, Any]) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.get('/dict')
+    async def get_dict() -> dict[str, Any]:
+        return {'data': page['data'], 'metadata': page['metadata'], 'status': 'SUCCESS'}
+
+    @app.get('/fast')
+    async def get_fast() -> dict[str, Any]:
+        return FastJSONResponse({'data': page['data'], 'metadata': page['metadata'], 'status': 'SUCCESS'})
+
+    return app
+
+
+async def call(app: FastAPI, path: str) -> None:
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Future()
+
+    async def send(_message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(name: str, iterations: int, function: Callable[[], Any]) -> float:
+    """Runs the function iterations times and prints the median cost per call in microseconds"""
+    await function()
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await function()
+        timings.append((time.perf_counter() - start) / iterations * 1_000_000)
+    median = statistics.median(timings)
+    print(f'{name:<55} {median:8.2f} us per call')
+    return median
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--rows', type=int, default=100)
+    args = parser.parse_args()
+
+    page = get_page(args.rows)
+    app = get_app(page)
+    document = {key: value for key, value in page['data'][0].items() if key != '_id'}
+
+    async def encode_page_before():
+        return ORJSONResponse(jsonable_encoder({'data': page, 'status': 'SUCCESS'})).body
+
+    async def encode_page_after():
+        return FastJSONResponse({'data': page, 'status': 'SUCCESS'}).body
+
+    async def encode_document_before():
+        return jsonable_encoder(CreateData.parse_obj(document))
+
+    async def encode_document_after():
+        return json_encoder.serialize(CreateData.parse_obj(document))
+
+    before = await measure(f'route returning a dict, {args.rows} rows', args.iterations, lambda: call(app, '/dict'))
+    after = await measure(f'route returning FastJSONResponse, {args.rows} rows', args.iterations, lambda: call(app, '/fast'))
+    print(f'saved per request: {before - after:.2f} us ({before / after:.1f}x)')
+    await measure('jsonable_encoder + ORJSONResponse', args.iterations, encode_page_before)
+    await measure('FastJSONResponse', args.iterations, encode_page_after)
+    await measure('create_one document, jsonable_encoder', args.iterations, encode_document_before)
+    await measure('create_one document, json_encoder.serialize', args.iterations, encode_document_after)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""
+JWT decode cost per authenticated request, before and after the claims are shared through the request state.
+
+Before, the tracker middleware and JWTAuthUser each decoded the bearer token with python-jose. After, the first
+consumer decodes it once, through the verified token cache, and the second one reads the claims from the scope.
+
+    python -m benchmarks.bench_jwt_decode --iterations 20000
+"""
+import argparse
+import statistics
+import time
+from typing import Any, Callable
+
+from jose import jwt
+
+from app.server.config import config
+from app.server.utils import token_util
+
+
+def get_scope(token: str) -> dict[str, Any]:
+    return {'type': 'http', 'method': 'GET', 'path': '/api/v1/student/get', 'headers': [(b'authorization', f'Bearer {token}'.encode())]}
+
+
+def decode_twice(token: str) -> None:
+    for _ in range(2):
+        jwt.decode(token, config.JWT_SECRET, algorithms=['HS256'])
+
+
+def decode_once(token: str, cached: bool = True) -> None:
+    if not cached:
+        token_util._verified_tokens.clear()  # pylint: disable=protected-access
+    scope = get_scope(token)
+    for _ in range(2):
+        token_util.get_request_claims(scope)
+
+
+def measure(name: str, iterations: int, func: Callable[[], None]) -> float:
+    """Runs func iterations times and prints the mean cost per call in microseconds"""
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        timings.append((time.perf_counter() - start) / iterations * 1_000_000)
+    mean = statistics.median(timings)
+    print(f'{name:<50} {mean:8.2f} us per request')
+    return mean
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=10000)
+    args = parser.parse_args()
+
+    token, _ = token_util.create_jwt_token({'user_id': 'user123', 'user_type': 'STUDENT'})
+
+    before = measure('decode in middleware and dependency', args.iterations, lambda: decode_twice(token))
+    cold = measure('decode once per request, new token', args.iterations, lambda: decode_once(token, cached=False))
+    after = measure('decode once per request, verified token cache', args.iterations, lambda: decode_once(token))
+    print(f'saved per request: {before - cold:.2f} us without cache hits, {before - after:.2f} us with cache hits')
+
+
+if __name__ == '__main__':
+    main()
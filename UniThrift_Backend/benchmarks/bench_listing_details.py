@@ -0,0 +1,51 @@
+"""
+Latency of history.get_listing_details against the previous four sequential reads.
+
+    python -m benchmarks.bench_listing_details --latency-ms 1
+"""
+import asyncio
+
+import app.server.database.core_data as core_service
+from app.server.services import history
+from app.server.static.collections import Collections
+from app.server.static.enums import ListingStatus
+from benchmarks.mongo_latency import get_database, get_parser, measure
+
+LISTING_ID = 'benchmark_listing'
+SELLER = {'_id': 'benchmark_seller', 'first_name': 'John', 'last_name': 'Doe', 'email': 'john@example.com', 'phone': '1234567890'}
+BUYER = {'_id': 'benchmark_buyer', 'first_name': 'Daisy', 'last_name': 'Doe', 'email': 'daisy@example.com', 'phone': '0987654321'}
+LISTING = {'_id': LISTING_ID, 'title': 'Listing', 'price': 100, 'status': ListingStatus.SOLD, 'seller_id': SELLER['_id'], 'buyer_id': BUYER['_id']}
+TRANSACTION = {'_id': 'benchmark_transaction', 'listing_id': LISTING_ID, 'buyer_id': BUYER['_id'], 'comments': 'Comments'}
+SEED = {Collections.LISTINGS: [LISTING], Collections.USERS: [SELLER, BUYER], Collections.TRANSACTIONS: [TRANSACTION]}
+
+
+async def sequential_listing_details(_) -> dict:
+    listing_details = await core_service.read_one(Collections.LISTINGS, data_filter={'_id': LISTING_ID, 'status': ListingStatus.SOLD})
+    await core_service.read_one(Collections.USERS, data_filter={'_id': listing_details['seller_id']})
+    await core_service.read_one(Collections.USERS, data_filter={'_id': listing_details['buyer_id']})
+    await core_service.read_one(Collections.TRANSACTIONS, data_filter={'listing_id': LISTING_ID, 'buyer_id': listing_details['buyer_id']})
+    return listing_details
+
+
+async def remove_seed(database) -> None:
+    for collection_name, documents in SEED.items():
+        await database.get_collection(collection_name).delete_many({'_id': {'$in': [document['_id'] for document in documents]}})
+
+
+async def main() -> None:
+    args = get_parser(__doc__).parse_args()
+    core_service.mongo = database = get_database(args)
+    await remove_seed(database)
+    for collection_name, documents in SEED.items():
+        await database.get_collection(collection_name).insert_many(documents)
+
+    user_data = {'user_id': SELLER['_id']}
+    before = await measure('sequential read_one x4', args.iterations, sequential_listing_details)
+    after = await measure('get_listing_details', args.iterations, lambda _: history.get_listing_details(LISTING_ID, user_data))
+    print(f'saved per request: {sum(before) / len(before) - sum(after) / len(after):.3f} ms')
+
+    await remove_seed(database)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""
+Overhead of the middleware stack of the application on a no-op route.
+
+The stack is the one of app.main, measured against the bare route and against the same stack with the exception
+handler and the request tracker wrapped as BaseHTTPMiddleware, as they were before being rewritten as ASGI.
+
+    python -m benchmarks.bench_middleware_stack --iterations 5000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.server.logger.custom_logger import logger
+from app.server.middlewares.exceptions import ExceptionHandlerMiddleware
+from app.server.middlewares.loader import LoaderScopeMiddleware
+from app.server.middlewares.tracker import RequestsTrackerMiddleware
+
+
+class PassThroughMiddleware(BaseHTTPMiddleware):
+    """BaseHTTPMiddleware doing nothing, the per request cost of the previous implementations"""
+
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def get_app(middlewares: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/noop')
+    async def noop():
+        return {'status': 'SUCCESS'}
+
+    for middleware, options in middlewares:
+        app.add_middleware(middleware, **options)
+    return app
+
+
+STACK = [
+    (LoaderScopeMiddleware, {}),
+    (ExceptionHandlerMiddleware, {}),
+    (RequestsTrackerMiddleware, {}),
+    (GZipMiddleware, {'minimum_size': 1000}),
+    (CORSMiddleware, {'allow_origins': ['*'], 'allow_credentials': True, 'allow_methods': ['*'], 'allow_headers': ['*']}),
+]
+BASE_HTTP_STACK = STACK[:1] + [(PassThroughMiddleware, {}), (ExceptionHandlerMiddleware, {}), (PassThroughMiddleware, {}), (RequestsTrackerMiddleware, {})] + STACK[3:]
+
+
+async def call(app: FastAPI) -> None:
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/noop',
+        'raw_path': b'/noop',
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'testserver'), (b'accept-encoding', b'gzip'), (b'origin', b'http://example.com')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        # like a server, wait for the disconnect once the body is read
+        if messages:
+            return messages.pop()
+        await asyncio.Future()
+
+    async def send(_message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(name: str, iterations: int, app: FastAPI) -> float:
+    """Calls the app iterations times and prints the mean cost per request in microseconds"""
+    await call(app)
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await call(app)
+        timings.append((time.perf_counter() - start) / iterations * 1_000_000)
+    mean = statistics.median(timings)
+    print(f'{name:<50} {mean:8.2f} us per request')
+    return mean
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+    # the sinks would dominate the measure, the logging cost is left out
+    logger.remove()
+
+    bare = await measure('no middleware', args.iterations, get_app([]))
+    before = await measure('stack with BaseHTTPMiddleware wrappers', args.iterations, get_app(BASE_HTTP_STACK))
+    after = await measure('ASGI stack', args.iterations, get_app(STACK))
+    print(f'stack overhead: {after - bare:.2f} us, saved per request: {before - after:.2f} us')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
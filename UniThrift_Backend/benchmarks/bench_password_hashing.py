@@ -0,0 +1,66 @@
+"""
+Login throughput under concurrency, with the password verified inline on the event loop against on the bounded pool.
+
+Every login verifies a password hash of the configured hasher, `--concurrency` logins run at the same time. A ticker
+task measures how late the event loop runs it meanwhile, the delay every other request on the worker would see.
+
+    python -m benchmarks.bench_password_hashing --logins 64 --concurrency 16
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.server.utils import password_utils
+
+
+async def ticker(lags: list[float], stop: asyncio.Event, interval: float = 0.005) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run(name: str, logins: int, concurrency: int, login) -> None:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded_login() -> None:
+        async with semaphore:
+            await login()
+
+    ticker_task = asyncio.create_task(ticker(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker_task
+
+    lags.sort()
+    print(f'{name:<30} {logins / elapsed:8.1f} logins/s  loop lag p50 {statistics.median(lags):7.2f} ms  max {lags[-1]:7.2f} ms')
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    password = 'correct horse battery staple'
+    password_hash = password_utils.hasher.hash(password)
+    print(f'{password_utils.hasher.algorithm}, {password_utils._executor._max_workers} hashing threads')
+
+    async def login_inline() -> None:
+        password_utils._check_password(password, password_hash)
+        await asyncio.sleep(0)
+
+    async def login_pool() -> None:
+        await password_utils.check_password(password, password_hash)
+
+    await run('inline on the event loop', args.logins, args.concurrency, login_inline)
+    await run('password hashing pool', args.logins, args.concurrency, login_pool)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Cost of turning a page of listings read from MongoDB into the JSON envelope of the list endpoints.
+
+The batch is decoded the way the driver decodes a reply, either into dicts or into `RawBSONDocument`, then encoded:
+
+- dict: the current path, documents decoded into dicts and encoded by `FastJSONResponse` with orjson.
+- raw + bsonjs: raw documents converted from BSON to JSON by libbson through `python-bsonjs`, when installed.
+- raw + decode: raw documents decoded in one batch and encoded by orjson as a pre-encoded fragment.
+
+    python -m benchmarks.bench_raw_bson --iterations 2000 --rows 100
+"""
+import argparse
+import statistics
+import time
+from typing import Any, Callable
+
+import bson
+import orjson
+from bson.raw_bson import DEFAULT_RAW_BSON_OPTIONS
+
+from app.server.encoder import json_encoder
+from app.server.encoder.json_encoder import FastJSONResponse
+
+try:
+    import bsonjs
+except ImportError:
+    bsonjs = None
+
+
+def get_batch(rows: int) -> bytes:
+    """A reply batch of rows listings plus the extra document fetched to detect the next page"""
+    listings = [
+        {
+            '_id': f'{index:024x}',
+            'title': f'Listing {index}',
+            'item_name': 'Books',
+            'description': 'Gently used, pick up on campus ' * 3,
+            'price': 100 + index,
+            'images': [f'listings/{index}/{image}.jpg' for image in range(3)],
+            'status': 'NEW',
+            'seller_id': f'{index:024x}',
+            'is_deleted': False,
+            'created_at': 1700000000000 + index,
+            'updated_at': 1700000000000 + index,
+        }
+        for index in range(rows + 1)
+    ]
+    return b''.join(bson.encode(listing) for listing in listings)
+
+
+def measure(name: str, iterations: int, function: Callable[[], Any]) -> float:
+    """Runs the function iterations times and prints the median cost per call in microseconds"""
+    function()
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        timings.append((time.perf_counter() - start) / iterations * 1_000_000)
+    median = statistics.median(timings)
+    print(f'{name:<40} {median:8.2f} us per page')
+    return median
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--rows', type=int, default=100)
+    args = parser.parse_args()
+    batch, rows = get_batch(args.rows), args.rows
+
+    def dict_path() -> bytes:
+        return FastJSONResponse({'data': bson.decode_all(batch)[:rows], 'status': 'SUCCESS'}).body
+
+    def raw_bsonjs_path() -> bytes:
+        documents = bson.decode_all(batch, DEFAULT_RAW_BSON_OPTIONS)[:rows]
+        data = orjson.Fragment(b'[' + b','.join(bsonjs.dumps(document.raw).encode() for document in documents) + b']')
+        return FastJSONResponse({'data': data, 'status': 'SUCCESS'}).body
+
+    def raw_decode_path() -> bytes:
+        documents = bson.decode_all(batch, DEFAULT_RAW_BSON_OPTIONS)[:rows]
+        data = orjson.Fragment(json_encoder.json_dumps(bson.decode_all(b''.join(document.raw for document in documents))))
+        return FastJSONResponse({'data': data, 'status': 'SUCCESS'}).body
+
+    paths = [('dict', dict_path), ('raw + decode', raw_decode_path)] + ([('raw + bsonjs', raw_bsonjs_path)] if bsonjs else [])
+    expected = orjson.loads(dict_path())
+    for name, path in paths:
+        assert orjson.loads(path()) == expected, name
+        measure(f'{name}, {rows} rows', args.iterations, path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Cost of compressing a page of universities per request, against serving it precompressed from the response cache.
+
+    python -m benchmarks.bench_response_compression --iterations 2000 --rows 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+
+from app.server.middlewares.compression import CompressionMiddleware
+from app.server.utils import compression_utils
+from app.server.utils.response_cache import response_cache
+
+
+def get_app(middleware, options: dict, content: dict, cached: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/api/v1/common/get_universities')
+    async def get_universities():
+        if cached:
+            return response_cache.get('universities') or response_cache.set('universities', content)
+        return content
+
+    app.add_middleware(middleware, **options)
+    return app
+
+
+async def call(app: FastAPI, accept_encoding: bytes) -> None:
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/api/v1/common/get_universities',
+        'raw_path': b'/api/v1/common/get_universities',
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'testserver'), (b'accept-encoding', accept_encoding)],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Future()
+
+    async def send(_message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(name: str, iterations: int, app: FastAPI, accept_encoding: bytes) -> float:
+    """Calls the app iterations times and prints the median cost per request in microseconds"""
+    await call(app, accept_encoding)
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await call(app, accept_encoding)
+        timings.append((time.perf_counter() - start) / iterations * 1_000_000)
+    median = statistics.median(timings)
+    print(f'{name:<55} {median:8.2f} us per request')
+    return median
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--rows', type=int, default=100)
+    args = parser.parse_args()
+
+    content = {
+        'data': {
+            'data': [{'_id': f'{index:024x}', 'name': f'University {index}', 'city': f'City {index % 40}', 'state': f'State {index % 12}'} for index in range(args.rows)],
+            'metadata': {'current_page': 1, 'page_size': args.rows, 'has_next_page': True, 'total_records': 5000, 'next_cursor': None},
+        },
+        'status': 'SUCCESS',
+    }
+    await measure('GZipMiddleware, per request', args.iterations, get_app(GZipMiddleware, {'minimum_size': 1000}, content, False), b'gzip')
+    # the encodings whose optional package is not installed are left out
+    for name in compression_utils.ENCODINGS:
+        encoding = name.encode()
+        await measure(f'CompressionMiddleware {name}, per request', args.iterations, get_app(CompressionMiddleware, {}, content, False), encoding)
+        await measure(f'CompressionMiddleware {name}, precompressed cache hit', args.iterations, get_app(CompressionMiddleware, {}, content, True), encoding)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Cost of core_data.update_one against update_one_lean, for the callers which discard the updated document.
+
+The client side numbers compare preparing the update document with the previous `copy.deepcopy`, against the fresh
+top level dict of `_prepare_update`. The server side numbers compare `find_one_and_update` returning the document
+against `update_one` returning counts, with the injected latency of every round trip.
+
+    python -m benchmarks.bench_update_one --latency-ms 1
+"""
+import asyncio
+import copy
+import statistics
+import time
+
+from bson import ObjectId
+
+import app.server.database.core_data as core_service
+from app.server.utils import date_utils
+from benchmarks.mongo_latency import get_database, get_parser, measure
+
+COLLECTION = 'benchmark_update_one'
+
+
+def get_update(i: int) -> dict:
+    return {'$set': {'title': f'Listing {i}', 'description': 'Gently used, pick up on campus ' * 3, 'price': 100 + i, 'images': [f'listings/{i}/{image}.jpg' for image in range(3)]}}
+
+
+def prepare_deepcopy(update: dict, timestamp: int) -> dict:
+    update = copy.deepcopy(update)
+    update.setdefault('$set', {})
+    update['$set'].update({'updated_at': timestamp})
+    update.setdefault('$setOnInsert', {})
+    update['$setOnInsert'].update({'_id': str(ObjectId()), 'created_at': timestamp})
+    if 'is_deleted' not in update['$set']:
+        update['$setOnInsert'].update({'is_deleted': False})
+    return update
+
+
+def measure_prepare(name: str, iterations: int, function) -> float:
+    """Runs the function iterations times and prints the median cost per call in microseconds"""
+    update, timestamp = get_update(0), date_utils.get_current_timestamp()
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function(update, timestamp)
+        timings.append((time.perf_counter() - start) / iterations * 1_000_000)
+    median = statistics.median(timings)
+    print(f'{name:<40} {median:8.2f} us per update')
+    return median
+
+
+async def main() -> None:
+    args = get_parser(__doc__).parse_args()
+    core_service.mongo = database = get_database(args)
+    collection = database.get_collection(COLLECTION)
+    await collection.drop()
+
+    measure_prepare('upsert, deepcopy', args.iterations * 50, prepare_deepcopy)
+    measure_prepare('upsert, _prepare_update', args.iterations * 50, lambda update, timestamp: core_service._prepare_update(update, timestamp, True))
+
+    record_ids = [str(ObjectId()) for _ in range(args.iterations)]
+    await collection.insert_many([{'_id': record_id, 'title': 'Listing', 'is_deleted': False} for record_id in record_ids])
+    before = await measure('update_one', args.iterations, lambda i: core_service.update_one(COLLECTION, record_id=record_ids[i], update=get_update(i)))
+    after = await measure('update_one_lean', args.iterations, lambda i: core_service.update_one_lean(COLLECTION, record_id=record_ids[i], update=get_update(i + 1)))
+    print(f'saved per update: {sum(before) / len(before) - sum(after) / len(after):.3f} ms')
+
+    await collection.drop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
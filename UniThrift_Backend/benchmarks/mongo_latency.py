@@ -0,0 +1,98 @@
+"""Motor database proxy which injects a fixed latency into every server round trip, shared by the benchmarks."""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Awaitable, Callable
+
+import motor.motor_asyncio
+
+from app.server.config import config
+
+# collection methods which return a cursor, the round trip happens when the cursor is consumed
+_CURSOR_METHODS = {'find', 'aggregate', 'list_indexes'}
+
+
+class LatencyCursor:
+    def __init__(self, cursor: Any, database: 'LatencyDatabase') -> None:
+        self._cursor = cursor
+        self._database = database
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._cursor, name)
+        if name in ('sort', 'skip', 'limit'):
+            return lambda *args, **kwargs: LatencyCursor(attribute(*args, **kwargs), self._database)
+        return attribute
+
+    async def to_list(self, length: Any = None) -> list[dict[str, Any]]:
+        await self._database.round_trip()
+        return await self._cursor.to_list(length)
+
+
+class LatencyCollection:
+    def __init__(self, collection: Any, database: 'LatencyDatabase') -> None:
+        self._collection = collection
+        self._database = database
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._collection, name)
+        if name in _CURSOR_METHODS:
+            return lambda *args, **kwargs: LatencyCursor(attribute(*args, **kwargs), self._database)
+        if not callable(attribute):
+            return attribute
+
+        async def call(*args, **kwargs):
+            await self._database.round_trip()
+            return await attribute(*args, **kwargs)
+
+        return call
+
+
+class LatencyDatabase:
+    """Wraps a Motor compatible database, every command sleeps `latency` seconds and is counted in `calls`"""
+
+    def __init__(self, database: Any, latency: float) -> None:
+        self._database = database
+        self.latency = latency
+        self.calls = 0
+
+    async def round_trip(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    def get_collection(self, name: str) -> LatencyCollection:
+        return LatencyCollection(self._database.get_collection(name), self)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._database, name)
+
+
+def get_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--mongo-uri', default=config.MONGO_URI, help='database to run against, a throwaway database is recommended')
+    parser.add_argument('--in-memory', action='store_true', help='use mongomock-motor instead of a MongoDB server (pip install mongomock-motor)')
+    parser.add_argument('--latency-ms', type=float, default=1.0, help='latency injected into every round trip')
+    parser.add_argument('--iterations', type=int, default=200)
+    return parser
+
+
+def get_database(args: argparse.Namespace) -> LatencyDatabase:
+    if args.in_memory:
+        from mongomock_motor import AsyncMongoMockClient  # pylint: disable=import-outside-toplevel
+
+        database = AsyncMongoMockClient().get_database('benchmark')
+    else:
+        database = motor.motor_asyncio.AsyncIOMotorClient(args.mongo_uri).get_database()
+    return LatencyDatabase(database, args.latency_ms / 1000)
+
+
+async def measure(name: str, iterations: int, func: Callable[[int], Awaitable[Any]]) -> list[float]:
+    """Awaits func(i) sequentially and prints the latency distribution in milliseconds"""
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await func(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f'{name:<40} mean {statistics.mean(timings):8.3f} ms  p50 {timings[len(timings) // 2]:8.3f} ms  p95 {timings[int(len(timings) * 0.95)]:8.3f} ms')
+    return timings
@@ -1,9 +1,12 @@
+import asyncio
+import time
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from fastapi import FastAPI, status
 from httpx import AsyncClient
 
+from app.server.database.profiler import SlowQueryLog
 from app.server.routes.admin import router
 from app.server.static.enums import Role
 
@@ -61,3 +64,30 @@ async def test_total_revenue_success(mock_jwt_auth_user, mock_query_read):
 
     assert response.status_code == status.HTTP_200_OK
     assert response.json().get('status') == 'SUCCESS'
+
+
+@pytest.mark.asyncio
+@patch('app.server.database.profiler.mongo.command', new_callable=AsyncMock)
+@patch('app.server.routes.admin.JWTAuthUser.__call__', new_callable=Mock)
+async def test_slow_queries_report_success(mock_jwt_auth_user, mock_command):
+    mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.ADMIN}]
+    mock_command.side_effect = [{'queryPlanner': {'winningPlan': {'stage': 'SORT', 'inputStage': {'stage': 'COLLSCAN'}}}}]
+
+    slow_query_log = SlowQueryLog(threshold_ms=0, sample_rate=0)
+    for buyer_id in ('buyer1', 'buyer2'):
+        slow_query_log.record('transactions', 'read_many', time.perf_counter(), data_filter={'buyer_id': buyer_id, 'updated_at': {'$gt': 0}}, sort={'created_at': -1, '_id': -1})
+    await asyncio.gather(*slow_query_log._explain_tasks)
+
+    with patch('app.server.services.admin.slow_query_log', slow_query_log):
+        async with AsyncClient(app=app, base_url='http://testserver') as client:
+            response = await client.get('/admin/slow_queries', headers={'Authorization': 'Bearer token'})
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json().get('data')
+    assert len(data) == 1
+    assert data[0]['shape'] == {'buyer_id': 1, 'updated_at': {'$gt': 1}}
+    assert data[0]['count'] == 2
+    assert data[0]['plan'] == 'COLLSCAN > SORT'
+    assert data[0]['collscan'] is True
+    assert data[0]['suggested_index'] == [['buyer_id', 1], ['created_at', -1], ['updated_at', 1]]
+    assert mock_command.await_count == 1
@@ -1,4 +1,4 @@
-from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, Mock, patch
 
 import pytest
 from fastapi import FastAPI, status
@@ -17,15 +17,16 @@ app.include_router(router)
 @pytest.mark.asyncio
 @patch('app.server.services.admin.core_service.read_one', new_callable=AsyncMock)
 @patch('app.server.services.admin.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.admin.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.services.admin.core_service.get_session', new_callable=AsyncMock)
-async def test_admin_create_success(mock_get_session, mock_update_one, mock_read_one):
+async def test_admin_create_success(mock_get_session, mock_update_one_lean, mock_update_one, mock_read_one):
     mock_session = MagicMock()
     mock_session.__aenter__.return_value = mock_session
     mock_session.__aexit__.return_value = None
     mock_get_session.return_value = mock_session
 
     mock_read_one.side_effect = [None, None, None]
-    mock_update_one.side_effect = [{'_id': 'user123', 'email': 'example@test.com'}, None]  # User creation  # Password update
+    mock_update_one.side_effect = [{'_id': 'user123', 'email': 'example@test.com'}]
     request_payload = {
         'first_name': 'John',
         'last_name': 'Doe',
@@ -58,7 +59,10 @@ async def test_admin_create_success(mock_get_session, mock_update_one, mock_read
     mock_read_one.assert_any_call('users', data_filter={'university_id': request_payload['university_id'], 'is_deleted': False})
     mock_update_one.assert_any_call('users', data_filter={'email': request_payload['email']}, update={'$set': update_one_payload}, upsert=True, session=mock_session)
 
-    assert mock_update_one.call_count == 2
+    assert mock_update_one.call_count == 1
+    mock_update_one_lean.assert_called_once()
+    assert mock_update_one_lean.call_args.args[0] == Collections.PASSWORD
+    assert mock_update_one_lean.call_args.kwargs['data_filter'] == {'user_id': 'user123'}
     assert mock_get_session.call_count == 1
 
 
@@ -121,14 +125,13 @@ async def test_admin_create_duplicate_id_error(mock_read_one):
 @pytest.mark.asyncio
 @patch('app.server.services.admin.core_service.read_one', new_callable=AsyncMock)
 @patch('app.server.services.admin.create_login_token', new_callable=AsyncMock)
-@patch('app.server.services.admin.password_utils.check_password', new_callable=Mock)
-@patch('app.server.services.admin.core_service.update_one', new_callable=AsyncMock)
-async def test_admin_login(mock_update_one, mock_check_password, mock_create_login_token, mock_read_one):
+@patch('app.server.services.admin.password_utils.check_password', new_callable=AsyncMock)
+@patch('app.server.services.admin.token_util.update_last_login', new_callable=Mock)
+async def test_admin_login(mock_update_last_login, mock_check_password, mock_create_login_token, mock_read_one):
     mock_read_one.side_effect = [{'_id': 'user123', 'is_verified': True, 'user_type': Role.ADMIN}, {'_id': 'id123', 'user_id': 'user123', 'password': 'hashed_password'}]
 
     mock_create_login_token.side_effect = [{'access_token': 'access_token', 'access_token_expiry': 1000, 'refresh_token': 'refresh_token'}]
-    mock_check_password.side_effect = [True]
-    mock_update_one.side_effect = [None]
+    mock_check_password.side_effect = [None]
     request_payload = {'email': 'test@example.com', 'password': 'password'}
     read_one_payload = {'email': 'test@example.com', 'is_deleted': False}
     async with AsyncClient(app=app, base_url='http://testserver') as client:
@@ -141,7 +144,7 @@ async def test_admin_login(mock_update_one, mock_check_password, mock_create_log
     assert mock_read_one.call_count == 2
     assert mock_check_password.call_count == 1
     assert mock_create_login_token.call_count == 1
-    assert mock_update_one.call_count == 1
+    mock_update_last_login.assert_called_once_with('user123')
 
 
 @pytest.mark.asyncio
@@ -166,9 +169,9 @@ async def test_admin_login_wrong_password(mock_read_one):
 
 @pytest.mark.asyncio
 @patch('app.server.services.admin.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.admin.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.admin.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.services.admin.core_service.get_session', new_callable=AsyncMock)
-async def test_admin_verify_otp_authentication_success(mock_get_session, mock_update_one, mock_read_one):
+async def test_admin_verify_otp_authentication_success(mock_get_session, mock_update_one_lean, mock_read_one):
     # Mocking `get_session` to simulate an async context manager
     mock_session = MagicMock()
     mock_session.__aenter__.return_value = mock_session
@@ -180,7 +183,7 @@ async def test_admin_verify_otp_authentication_success(mock_get_session, mock_up
         {'_id': 'id123', 'expiry': 10**20, 'user_id': 'user123', 'otp': '123456', 'is_used': False, 'used_for': VerificationType.AUTHENTICATION},
     ]
 
-    mock_update_one.side_effect = [None, None]
+    mock_update_one_lean.side_effect = [None, None]
 
     request_payload = {'email': 'test@example.com', 'otp': '123456', 'password': 'password123', 'verification_type': VerificationType.AUTHENTICATION}
 
@@ -198,18 +201,18 @@ async def test_admin_verify_otp_authentication_success(mock_get_session, mock_up
 
     mock_read_one.assert_any_call(Collections.OTP, data_filter=otp_read_one_payload)
 
-    mock_update_one.assert_any_call(Collections.USERS, data_filter={'_id': 'user123'}, update={'$set': {'is_verified': True}}, upsert=True, session=mock_session)
+    mock_update_one_lean.assert_any_call(Collections.USERS, data_filter={'_id': 'user123'}, update={'$set': {'is_verified': True}}, upsert=True, session=mock_session)
 
-    mock_update_one.assert_any_call(Collections.OTP, data_filter={'user_id': 'user123'}, update={'$set': {'is_used': True}}, upsert=True, session=mock_session)
+    mock_update_one_lean.assert_any_call(Collections.OTP, data_filter={'user_id': 'user123'}, update={'$set': {'is_used': True}}, upsert=True, session=mock_session)
 
-    assert mock_update_one.call_count == 2
+    assert mock_update_one_lean.call_count == 2
 
 
 @pytest.mark.asyncio
 @patch('app.server.services.admin.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.admin.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.admin.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.services.admin.core_service.get_session', new_callable=AsyncMock)
-async def test_admin_verify_otp_forgot_password_success(mock_get_session, mock_update_one, mock_read_one):
+async def test_admin_verify_otp_forgot_password_success(mock_get_session, mock_update_one_lean, mock_read_one):
     # Mocking `get_session` to simulate an async context manager
     mock_session = MagicMock()
     mock_session.__aenter__.return_value = mock_session
@@ -221,7 +224,7 @@ async def test_admin_verify_otp_forgot_password_success(mock_get_session, mock_u
         {'_id': 'id123', 'expiry': 10**20, 'user_id': 'user123', 'otp': '123456', 'is_used': False, 'used_for': VerificationType.FORGOT_PASSWORD},
     ]
 
-    mock_update_one.side_effect = [None, None]
+    mock_update_one_lean.side_effect = [None, None]
 
     request_payload = {'email': 'test@example.com', 'otp': '123456', 'password': 'password123', 'verification_type': VerificationType.FORGOT_PASSWORD}
     read_one_payload = {'email': 'test@example.com'}
@@ -233,7 +236,7 @@ async def test_admin_verify_otp_forgot_password_success(mock_get_session, mock_u
     assert response.json().get('status') == 'SUCCESS'
     mock_read_one.assert_any_call(Collections.USERS, data_filter=read_one_payload)
     mock_read_one.assert_any_call(Collections.OTP, data_filter=otp_read_one_payload)
-    assert mock_update_one.call_count == 1
+    assert mock_update_one_lean.call_count == 1
 
 
 @pytest.mark.asyncio
@@ -263,9 +266,9 @@ async def test_admin_verify_otp_fail_1(mock_read_one):
 
 @pytest.mark.asyncio
 @patch('app.server.services.admin.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.admin.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.admin.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.routes.admin.JWTAuthUser.__call__', new_callable=AsyncMock)
-async def test_admin_update_success(mock_jwt_auth_user, mock_update_one, mock_read_one):
+async def test_admin_update_success(mock_jwt_auth_user, mock_update_one_lean, mock_read_one):
     mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.ADMIN}]
 
     mock_read_one.side_effect = [{'_id': 'user123', 'email': 'test@example.com', 'first_name': 'John', 'last_name': 'Doe'}]
@@ -281,7 +284,8 @@ async def test_admin_update_success(mock_jwt_auth_user, mock_update_one, mock_re
     assert response.json().get('status') == 'SUCCESS'
 
     mock_read_one.assert_any_call(Collections.USERS, data_filter=read_one_payload)
-    mock_update_one.assert_any_call(Collections.USERS, data_filter={'_id': 'user123'}, update={'$set': request_payload}, upsert=True)
+    mock_update_one_lean.assert_any_call(Collections.USERS, data_filter={'_id': 'user123'}, update={'$set': request_payload}, upsert=True)
+    mock_update_one_lean.assert_any_call(Collections.AUTH_INVALIDATIONS, data_filter={'user_id': 'user123'}, update={'$inc': {'version': 1}, '$set': {'invalidated_at': ANY}}, upsert=True)
 
 
 @pytest.mark.asyncio
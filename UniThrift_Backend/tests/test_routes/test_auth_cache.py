@@ -0,0 +1,89 @@
+import time
+from unittest.mock import ANY, AsyncMock, patch
+
+import pytest
+
+from app.server.static.collections import Collections
+from app.server.utils import token_util
+from app.server.utils.auth_cache import AuthUserCache
+
+USER = {'_id': 'user123', 'user_type': 'student', 'is_deleted': False}
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = time.monotonic()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+@patch('app.server.utils.auth_cache.core_service.read_many', new_callable=AsyncMock)
+async def test_auth_cache_poll_evicts_user_invalidated_by_another_worker(mock_read_many):
+    cache = AuthUserCache(maxsize=10, ttl=60, poll_interval=3600)
+    cache.set('token1', USER)
+    cache.set('token2', USER)
+    cache.set('token3', {'_id': 'user456'})
+    assert cache.get('token1') == USER
+
+    # another worker invalidated user123, the next read after the poll interval polls the invalidations
+    mock_read_many.side_effect = [[{'user_id': 'user123'}]]
+    cache.poll_interval = 0
+    cache.get('token1')
+    await cache._poll_task
+    cache.poll_interval = 3600
+
+    assert mock_read_many.call_args.args[0] == Collections.AUTH_INVALIDATIONS
+    assert cache.get('token1') is None
+    assert cache.get('token2') is None
+    assert cache.get('token3') == {'_id': 'user456'}
+
+
+@pytest.mark.asyncio
+@patch('app.server.utils.auth_cache.core_service.update_one_lean', new_callable=AsyncMock)
+async def test_auth_cache_invalidate_evicts_locally_and_publishes(mock_update_one_lean):
+    cache = AuthUserCache(maxsize=10, ttl=60, poll_interval=3600)
+    cache.set('token1', USER)
+
+    await cache.invalidate('user123')
+
+    assert cache.get('token1') is None
+    mock_update_one_lean.assert_called_once_with(Collections.AUTH_INVALIDATIONS, data_filter={'user_id': 'user123'}, update={'$inc': {'version': 1}, '$set': {'invalidated_at': ANY}}, upsert=True)
+
+
+def test_auth_cache_entries_expire_with_ttl_and_token():
+    clock = Clock()
+    cache = AuthUserCache(maxsize=10, ttl=60, poll_interval=3600)
+    with patch('app.server.utils.cache_utils.time.monotonic', clock):
+        cache.set('token1', USER)
+        # the token expires before the cache ttl
+        cache.set('token2', USER, expires_at=time.time() + 10)
+        # an expired token is not cached at all
+        cache.set('token3', USER, expires_at=time.time() - 1)
+        assert cache.get('token3') is None
+
+        clock.now += 11
+        assert cache.get('token1') == USER
+        assert cache.get('token2') is None
+
+        clock.now += 50
+        assert cache.get('token1') is None
+
+
+@pytest.mark.asyncio
+@patch('app.server.utils.token_util.core_service.query_read', new_callable=AsyncMock)
+async def test_get_current_user_refetches_expired_entry(mock_query_read):
+    clock = Clock()
+    cache = AuthUserCache(maxsize=10, ttl=60, poll_interval=3600)
+    mock_query_read.side_effect = [[USER], [{**USER, 'is_verified': True}]]
+    user_data = {'user_id': 'user123', 'user_type': 'student', 'exp': time.time() + 3600}
+
+    with patch.object(token_util, 'auth_user_cache', cache), patch('app.server.utils.cache_utils.time.monotonic', clock):
+        assert await token_util.get_current_user(user_data, 'token1') == USER
+        assert await token_util.get_current_user(user_data, 'token1') == USER
+        assert mock_query_read.call_count == 1
+
+        clock.now += 61
+        assert await token_util.get_current_user(user_data, 'token1') == {**USER, 'is_verified': True}
+        assert mock_query_read.call_count == 2
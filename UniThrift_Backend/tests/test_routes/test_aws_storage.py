@@ -0,0 +1,85 @@
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+import boto3
+import pytest
+
+from app.server.vendor.aws import storage
+from app.server.vendor.aws.client import storage_config
+
+pytest.importorskip('moto.server')
+
+BUCKET = 'unithrift-test'
+
+
+@pytest.fixture(scope='module')
+def moto_endpoint():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen([sys.executable, '-m', 'moto.server', '-H', '127.0.0.1', '-p', str(port)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        server.terminate()
+        server.wait()
+
+
+@pytest.fixture
+def storage_client(moto_endpoint):
+    client = boto3.client('s3', region_name='us-east-1', aws_access_key_id='test', aws_secret_access_key='test', endpoint_url=moto_endpoint, config=storage_config)
+    client.create_bucket(Bucket=BUCKET)
+    with patch.object(storage, 'storage_client', client), patch.object(storage.config, 'AWS_STORAGE_BUCKET', BUCKET):
+        yield client
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Largest delay in ms of a task waking up every interval seconds, until stop is set"""
+    lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(lag, (time.perf_counter() - start - interval) * 1000)
+    return lag
+
+
+@pytest.mark.asyncio
+async def test_storage_uploads_do_not_block_event_loop(storage_client):
+    file_bytes = b'x' * 1024 * 1024
+    # the threads of the pool and their connections are opened by a first burst
+    await asyncio.gather(*(storage.upload_file_bytes('warm_up', b'x', f'image_{index}.jpg', 'image/jpeg') for index in range(20)))
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop))
+
+    start = time.perf_counter()
+    uploads = await asyncio.gather(*(storage.upload_file_bytes('listings', file_bytes, f'image_{index}.jpg', 'image/jpeg') for index in range(20)))
+    elapsed = (time.perf_counter() - start) * 1000
+    stop.set()
+    lag = await lag_task
+
+    # run inline the uploads would hold the event loop for the whole time, on the pool it only waits for the GIL
+    assert lag < elapsed / 4, f'event loop lag {lag:.1f} ms for 20 uploads of 1 MB in {elapsed:.0f} ms'
+    for upload in uploads:
+        response = await storage.verify_object(upload['key'], ['image'])
+        assert response['ContentLength'] == len(file_bytes)
+
+    chunks, file_name, content_type = await storage.get_file(uploads[0]['key'])
+    chunks = [chunk async for chunk in chunks]
+    assert b''.join(chunks) == file_bytes
+    assert max(map(len, chunks)) == storage.FILE_CHUNK_SIZE
+    assert uploads[0]['key'].endswith(file_name)
+    assert content_type == 'image/jpeg'
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.server.utils.cache_utils import TTLCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with patch('app.server.utils.cache_utils.time.monotonic', clock):
+        yield clock
+
+
+def test_ttl_cache_expires_entries(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('key', 'value')
+
+    clock.now += 59.9
+    assert cache.get('key') == 'value'
+    assert 'key' in cache
+
+    clock.now += 0.1
+    assert cache.get('key') is None
+    assert cache.get('key', 'default') == 'default'
+    assert 'key' not in cache
+    assert len(cache) == 0
+
+
+def test_ttl_cache_per_key_ttl(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('short', 1, ttl=5)
+    cache.set('default', 2)
+
+    clock.now += 5
+    assert cache.get('short') is None
+    assert cache.get('default') == 2
+
+    # setting a key again restarts its time to live
+    cache.set('default', 3, ttl=10)
+    clock.now += 9
+    assert cache.get('default') == 3
+    clock.now += 1
+    assert cache.get('default') is None
+
+
+def test_ttl_cache_evicts_least_recently_used(clock):
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # a is now more recently used than b
+
+    cache.set('c', 3)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_ttl_cache_pop_and_clear(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    assert cache.pop('a') == 1
+    assert cache.pop('a', 'missing') == 'missing'
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get('b') is None
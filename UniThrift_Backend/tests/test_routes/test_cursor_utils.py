@@ -0,0 +1,44 @@
+import mongomock
+import pytest
+
+from app.server.utils import cursor_utils
+
+DOCUMENTS = [
+    {'_id': 'a', 'updated_at': 3, 'price': 10},
+    {'_id': 'b', 'price': 20},
+    {'_id': 'c', 'updated_at': 1},
+    {'_id': 'd', 'updated_at': None, 'price': 10},
+    {'_id': 'e', 'updated_at': 3},
+    {'_id': 'f', 'updated_at': 2, 'price': 30},
+    {'_id': 'g'},
+]
+
+
+def read_pages(collection, sort: dict[str, int], page_size: int) -> list[str]:
+    sort = cursor_utils.get_keyset_sort(sort)
+    ids, cursor = [], None
+    while True:
+        data_filter = cursor_utils.add_keyset_filter(None, sort, cursor) if cursor else {}
+        documents = list(collection.find(data_filter).sort(list(sort.items())).limit(page_size + 1))
+        has_next_page = len(documents) > page_size
+        documents = documents[:page_size]
+        ids += [document['_id'] for document in documents]
+        if not (cursor := cursor_utils.get_next_cursor(documents, sort, has_next_page)):
+            return ids
+
+
+@pytest.mark.parametrize('sort', [{'updated_at': -1}, {'updated_at': 1}, {'price': -1, 'updated_at': -1}, {'price': 1, 'updated_at': -1}])
+@pytest.mark.parametrize('page_size', [1, 2, 3])
+def test_keyset_pages_include_documents_without_sort_values(sort, page_size):
+    collection = mongomock.MongoClient().db.listings
+    collection.insert_many([dict(document) for document in DOCUMENTS])
+    expected = [document['_id'] for document in collection.find().sort(list(cursor_utils.get_keyset_sort(sort).items()))]
+
+    assert read_pages(collection, sort, page_size) == expected
+    assert sorted(expected) == [document['_id'] for document in DOCUMENTS]
+
+
+def test_keyset_filter_of_descending_key_matches_null_values():
+    sort = cursor_utils.get_keyset_sort({'updated_at': -1})
+
+    assert cursor_utils.get_keyset_filter(sort, [5, 'a']) == {'$or': [{'updated_at': {'$lt': 5}}, {'updated_at': None}, {'updated_at': 5, '_id': {'$gt': 'a'}}]}
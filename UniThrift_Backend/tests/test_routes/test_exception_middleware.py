@@ -0,0 +1,99 @@
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import FastAPI, HTTPException, status
+from fastapi.responses import Response
+from httpx import AsyncClient
+
+from app.server.handler.error_handler import http_exception_handler
+from app.server.middlewares.exceptions import ExceptionHandlerMiddleware
+
+app = FastAPI()
+
+
+@app.get('/error')
+async def raise_error():
+    raise RuntimeError('database is down')
+
+
+@app.get('/not_found')
+async def raise_not_found():
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Listing not found')
+
+
+class FailingStreamResponse(Response):
+    """Response failing after its status and first chunk were sent, like a stream whose source breaks"""
+
+    async def __call__(self, scope, receive, send):
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+        await send({'type': 'http.response.body', 'body': b'{"data": [', 'more_body': True})
+        raise RuntimeError('cursor lost')
+
+
+@app.get('/stream')
+async def stream_then_fail():
+    return FailingStreamResponse(media_type='application/json')
+
+
+app.add_exception_handler(HTTPException, http_exception_handler)
+app.add_middleware(ExceptionHandlerMiddleware)
+
+
+@pytest.mark.asyncio
+@patch('app.server.middlewares.exceptions.logger.exception', new_callable=Mock)
+async def test_unhandled_error_becomes_json_500_envelope(mock_logger_exception):
+    async with AsyncClient(app=app, base_url='http://testserver') as client:
+        response = await client.get('/error')
+
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.json() == {'status': 'FAIL', 'errorData': {'errorCode': 500, 'message': 'database is down'}}
+    mock_logger_exception.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_http_exception_becomes_json_envelope_with_process_time():
+    async with AsyncClient(app=app, base_url='http://testserver') as client:
+        response = await client.get('/not_found')
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {'status': 'FAIL', 'errorData': {'errorCode': 404, 'message': 'Listing not found'}}
+    assert 'x-process-time' in response.headers
+
+
+@pytest.mark.asyncio
+async def test_error_after_response_start_is_not_answered_twice():
+    messages = []
+    requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Future()
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/stream',
+        'raw_path': b'/stream',
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    # the routes without the outer error middleware of FastAPI, which would send its own 500
+    with pytest.raises(RuntimeError, match='cursor lost'):
+        await ExceptionHandlerMiddleware(app.router)(scope, receive, send)
+
+    starts = [message for message in messages if message['type'] == 'http.response.start']
+    assert len(starts) == 1
+    assert starts[0]['status'] == status.HTTP_200_OK
+    assert any(name == b'x-process-time' for name, _ in starts[0]['headers'])
+    assert [message['body'] for message in messages if message['type'] == 'http.response.body'] == [b'{"data": [']
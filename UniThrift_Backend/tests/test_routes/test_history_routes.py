@@ -5,6 +5,7 @@ from fastapi import FastAPI, status
 from httpx import AsyncClient
 
 from app.server.routes.history import router
+from app.server.services.history import TRANSACTION_COMMENTS_OPTIONS, USER_NAME_OPTIONS
 from app.server.static import localization
 from app.server.static.collections import Collections
 from app.server.static.enums import ListingStatus, Role
@@ -33,9 +34,28 @@ async def test_history_listing_details_success(mock_jwt_auth_user, mock_read_one
     assert response.json().get('status') == 'SUCCESS'
 
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123', 'status': ListingStatus.SOLD})
-    mock_read_one.assert_any_call(Collections.USERS, data_filter={'_id': 'seller_user123'})
-    mock_read_one.assert_any_call(Collections.USERS, data_filter={'_id': 'buyer_user123'})
-    mock_read_one.assert_any_call(Collections.TRANSACTIONS, data_filter={'listing_id': 'listing123', 'buyer_id': 'buyer_user123'})
+    mock_read_one.assert_any_call(Collections.USERS, data_filter={'_id': 'seller_user123'}, options=USER_NAME_OPTIONS)
+    mock_read_one.assert_any_call(Collections.USERS, data_filter={'_id': 'buyer_user123'}, options=USER_NAME_OPTIONS)
+    mock_read_one.assert_any_call(Collections.TRANSACTIONS, data_filter={'listing_id': 'listing123', 'buyer_id': 'buyer_user123'}, options=TRANSACTION_COMMENTS_OPTIONS)
+
+
+@pytest.mark.asyncio
+@patch('app.server.services.history.core_service.read_one', new_callable=AsyncMock)
+@patch('app.server.routes.history.JWTAuthUser.__call__', new_callable=Mock)
+async def test_history_listing_details_users_without_names(mock_jwt_auth_user, mock_read_one):
+    mock_jwt_auth_user.side_effect = [{'user_id': 'seller_user123', 'user_type': Role.STUDENT}]
+
+    # the projection of users without first_name and last_name only has their _id
+    mock_read_one.side_effect = [{'_id': 'listing123', 'seller_id': 'seller_user123', 'buyer_id': 'buyer_user123'}, {'_id': 'seller_user123'}, {'_id': 'buyer_user123'}, {}]
+
+    async with AsyncClient(app=app, base_url='http://testserver') as client:
+        response = await client.get('/history/get_listing_details/listing123', headers={'Authorization': 'Bearer token'})
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()['data']
+    assert data['seller_name'] == 'N/A N/A'
+    assert data['buyer_name'] == 'N/A N/A'
+    assert data['buyer_comments'] == 'No comments provided'
 
 
 @pytest.mark.asyncio
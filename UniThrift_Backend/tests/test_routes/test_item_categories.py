@@ -1,9 +1,10 @@
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from fastapi import FastAPI, status
 from httpx import AsyncClient
 
+from app.server.database.item_catalog import ItemCatalog
 from app.server.routes.item_categories import router
 from app.server.static.collections import Collections
 from app.server.static.enums import Role
@@ -13,10 +14,11 @@ app.include_router(router)
 
 
 @pytest.mark.asyncio
+@patch('app.server.services.item_categories.item_catalog.invalidate', new_callable=AsyncMock)
 @patch('app.server.services.item_categories.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.item_categories.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.item_categories.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.routes.item_categories.JWTAuthUser.__call__', new_callable=AsyncMock)
-async def test_item_create_success(mock_jwt_auth_user, mock_update_one, mock_read_one):
+async def test_item_create_success(mock_jwt_auth_user, mock_update_one_lean, mock_read_one, mock_invalidate):
     mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.ADMIN}]
     mock_read_one.side_effect = [None]
     request_payload = {'item_name': 'New Item', 'item_description': 'Sample description'}
@@ -28,7 +30,8 @@ async def test_item_create_success(mock_jwt_auth_user, mock_update_one, mock_rea
     assert response.status_code == status.HTTP_200_OK
     assert response.json().get('status') == 'SUCCESS'
     mock_read_one.assert_any_call(Collections.ITEMS, data_filter=read_one_payload)
-    mock_update_one.assert_any_call(Collections.ITEMS, data_filter={'item_name': 'New Item'}, update={'$set': update_one_payload}, upsert=True)
+    mock_update_one_lean.assert_any_call(Collections.ITEMS, data_filter={'item_name': 'New Item'}, update={'$set': update_one_payload}, upsert=True)
+    mock_invalidate.assert_called_once_with()
 
 
 @pytest.mark.asyncio
@@ -48,10 +51,11 @@ async def test_item_create_failure(mock_jwt_auth_user, mock_read_one):
 
 
 @pytest.mark.asyncio
+@patch('app.server.services.item_categories.item_catalog.invalidate', new_callable=AsyncMock)
 @patch('app.server.services.item_categories.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.item_categories.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.item_categories.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.routes.item_categories.JWTAuthUser.__call__', new_callable=AsyncMock)
-async def test_item_update_success(mock_jwt_auth_user, mock_update_one, mock_read_one):
+async def test_item_update_success(mock_jwt_auth_user, mock_update_one_lean, mock_read_one, mock_invalidate):
     # Mock JWTAuthUser to simulate admin user
     mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.ADMIN}]
     mock_read_one.side_effect = [{'_id': 'item123', 'item_name': 'New Item', 'is_deleted': False}]
@@ -68,7 +72,8 @@ async def test_item_update_success(mock_jwt_auth_user, mock_update_one, mock_rea
     assert response.status_code == status.HTTP_200_OK
     assert response.json().get('status') == 'SUCCESS'
     mock_read_one.assert_any_call(collection_name=Collections.ITEMS, data_filter=read_one_payload)
-    mock_update_one.assert_any_call(Collections.ITEMS, data_filter={'_id': 'item123'}, update={'$set': update_one_payload}, upsert=True)
+    mock_update_one_lean.assert_any_call(Collections.ITEMS, data_filter={'_id': 'item123'}, update={'$set': update_one_payload}, upsert=True)
+    mock_invalidate.assert_called_once_with()
 
 
 @pytest.mark.asyncio
@@ -90,10 +95,11 @@ async def test_item_update_failure(mock_jwt_auth_user, mock_read_one):
 
 
 @pytest.mark.asyncio
+@patch('app.server.services.item_categories.item_catalog.invalidate', new_callable=AsyncMock)
 @patch('app.server.services.item_categories.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.item_categories.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.item_categories.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.routes.item_categories.JWTAuthUser.__call__', new_callable=AsyncMock)
-async def test_item_delete_success(mock_jwt_auth_user, mock_update_one, mock_read_one):
+async def test_item_delete_success(mock_jwt_auth_user, mock_update_one_lean, mock_read_one, mock_invalidate):
     mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.ADMIN}]
     mock_read_one.side_effect = [{'_id': 'item123', 'item_name': 'New Item', 'is_deleted': False}]
     read_one_payload = {'_id': 'item123', 'is_deleted': False}
@@ -105,7 +111,8 @@ async def test_item_delete_success(mock_jwt_auth_user, mock_update_one, mock_rea
     assert response.status_code == status.HTTP_200_OK
     assert response.json().get('status') == 'SUCCESS'
     mock_read_one.assert_any_call(collection_name=Collections.ITEMS, data_filter=read_one_payload)
-    mock_update_one.assert_any_call(Collections.ITEMS, data_filter={'_id': 'item123'}, update={'$set': update_one_payload}, upsert=False)
+    mock_update_one_lean.assert_any_call(Collections.ITEMS, data_filter={'_id': 'item123'}, update={'$set': update_one_payload}, upsert=False)
+    mock_invalidate.assert_called_once_with()
 
 
 @pytest.mark.asyncio
@@ -122,3 +129,62 @@ async def test_item_delete_failure(mock_jwt_auth_user, mock_read_one):
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert response.json().get('detail') == 'Item not found'
     mock_read_one.assert_any_call(collection_name=Collections.ITEMS, data_filter=read_one_payload)
+
+
+@pytest.mark.asyncio
+@patch('app.server.database.item_catalog.catalog', new_callable=lambda: ItemCatalog(poll_interval=60))
+@patch('app.server.services.item_categories.core_service.read_one', new_callable=AsyncMock)
+@patch('app.server.services.item_categories.core_service.query_read_all', new_callable=AsyncMock)
+async def test_item_get_items_prefix_search_from_catalog(mock_query_read_all, mock_read_one, _catalog):
+    mock_read_one.side_effect = [{'version': 3}]
+    mock_query_read_all.side_effect = [
+        [{'_id': 'item1', 'item_name': 'Books'}, {'_id': 'item2', 'item_name': 'Bicycles'}, {'_id': 'item3', 'item_name': 'Bookshelves'}, {'_id': 'item4', 'item_name': 'Lamps'}]
+    ]
+    async with AsyncClient(app=app, base_url='http://testserver') as client:
+        response = await client.get('/item_categories/get_items', params={'search_query': 'boo', 'page_size': 1})
+        second_response = await client.get('/item_categories/get_items', params={'search_query': 'boo', 'page': 2, 'page_size': 1})
+        all_response = await client.get('/item_categories/get_items')
+    assert response.status_code == status.HTTP_200_OK
+    assert [item['item_name'] for item in response.json()['data']['data']] == ['Books']
+    assert response.json()['data']['metadata']['total_records'] == 2
+    assert response.json()['data']['metadata']['has_next_page'] is True
+    assert [item['item_name'] for item in second_response.json()['data']['data']] == ['Bookshelves']
+    assert second_response.json()['data']['metadata']['has_next_page'] is False
+    assert [item['item_name'] for item in all_response.json()['data']['data']] == ['Bicycles', 'Books', 'Bookshelves', 'Lamps']
+    # the catalog is loaded once and every later read is served from memory
+    mock_query_read_all.assert_called_once_with(Collections.ITEMS, [{'$match': {'is_deleted': False}}])
+    mock_read_one.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch('app.server.database.item_catalog.core_service.update_one_lean', new_callable=AsyncMock)
+async def test_item_catalog_invalidate_bumps_version(mock_update_one_lean):
+    catalog = ItemCatalog(poll_interval=60)
+    catalog._stale = False
+    await catalog.invalidate()
+    mock_update_one_lean.assert_called_once_with(Collections.CATALOG_VERSIONS, data_filter={'collection': Collections.ITEMS}, update={'$inc': {'version': 1}}, upsert=True)
+    assert catalog._stale is True
+
+
+@pytest.mark.asyncio
+@patch('app.server.database.item_catalog.logger.exception', new_callable=Mock)
+@patch('app.server.database.item_catalog.core_service.read_one', new_callable=AsyncMock)
+@patch('app.server.database.item_catalog.core_service.query_read_all', new_callable=AsyncMock)
+async def test_item_catalog_poll_survives_errors(mock_query_read_all, mock_read_one, mock_logger_exception):
+    catalog = ItemCatalog(poll_interval=0)
+    mock_read_one.side_effect = [{'version': 1}, RuntimeError('connection reset'), {'version': 2}, {'version': 2}]
+    mock_query_read_all.side_effect = [[{'_id': 'item1', 'item_name': 'Books'}], [{'_id': 'item2', 'item_name': 'Lamps'}]]
+
+    await catalog.get_snapshot()
+    # the failed poll is logged and the snapshot is still served
+    assert (await catalog.get_snapshot()).version == 1
+    await catalog._poll_task
+    mock_logger_exception.assert_called_once()
+
+    # the next read polls again and picks up the new version
+    await catalog.get_snapshot()
+    await catalog._poll_task
+    snapshot = await catalog.get_snapshot()
+    await catalog._poll_task
+    assert snapshot.version == 2
+    assert list(snapshot.items_by_id) == ['item2']
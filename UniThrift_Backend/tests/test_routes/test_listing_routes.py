@@ -1,6 +1,8 @@
+from datetime import datetime
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from bson import ObjectId
 from fastapi import FastAPI, status
 from httpx import AsyncClient
 
@@ -14,13 +16,13 @@ app.include_router(router)
 
 
 @pytest.mark.asyncio
-@patch('app.server.services.listing.core_service.read_one', new_callable=AsyncMock)
+@patch('app.server.services.listing.item_catalog.get_item', new_callable=AsyncMock)
 @patch('app.server.services.listing.core_service.create_one', new_callable=AsyncMock)
 @patch('app.server.routes.listing.JWTAuthUser.__call__', new_callable=Mock)
-async def test_listing_create_success(mock_jwt_auth_user, mock_create_one, mock_read_one):
+async def test_listing_create_success(mock_jwt_auth_user, mock_create_one, mock_get_item):
     mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.STUDENT}]
 
-    mock_read_one.side_effect = [{'_id': 'item123', 'item_name': 'Item 1'}]
+    mock_get_item.side_effect = [{'_id': 'item123', 'item_name': 'Item 1'}]
 
     mock_create_one.side_effect = [{'_id': 'listing123'}]
 
@@ -34,18 +36,18 @@ async def test_listing_create_success(mock_jwt_auth_user, mock_create_one, mock_
     assert response.status_code == status.HTTP_200_OK
     assert response.json().get('status') == 'SUCCESS'
 
-    mock_read_one.assert_any_call(Collections.ITEMS, data_filter={'_id': 'item123'})
+    mock_get_item.assert_any_call('item123')
 
     mock_create_one.assert_any_call(Collections.LISTINGS, data=create_one_payload)
 
 
 @pytest.mark.asyncio
-@patch('app.server.services.listing.core_service.read_one', new_callable=AsyncMock)
+@patch('app.server.services.listing.item_catalog.get_item', new_callable=AsyncMock)
 @patch('app.server.routes.listing.JWTAuthUser.__call__', new_callable=Mock)
-async def test_listing_create_fail_1(mock_jwt_auth_user, mock_read_one):
+async def test_listing_create_fail_1(mock_jwt_auth_user, mock_get_item):
     mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.STUDENT}]
 
-    mock_read_one.side_effect = [None]
+    mock_get_item.side_effect = [None]
 
     request_payload = {'title': 'Listing 1', 'item_id': 'item123', 'description': 'Description 1', 'price': 100}
 
@@ -55,19 +57,19 @@ async def test_listing_create_fail_1(mock_jwt_auth_user, mock_read_one):
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert response.json().get('detail') == localization.EXCEPTION_ITEM_NOT_FOUND
 
-    mock_read_one.assert_any_call(Collections.ITEMS, data_filter={'_id': 'item123'})
+    mock_get_item.assert_any_call('item123')
 
 
 @pytest.mark.asyncio
 @patch('app.server.services.listing.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.listing.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.listing.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.routes.listing.JWTAuthUser.__call__', new_callable=Mock)
-async def test_listing_update_success(mock_jwt_auth_user, mock_update_one, mock_read_one):
+async def test_listing_update_success(mock_jwt_auth_user, mock_update_one_lean, mock_read_one):
     mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.STUDENT}]
 
     mock_read_one.side_effect = [{'_id': 'listing123', 'status': ListingStatus.NEW}]
 
-    mock_update_one.side_effect = [None]
+    mock_update_one_lean.side_effect = [None]
 
     request_payload = {'title': 'Listing 1'}
 
@@ -79,7 +81,7 @@ async def test_listing_update_success(mock_jwt_auth_user, mock_update_one, mock_
 
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123', 'seller_id': 'user123', 'is_deleted': False})
 
-    mock_update_one.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123'}, update={'$set': request_payload}, upsert=True)
+    mock_update_one_lean.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123'}, update={'$set': request_payload}, upsert=True)
 
 
 @pytest.mark.asyncio
@@ -103,14 +105,14 @@ async def test_listing_update_fail_1(mock_jwt_auth_user, mock_read_one):
 
 @pytest.mark.asyncio
 @patch('app.server.services.listing.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.listing.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.listing.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.routes.listing.JWTAuthUser.__call__', new_callable=Mock)
-async def test_listing_delete_success(mock_jwt_auth_user, mock_update_one, mock_read_one):
+async def test_listing_delete_success(mock_jwt_auth_user, mock_update_one_lean, mock_read_one):
     mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.STUDENT}]
 
     mock_read_one.side_effect = [{'_id': 'listing123', 'status': ListingStatus.NEW}]
 
-    mock_update_one.side_effect = [None]
+    mock_update_one_lean.side_effect = [None]
 
     async with AsyncClient(app=app, base_url='http://testserver') as client:
         response = await client.delete('/listing/delete/listing123', headers={'Authorization': 'Bearer token'})
@@ -119,7 +121,7 @@ async def test_listing_delete_success(mock_jwt_auth_user, mock_update_one, mock_
     assert response.json().get('status') == 'SUCCESS'
 
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123', 'seller_id': 'user123', 'is_deleted': False})
-    mock_update_one.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123'}, update={'$set': {'is_deleted': True}}, upsert=False)
+    mock_update_one_lean.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123'}, update={'$set': {'is_deleted': True}}, upsert=False)
 
 
 @pytest.mark.asyncio
@@ -140,3 +142,42 @@ async def test_listing_delete_fail_1(mock_jwt_auth_user, mock_update_one, mock_r
     assert response.json().get('detail') == localization.EXCEPTION_LISTING_NOT_FOUND
 
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123', 'seller_id': 'user123', 'is_deleted': False})
+
+
+@pytest.mark.asyncio
+@patch('app.server.services.listing.core_service.read_many', new_callable=AsyncMock)
+@patch('app.server.routes.listing.JWTAuthUser.__call__', new_callable=Mock)
+async def test_listing_get_listings_cursor_success(mock_jwt_auth_user, mock_read_many):
+    mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.STUDENT}]
+
+    mock_read_many.side_effect = [{'data': [{'_id': 'listing123', 'updated_at': 1}], 'metadata': {'page_size': 1, 'has_next_page': True, 'next_cursor': 'cursor456'}}]
+
+    data_filter = {'$and': [{'status': {'$in': [ListingStatus.ON_HOLD, ListingStatus.NEW]}}, {'status': {'$ne': ListingStatus.SOLD}}], 'is_deleted': False}
+
+    async with AsyncClient(app=app, base_url='http://testserver') as client:
+        response = await client.get('/listing/get_listings', params={'page_size': 1, 'cursor': 'cursor123'}, headers={'Authorization': 'Bearer token'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get('data') == [{'_id': 'listing123', 'updated_at': 1}]
+    assert response.json().get('metadata').get('next_cursor') == 'cursor456'
+
+    mock_read_many.assert_any_call(collection_name=Collections.LISTINGS, data_filter=data_filter, sort={'updated_at': -1}, page=1, page_size=1, cursor='cursor123', paging_data=True)
+
+
+@pytest.mark.asyncio
+@patch('app.server.services.listing.core_service.read_many', new_callable=AsyncMock)
+@patch('app.server.routes.listing.JWTAuthUser.__call__', new_callable=Mock)
+async def test_listing_get_listings_encoded_without_jsonable_encoder(mock_jwt_auth_user, mock_read_many):
+    mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.STUDENT}]
+    listing_id = ObjectId()
+    mock_read_many.side_effect = [
+        {'data': [{'_id': listing_id, 'status': ListingStatus.NEW, 'created_at': datetime(2024, 1, 2, 3, 4, 5)}], 'metadata': {'page_size': 1, 'has_next_page': False, 'next_cursor': None}}
+    ]
+
+    with patch('fastapi.routing.jsonable_encoder') as mock_jsonable_encoder:
+        async with AsyncClient(app=app, base_url='http://testserver') as client:
+            response = await client.get('/listing/get_listings', params={'page_size': 1}, headers={'Authorization': 'Bearer token'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get('data') == [{'_id': str(listing_id), 'status': 'NEW', 'created_at': '2024-01-02T03:04:05'}]
+    mock_jsonable_encoder.assert_not_called()
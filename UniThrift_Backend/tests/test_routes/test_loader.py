@@ -0,0 +1,109 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.server.database import loader
+
+
+class FakeCollection:
+    """Collection whose `find` answers `_id` `$in` queries from a dict and records every filter"""
+
+    def __init__(self, documents: dict) -> None:
+        self.documents = documents
+        self.filters = []
+
+    def find(self, data_filter):
+        self.filters.append(data_filter)
+        cursor = MagicMock()
+
+        async def to_list(_length):
+            return [self.documents[record_id] for record_id in data_filter['_id']['$in'] if record_id in self.documents]
+
+        cursor.to_list = to_list
+        return cursor
+
+
+@pytest.fixture
+def collection():
+    collection = FakeCollection({'a': {'_id': 'a', 'title': 'A'}, 'b': {'_id': 'b', 'title': 'B'}})
+    mongo = MagicMock()
+    mongo.get_collection.return_value = collection
+    with patch.object(loader, 'mongo', mongo):
+        yield collection
+
+
+@pytest.mark.asyncio
+async def test_loader_coalesces_concurrent_loads(collection):
+    async with loader.request_scope():
+        first, second = await asyncio.gather(loader.load_one('listings', 'a'), loader.load_one('listings', 'b'))
+
+    assert first == {'_id': 'a', 'title': 'A'}
+    assert second == {'_id': 'b', 'title': 'B'}
+    assert collection.filters == [{'_id': {'$in': ['a', 'b']}}]
+
+
+@pytest.mark.asyncio
+async def test_loader_fetches_duplicate_ids_once(collection):
+    async with loader.request_scope():
+        documents = await loader.load_many('listings', ['a', 'b', 'a'])
+        # later loads of the request are served from its cache
+        again = await loader.load_one('listings', 'a')
+
+    assert [document['_id'] for document in documents] == ['a', 'b', 'a']
+    assert again == documents[0]
+    assert collection.filters == [{'_id': {'$in': ['a', 'b']}}]
+
+
+@pytest.mark.asyncio
+async def test_loader_returns_a_copy_to_every_caller(collection):
+    collection.documents['a']['price'] = {'amount': 40}
+
+    async with loader.request_scope():
+        first, second = await asyncio.gather(loader.load_one('listings', 'a'), loader.load_one('listings', 'a'))
+        first['title'] = 'Changed'
+        first['price']['amount'] = 0
+        missing = await loader.load_one('listings', 'missing')
+        missing['title'] = 'Changed'
+        again = await loader.load_many('listings', ['a', 'missing'])
+
+    assert second == {'_id': 'a', 'title': 'A', 'price': {'amount': 40}}
+    assert again == [second, {}]
+    assert len(collection.filters) == 2
+
+
+@pytest.mark.asyncio
+async def test_loader_missing_id_resolves_to_empty_dict(collection):
+    async with loader.request_scope():
+        documents = await loader.load_many('listings', ['a', 'missing'])
+
+    assert documents == [{'_id': 'a', 'title': 'A'}, {}]
+
+
+@pytest.mark.asyncio
+async def test_loader_clear_reads_document_again(collection):
+    async with loader.request_scope():
+        await loader.load_one('listings', 'a')
+        loader.clear('listings', 'a')
+        await loader.load_one('listings', 'a')
+
+    assert collection.filters == [{'_id': {'$in': ['a']}}, {'_id': {'$in': ['a']}}]
+
+
+@pytest.mark.asyncio
+async def test_loader_outside_request_scope_does_not_cache(collection):
+    assert await loader.load_one('listings', 'a') == {'_id': 'a', 'title': 'A'}
+    assert await loader.load_one('listings', 'a') == {'_id': 'a', 'title': 'A'}
+
+    assert len(collection.filters) == 2
+
+
+@pytest.mark.asyncio
+async def test_loader_failed_lookup_is_retried(collection):
+    original_find = collection.find
+    collection.find = MagicMock(side_effect=[RuntimeError('network error'), original_find({'_id': {'$in': ['a']}})])
+
+    async with loader.request_scope():
+        with pytest.raises(RuntimeError):
+            await loader.load_one('listings', 'a')
+        assert await loader.load_one('listings', 'a') == {'_id': 'a', 'title': 'A'}
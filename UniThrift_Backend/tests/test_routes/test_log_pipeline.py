@@ -0,0 +1,119 @@
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import orjson
+import pytest
+from loguru import logger
+
+from app.server.logger.pipeline import BatchedLogSink, parse_sample_rates
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+
+
+def get_message(text: str, level: str = 'INFO') -> SimpleNamespace:
+    record = {
+        'time': datetime.now(),
+        'level': SimpleNamespace(name=level, no=LEVELS[level]),
+        'message': text,
+        'name': __name__,
+        'function': 'test',
+        'line': 1,
+        'process': SimpleNamespace(id=1),
+        'thread': SimpleNamespace(id=1),
+        'extra': {},
+        'exception': None,
+    }
+    return SimpleNamespace(record=record)
+
+
+def wait_for(condition, timeout: float = 2) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def read_messages(file_name) -> list[str]:
+    with open(file_name, encoding='utf-8') as log_file:
+        return [orjson.loads(line)['message'] for line in log_file]
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    return str(tmp_path / 'app.log')
+
+
+def test_batched_sink_writes_when_batch_is_full(log_file, capsys):
+    sink = BatchedLogSink(log_file, capacity=100, batch_size=3, flush_interval=60)
+    sink.write(get_message('first'))
+    sink.write(get_message('second'))
+    time.sleep(0.05)
+    assert sink.stats()['written'] == 0
+
+    sink.write(get_message('third'))
+    assert wait_for(lambda: sink.stats()['written'] == 3)
+    sink.stop()
+
+    assert read_messages(log_file) == ['first', 'second', 'third']
+    assert len(capsys.readouterr().out.splitlines()) == 3
+
+
+def test_batched_sink_writes_after_flush_interval(log_file):
+    sink = BatchedLogSink(log_file, capacity=100, batch_size=100, flush_interval=0.05)
+    sink.write(get_message('first'))
+
+    assert wait_for(lambda: sink.stats()['written'] == 1)
+    sink.stop()
+    assert read_messages(log_file) == ['first']
+
+
+def test_batched_sink_writes_queued_records_on_stop(log_file, capsys):
+    sink = BatchedLogSink(log_file, capacity=100, batch_size=100, flush_interval=60)
+    for index in range(5):
+        sink.write(get_message(f'record {index}'))
+    sink.write(get_message('failure', 'ERROR'))
+    assert sink.stats()['queued'] == 6
+
+    sink.stop()
+
+    assert sink.stats() == {'queued': 0, 'written': 6, 'dropped': {}, 'sampled_out': {}}
+    assert read_messages(log_file) == [f'record {index}' for index in range(5)] + ['failure']
+    # errors also go to stderr
+    assert [orjson.loads(line)['message'] for line in capsys.readouterr().err.splitlines()] == ['failure']
+
+
+def test_batched_sink_drops_oldest_records_when_full(log_file):
+    sink = BatchedLogSink(log_file, capacity=3, batch_size=100, flush_interval=60)
+    for text, level in (('a', 'INFO'), ('b', 'DEBUG'), ('c', 'INFO'), ('d', 'INFO'), ('e', 'ERROR')):
+        sink.write(get_message(text, level))
+
+    # writing never blocks, the two oldest records are overwritten and counted per level
+    assert sink.stats() == {'queued': 3, 'written': 0, 'dropped': {'INFO': 1, 'DEBUG': 1}, 'sampled_out': {}}
+    sink.stop()
+    assert read_messages(log_file) == ['c', 'd', 'e']
+
+
+@patch('app.server.logger.pipeline.random.random', return_value=0.5)
+def test_batched_sink_samples_levels_below_error(_mock_random, log_file):
+    sink = BatchedLogSink(log_file, capacity=100, batch_size=100, flush_interval=60, sample_rates=parse_sample_rates('DEBUG=0.1, info=0.9'))
+    for level in ('DEBUG', 'INFO', 'WARNING', 'ERROR'):
+        sink.write(get_message(level.lower(), level))
+    sink.stop()
+
+    assert sink.stats()['sampled_out'] == {'DEBUG': 1}
+    assert read_messages(log_file) == ['info', 'warning', 'error']
+
+
+def test_batched_sink_is_flushed_when_removed_from_loguru(log_file):
+    sink = BatchedLogSink(log_file, capacity=100, batch_size=100, flush_interval=60)
+    handler_id = logger.add(sink, level='DEBUG', format='{message}', filter=lambda record: record['extra'].get('sink') == 'batched')
+    logger.bind(sink='batched').info('through loguru')
+
+    logger.remove(handler_id)
+
+    assert sink.stats()['written'] == 1
+    assert read_messages(log_file) == ['through loguru']
@@ -0,0 +1,90 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.server.static.collections import Collections
+from app.server.static.indexes import INDEXES
+from app.server.utils import mongo_utils
+
+LISTING_INDEXES = [
+    IndexModel([('seller_id', ASCENDING), ('updated_at', DESCENDING)], name='seller_id_1_updated_at_-1'),
+    IndexModel([('expires_at', ASCENDING)], name='expires_at_1_ttl', expireAfterSeconds=3600),
+]
+
+
+@pytest.fixture
+def database():
+    database = AsyncMongoMockClient().db
+    # collMod is not implemented by mongomock
+    mongo = Mock(get_collection=database.get_collection, command=AsyncMock())
+    with patch.object(mongo_utils, 'mongo', mongo):
+        yield database, mongo
+
+
+async def get_index_options(collection) -> dict:
+    return {name: {option: value for option, value in index.items() if option in ('unique', 'expireAfterSeconds')} for name, index in (await collection.index_information()).items()}
+
+
+@pytest.mark.asyncio
+async def test_sync_creates_missing_indexes_then_is_a_no_op(database):
+    database, mongo = database
+
+    created = await mongo_utils.sync_collection_indexes(Collections.LISTINGS, LISTING_INDEXES)
+
+    assert created == ['seller_id_1_updated_at_-1', 'expires_at_1_ttl']
+    assert await get_index_options(database.listings) == {'_id_': {}, 'seller_id_1_updated_at_-1': {}, 'expires_at_1_ttl': {'expireAfterSeconds': 3600}}
+
+    with patch.object(database.listings, 'create_indexes', AsyncMock()) as mock_create_indexes:
+        assert await mongo_utils.sync_collection_indexes(Collections.LISTINGS, LISTING_INDEXES) == []
+    mock_create_indexes.assert_not_called()
+    mongo.command.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_sync_updates_changed_ttl_in_place(database):
+    database, mongo = database
+    await database.listings.create_indexes(LISTING_INDEXES)
+
+    indexes = [LISTING_INDEXES[0], IndexModel([('expires_at', ASCENDING)], name='expires_at_1_ttl', expireAfterSeconds=60)]
+    assert await mongo_utils.sync_collection_indexes(Collections.LISTINGS, indexes) == []
+
+    mongo.command.assert_called_once_with('collMod', Collections.LISTINGS, index={'name': 'expires_at_1_ttl', 'expireAfterSeconds': 60})
+
+
+@pytest.mark.asyncio
+@patch('app.server.utils.mongo_utils.logger.warning', new_callable=Mock)
+async def test_sync_reports_changed_index_unless_rebuild_is_enabled(mock_logger_warning, database):
+    database, _ = database
+    await database.listings.create_indexes(LISTING_INDEXES)
+    indexes = [IndexModel([('seller_id', ASCENDING), ('updated_at', DESCENDING)], name='seller_id_1_updated_at_-1', unique=True), LISTING_INDEXES[1]]
+
+    # by default the index is left in place and reported
+    assert await mongo_utils.sync_collection_indexes(Collections.LISTINGS, indexes, rebuild_changed=False) == []
+    assert 'unique' not in (await get_index_options(database.listings))['seller_id_1_updated_at_-1']
+    mock_logger_warning.assert_called_once()
+
+    # rebuilding drops the index and builds its declaration
+    assert await mongo_utils.sync_collection_indexes(Collections.LISTINGS, indexes, rebuild_changed=True) == ['seller_id_1_updated_at_-1']
+    assert (await get_index_options(database.listings))['seller_id_1_updated_at_-1'] == {'unique': True}
+
+
+def test_index_changes_compare_keys_and_options():
+    existing = {'_id_': {'key': [('_id', 1)]}, 'seller_id_1_updated_at_-1': {'key': [('seller_id', 1), ('updated_at', -1)]}, 'expires_at_1_ttl': {'key': [('expires_at', 1)], 'expireAfterSeconds': 60}}
+    indexes = [*LISTING_INDEXES, IndexModel([('status', ASCENDING)], name='status_1')]
+
+    missing, ttl_changed, conflicts = mongo_utils._get_index_changes(existing, indexes)  # pylint: disable=protected-access
+
+    assert [index.document['name'] for index in missing] == ['status_1']
+    assert [index.document['name'] for index in ttl_changed] == ['expires_at_1_ttl']
+    assert conflicts == []
+
+    existing['seller_id_1_updated_at_-1']['key'] = [('seller_id', 1), ('updated_at', 1)]
+    assert mongo_utils._get_index_changes(existing, indexes)[2] == ['seller_id_1_updated_at_-1']  # pylint: disable=protected-access
+
+
+def test_expiring_collections_declare_ttl_indexes():
+    for collection_name, field in ((Collections.OTP, 'expires_at'), (Collections.AUTH_INVALIDATIONS, 'invalidated_at')):
+        ttl_indexes = [index.document for index in INDEXES[collection_name] if 'expireAfterSeconds' in index.document]
+        assert [list(index['key']) for index in ttl_indexes] == [[field]]
@@ -0,0 +1,47 @@
+import datetime
+
+from pymongo import monitoring
+
+from app.server.database.monitoring import MongoMetrics
+
+ADDRESS = ('localhost', 27017)
+
+
+def test_mongo_metrics_pool_events():
+    metrics = MongoMetrics()
+    metrics.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 1))
+    metrics.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 2))
+    metrics.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, 1, 0.002))
+    metrics.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, 2, 0.004))
+    metrics.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 1))
+    metrics.pool_cleared(monitoring.PoolClearedEvent(ADDRESS))
+
+    pool = metrics.snapshot()['pool']
+    assert pool['connections_created'] == 2
+    assert pool['in_use'] == 1
+    assert pool['max_in_use'] == 2
+    assert pool['pool_clears'] == 1
+    assert pool['checkout_wait']['count'] == 2
+    assert pool['checkout_wait']['max_ms'] == 4.0
+    assert pool['checkout_wait']['mean_ms'] == 3.0
+
+    # the counters are cleared but the connections still in use are kept
+    metrics.reset()
+    pool = metrics.snapshot()['pool']
+    assert pool['pool_clears'] == 0
+    assert pool['connections_created'] == 0
+    assert pool['in_use'] == 1
+    assert callable(metrics.pool_cleared)
+
+
+def test_mongo_metrics_command_events():
+    metrics = MongoMetrics()
+    metrics.started(monitoring.CommandStartedEvent({'find': 'listings', 'filter': {}}, 'test', 7, ADDRESS, 1))
+    metrics.succeeded(monitoring.CommandSucceededEvent(datetime.timedelta(milliseconds=5), {'ok': 1}, 'find', 7, ADDRESS, 1))
+    metrics.started(monitoring.CommandStartedEvent({'getMore': 1, 'collection': 'listings'}, 'test', 8, ADDRESS, 1))
+    metrics.failed(monitoring.CommandFailedEvent(datetime.timedelta(milliseconds=1), {'ok': 0}, 'getMore', 8, ADDRESS, 1))
+
+    commands = metrics.snapshot()['commands']
+    assert commands['listings.find']['count'] == 1
+    assert commands['listings.find']['max_ms'] == 5.0
+    assert commands['listings.getMore']['errors'] == 1
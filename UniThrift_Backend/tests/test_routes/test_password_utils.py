@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.server.utils import password_utils
+from app.server.utils.password_utils import LegacySha256Verifier, PasswordHasher, PasswordVerifier, Pbkdf2Hasher, ScryptHasher
+
+HASHERS = [ScryptHasher(log_n=4), Pbkdf2Hasher(iterations=1000)]
+
+
+def get_corrupted_hashes(password_hash: str) -> list[str]:
+    algorithm, parameters, salt, digest = password_hash.split('$')[1:]
+    return [
+        f'${algorithm}$',
+        f'${algorithm}${parameters}${salt}',
+        f'{password_hash}$extra',
+        f'${algorithm}$garbage${salt}${digest}',
+        f'${algorithm}${parameters}${salt}${digest[:-2]}',
+        f'${algorithm}${parameters}$not*base64${digest}',
+        f'${algorithm}${parameters}${salt}$é',
+    ]
+
+
+def test_password_hasher_is_abstract():
+    with pytest.raises(TypeError):
+        PasswordHasher()  # pylint: disable=abstract-class-instantiated
+    with pytest.raises(TypeError):
+        PasswordVerifier()  # pylint: disable=abstract-class-instantiated
+
+
+def test_legacy_verifier_only_verifies():
+    verifier = LegacySha256Verifier()
+
+    assert not isinstance(verifier, PasswordHasher)
+    assert not hasattr(verifier, 'hash')
+    assert verifier.needs_rehash('0' * 64)
+
+
+def test_unavailable_password_hasher_is_a_configuration_error():
+    with pytest.raises(ValueError, match='Unknown PASSWORD_HASHER'):
+        password_utils._create_hasher('md5')  # pylint: disable=protected-access
+    with patch.dict(password_utils.HASHERS), patch.object(password_utils, 'argon2', None):
+        password_utils.HASHERS.pop('argon2id', None)
+        with pytest.raises(ValueError, match='argon2-cffi'):
+            password_utils._create_hasher('argon2id')  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize('hasher', HASHERS, ids=lambda hasher: hasher.algorithm)
+def test_password_hasher_verifies_own_hashes(hasher):
+    password_hash = hasher.hash('password123')
+
+    assert hasher.identify(password_hash)
+    assert hasher.verify('password123', password_hash)
+    assert not hasher.verify('password124', password_hash)
+    assert not hasher.needs_rehash(password_hash)
+
+
+@pytest.mark.parametrize('hasher', HASHERS, ids=lambda hasher: hasher.algorithm)
+def test_password_hasher_rejects_corrupted_hashes(hasher):
+    for corrupted_hash in get_corrupted_hashes(hasher.hash('password123')):
+        assert hasher.verify('password123', corrupted_hash) is False, corrupted_hash
+
+
+def test_scrypt_hasher_rejects_corrupted_parameters():
+    hasher = ScryptHasher(log_n=4)
+    _, algorithm, _, salt, digest = hasher.hash('password123').split('$')
+
+    for parameters in ('ln=4,r=8', 'ln=-1,r=8,p=1', 'ln=4,r=0,p=1', 'ln=x,r=8,p=1', 'ln4,r=8,p=1'):
+        assert hasher.verify('password123', f'${algorithm}${parameters}${salt}${digest}') is False, parameters
+
+
+def test_legacy_hasher_rejects_corrupted_hashes():
+    hasher = LegacySha256Verifier()
+
+    assert not hasher.verify('password123', 'é' * 64)
+    assert not hasher.verify('password123', '')
+
+
+@pytest.mark.asyncio
+async def test_check_password_with_corrupted_hash_is_unauthorized():
+    corrupted_hash = password_utils.hasher.hash('password123')[:-1] + '$'
+
+    with pytest.raises(HTTPException) as error:
+        await password_utils.check_password('password123', corrupted_hash)
+    assert error.value.status_code == 401
@@ -0,0 +1,61 @@
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.server.database import core_data
+from app.server.utils.query_utils import apply_projection
+
+DOCUMENT = {'_id': 'listing123', 'title': 'Desk', 'price': {'amount': 40, 'currency': 'USD'}, 'seller': {'name': 'John', 'email': 'john@example.com'}, 'tags': ['wood']}
+
+
+@pytest.mark.parametrize(
+    'projection, expected',
+    [
+        (None, DOCUMENT),
+        ({}, DOCUMENT),
+        ({'title': 1, 'tags': 1}, {'_id': 'listing123', 'title': 'Desk', 'tags': ['wood']}),
+        ({'title': 1, 'missing': 1}, {'_id': 'listing123', 'title': 'Desk'}),
+        ({'title': 0, 'price': 0}, {'_id': 'listing123', 'seller': {'name': 'John', 'email': 'john@example.com'}, 'tags': ['wood']}),
+        ({'price.amount': 1, 'seller.name': 1}, {'_id': 'listing123', 'price': {'amount': 40}, 'seller': {'name': 'John'}}),
+        ({'seller.email': 0, 'tags': 0}, {'_id': 'listing123', 'title': 'Desk', 'price': {'amount': 40, 'currency': 'USD'}, 'seller': {'name': 'John'}}),
+        ({'title.missing': 1}, {'_id': 'listing123'}),
+        ({'title': 1, '_id': 0}, {'title': 'Desk'}),
+        ({'_id': 0}, {key: value for key, value in DOCUMENT.items() if key != '_id'}),
+        ({'_id': 1}, {'_id': 'listing123'}),
+    ],
+)
+def test_apply_projection(projection, expected):
+    projected = apply_projection(DOCUMENT, projection)
+
+    assert projected == expected
+    assert list(projected) == list(expected)
+
+
+def test_apply_projection_leaves_document_untouched():
+    document = {'_id': 'listing123', 'seller': {'name': 'John', 'email': 'john@example.com'}}
+
+    projected = apply_projection(document, {'seller.email': 0})
+    projected['seller']['name'] = 'Jane'
+
+    assert document == {'_id': 'listing123', 'seller': {'name': 'John', 'email': 'john@example.com'}}
+    assert apply_projection(document, None) is not document
+
+
+@pytest.mark.asyncio
+async def test_create_one_returns_the_stored_document_in_a_session():
+    database = AsyncMongoMockClient().db
+
+    async def insert_one(document, session=None):
+        # mongomock does not handle sessions
+        return await database.listings.insert_one(document)
+
+    with patch.object(core_data, 'mongo', Mock(get_collection=Mock(return_value=Mock(insert_one=insert_one)))):
+        created = await core_data.create_one('listings', {'title': 'Desk', 'price': 40}, session=MagicMock())
+        stored = await database.listings.find_one({'_id': created['_id']})
+        projected = await core_data.create_one('listings', {'title': 'Chair', 'price': 20}, options={'title': 1})
+
+    # the full document is returned inside a session too, not only its _id
+    assert created == stored
+    assert created['title'] == 'Desk' and created['is_deleted'] is False
+    assert projected == {'_id': projected['_id'], 'title': 'Chair'}
@@ -95,11 +95,11 @@ async def test_queueing_failure3(mock_jwt_auth_user, mock_read_one):
 
 @pytest.mark.asyncio
 @patch('app.server.services.queueing.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.queueing.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.queueing.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.services.queueing.core_service.update_many', new_callable=AsyncMock)
 @patch('app.server.routes.queueing.JWTAuthUser.__call__', new_callable=AsyncMock)
 @patch('app.server.services.admin.core_service.get_session', new_callable=AsyncMock)
-async def test_queueing_mark_sale_complete_success(mock_get_session, mock_jwt_auth_user, mock_update_many, mock_update_one, mock_read_one):
+async def test_queueing_mark_sale_complete_success(mock_get_session, mock_jwt_auth_user, mock_update_many, mock_update_one_lean, mock_read_one):
     mock_session = MagicMock()
     mock_session.__aenter__.return_value = mock_session
     mock_session.__aexit__.return_value = None
@@ -123,8 +123,8 @@ async def test_queueing_mark_sale_complete_success(mock_get_session, mock_jwt_au
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter=read_one_payload1)
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter=read_one_payload2)
     mock_read_one.assert_any_call(Collections.TRANSACTIONS, data_filter=read_one_payload3)
-    mock_update_one.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123'}, update={'$set': update_one_payload1}, upsert=False, session=mock_session)
-    mock_update_one.assert_any_call(
+    mock_update_one_lean.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123'}, update={'$set': update_one_payload1}, upsert=False, session=mock_session)
+    mock_update_one_lean.assert_any_call(
         Collections.TRANSACTIONS, data_filter={'listing_id': 'listing123', 'buyer_id': 'buyer123'}, update={'$set': update_one_payload2}, upsert=False, session=mock_session
     )
     mock_update_many.assert_any_call(
@@ -191,10 +191,10 @@ async def test_queueing_mark_sale_complete_failure3(mock_jwt_auth_user, mock_rea
 
 @pytest.mark.asyncio
 @patch('app.server.services.queueing.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.queueing.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.queueing.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.routes.queueing.JWTAuthUser.__call__', new_callable=AsyncMock)
 @patch('app.server.services.admin.core_service.get_session', new_callable=AsyncMock)
-async def test_queueing_share_contact_success(mock_get_session, mock_jwt_auth_user, mock_update_one, mock_read_one):
+async def test_queueing_share_contact_success(mock_get_session, mock_jwt_auth_user, mock_update_one_lean, mock_read_one):
     mock_session = MagicMock()
     mock_session.__aenter__.return_value = mock_session
     mock_session.__aexit__.return_value = None
@@ -217,8 +217,8 @@ async def test_queueing_share_contact_success(mock_get_session, mock_jwt_auth_us
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter=read_one_payload1)
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter=read_one_payload2)
     mock_read_one.assert_any_call(Collections.TRANSACTIONS, data_filter=read_one_payload3)
-    mock_update_one.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123'}, update={'$set': update_one_payload1}, upsert=False, session=mock_session)
-    mock_update_one.assert_any_call(
+    mock_update_one_lean.assert_any_call(Collections.LISTINGS, data_filter={'_id': 'listing123'}, update={'$set': update_one_payload1}, upsert=False, session=mock_session)
+    mock_update_one_lean.assert_any_call(
         Collections.TRANSACTIONS, data_filter={'listing_id': 'listing123', 'buyer_id': 'buyer123'}, update={'$set': update_one_payload2}, upsert=False, session=mock_session
     )
 
@@ -282,9 +282,9 @@ async def test_queueing_share_contact_failure3(mock_jwt_auth_user, mock_read_one
 
 @pytest.mark.asyncio
 @patch('app.server.services.queueing.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.queueing.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.queueing.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.routes.queueing.JWTAuthUser.__call__', new_callable=AsyncMock)
-async def test_queueing_reject_interest_success(mock_jwt_auth_user, mock_update_one, mock_read_one):
+async def test_queueing_reject_interest_success(mock_jwt_auth_user, mock_update_one_lean, mock_read_one):
     mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.ADMIN}]
     mock_read_one.side_effect = [{'_id': 'listing123', 'seller_id': 'user123'}, None, {'listing_id': 'listing123', 'buyer_id': 'user123'}]
     request_payload = {'listing_id': 'listing123', 'buyer_id': 'buyer123'}
@@ -301,7 +301,7 @@ async def test_queueing_reject_interest_success(mock_jwt_auth_user, mock_update_
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter=read_one_payload1)
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter=read_one_payload2)
     mock_read_one.assert_any_call(Collections.TRANSACTIONS, data_filter=read_one_payload3)
-    mock_update_one.assert_any_call(Collections.TRANSACTIONS, data_filter={'listing_id': 'listing123', 'buyer_id': 'buyer123'}, update={'$set': update_one_payload}, upsert=False)
+    mock_update_one_lean.assert_any_call(Collections.TRANSACTIONS, data_filter={'listing_id': 'listing123', 'buyer_id': 'buyer123'}, update={'$set': update_one_payload}, upsert=False)
 
 
 @pytest.mark.asyncio
@@ -359,3 +359,71 @@ async def test_queueing_reject_interest_failure3(mock_jwt_auth_user, mock_read_o
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter=read_one_payload1)
     mock_read_one.assert_any_call(Collections.LISTINGS, data_filter=read_one_payload2)
     mock_read_one.assert_any_call(Collections.TRANSACTIONS, data_filter=read_one_payload3)
+
+
+@pytest.mark.asyncio
+@patch('app.server.services.queueing.core_service.query_read', new_callable=AsyncMock)
+@patch('app.server.services.queueing.core_service.read_one', new_callable=AsyncMock)
+@patch('app.server.services.queueing.loader.load_one', new_callable=AsyncMock)
+@patch('app.server.routes.queueing.JWTAuthUser.__call__', new_callable=AsyncMock)
+async def test_queueing_get_listing_interactions_seller_success(mock_jwt_auth_user, mock_load_one, mock_read_one, mock_query_read):
+    mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.STUDENT}]
+    mock_load_one.side_effect = [{'_id': 'listing123', 'seller_id': 'user123'}]
+    mock_query_read.side_effect = [
+        {
+            'data': [{'listing_id': 'listing123', 'buyer_id': 'buyer1', 'buyer_name': 'John Doe'}, {'listing_id': 'listing123', 'buyer_id': 'buyer2', 'buyer_name': 'Jane Roe'}],
+            'metadata': {'current_page': 1, 'page_size': 2, 'has_next_page': True, 'total_records': 3, 'next_cursor': None},
+        }
+    ]
+    async with AsyncClient(app=app, base_url='http://testserver') as client:
+        response = await client.get('/queueing/get_listing_interactions/listing123?page_size=2', headers={'Authorization': 'Bearer token'})
+    assert response.status_code == status.HTTP_200_OK
+    assert [user['buyer_name'] for user in response.json()['data']] == ['John Doe', 'Jane Roe']
+    assert response.json()['metadata']['has_next_page'] is True
+    mock_load_one.assert_called_once_with(Collections.LISTINGS, 'listing123')
+    mock_read_one.assert_not_called()
+    mock_query_read.assert_called_once()
+    assert mock_query_read.call_args.kwargs['aggregate'] == [{'$match': {'listing_id': 'listing123'}}]
+    assert mock_query_read.call_args.kwargs['page_size'] == 2
+
+
+@pytest.mark.asyncio
+@patch('app.server.services.queueing.core_service.read_one', new_callable=AsyncMock)
+@patch('app.server.services.queueing.loader.load_one', new_callable=AsyncMock)
+@patch('app.server.routes.queueing.JWTAuthUser.__call__', new_callable=AsyncMock)
+async def test_queueing_get_listing_interactions_buyer_success(mock_jwt_auth_user, mock_load_one, mock_read_one):
+    mock_jwt_auth_user.side_effect = [{'user_id': 'buyer1', 'user_type': Role.STUDENT}]
+    mock_load_one.side_effect = [{'_id': 'listing123', 'seller_id': 'user123'}, {'_id': 'user123', 'first_name': 'John', 'last_name': 'Doe', 'email': 'john@doe.com', 'phone': '123'}]
+    mock_read_one.side_effect = [{'listing_id': 'listing123', 'buyer_id': 'buyer1', 'status': SaleStatus.SHARE_DETAILS}]
+    async with AsyncClient(app=app, base_url='http://testserver') as client:
+        response = await client.get('/queueing/get_listing_interactions/listing123', headers={'Authorization': 'Bearer token'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['data']['seller_name'] == 'John Doe'
+    assert response.json()['metadata'] is None
+    mock_read_one.assert_called_once_with(Collections.TRANSACTIONS, data_filter={'listing_id': 'listing123', 'buyer_id': 'buyer1'})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('page_size', [1, 10, 50])
+@patch('app.server.database.core_data.mongo')
+@patch('app.server.routes.queueing.JWTAuthUser.__call__', new_callable=AsyncMock)
+async def test_queueing_get_interested_listings_constant_db_calls(mock_jwt_auth_user, mock_mongo, page_size):
+    mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.STUDENT}]
+    transactions = [{'_id': f'transaction{i}', 'listing_id': f'listing{i}', 'updated_at': i, 'title': 'Listing', 'seller_id': 'seller123', 'price': 100} for i in range(page_size + 1)]
+
+    def aggregate(pipeline):
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(return_value=[{'total': 100}] if '$count' in pipeline[-1] else transactions)
+        return cursor
+
+    mock_mongo.get_collection.return_value.aggregate.side_effect = aggregate
+    async with AsyncClient(app=app, base_url='http://testserver') as client:
+        response = await client.get(f'/queueing/get_interested_listings?page_size={page_size}', headers={'Authorization': 'Bearer token'})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()['data']) == page_size
+    assert response.json()['metadata']['has_next_page'] is True
+    # one aggregation for the page with the listings joined in, one for the total count
+    assert mock_mongo.get_collection.return_value.aggregate.call_count == 2
+    page_pipeline = mock_mongo.get_collection.return_value.aggregate.call_args_list[0].args[0]
+    assert [next(iter(stage)) for stage in page_pipeline] == ['$match', '$sort', '$skip', '$limit', '$lookup', '$addFields', '$project']
+    mock_mongo.get_collection.assert_called_with(Collections.TRANSACTIONS)
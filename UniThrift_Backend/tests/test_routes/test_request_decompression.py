@@ -0,0 +1,81 @@
+import gzip
+import zlib
+
+import orjson
+import pytest
+from fastapi import FastAPI, Request, status
+from httpx import AsyncClient
+from starlette.exceptions import HTTPException
+
+from app.server.handler.error_handler import http_exception_handler
+from app.server.middlewares.decompression import RequestDecompressionMiddleware
+
+MAX_SIZE = 4 * 1024 * 1024
+
+app = FastAPI()
+app.add_exception_handler(HTTPException, http_exception_handler)
+app.add_middleware(RequestDecompressionMiddleware, max_size=MAX_SIZE)
+
+
+@app.post('/api/v1/bulk')
+async def bulk(request: Request):
+    items = orjson.loads(await request.body())
+    return {'count': len(items), 'content_encoding': request.headers.get('content-encoding')}
+
+
+def get_bulk_payload(count: int = 20000) -> bytes:
+    return orjson.dumps([{'item_name': f'Item {index}', 'item_description': 'Sample description', 'price': index} for index in range(count)])
+
+
+async def post(body: bytes, encoding: str, path: str = '/api/v1/bulk'):
+    async with AsyncClient(app=app, base_url='http://testserver') as client:
+        return await client.post(path, content=body, headers={'Content-Encoding': encoding, 'Content-Type': 'application/json'})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('encoding, compress', [('gzip', gzip.compress), ('deflate', zlib.compress)])
+async def test_bulk_payload_decompressed(encoding, compress):
+    payload = get_bulk_payload()
+    assert len(payload) > 1024 * 1024
+    response = await post(compress(payload), encoding)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {'count': 20000, 'content_encoding': None}
+
+
+@pytest.mark.asyncio
+async def test_zstd_bulk_payload_decompressed():
+    zstandard = pytest.importorskip('zstandard')
+    response = await post(zstandard.ZstdCompressor().compress(get_bulk_payload()), 'zstd')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['count'] == 20000
+
+
+@pytest.mark.asyncio
+async def test_truncated_zstd_payload():
+    zstandard = pytest.importorskip('zstandard')
+    response = await post(zstandard.ZstdCompressor().compress(get_bulk_payload(100))[:-20], 'zstd')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()['status'] == 'FAIL'
+
+
+@pytest.mark.asyncio
+async def test_decompressed_size_limit():
+    # a few KB of gzip which inflate to far more than the limit
+    response = await post(gzip.compress(b'0' * (MAX_SIZE * 8)), 'gzip')
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert response.json()['status'] == 'FAIL'
+
+
+@pytest.mark.asyncio
+async def test_invalid_compressed_payload():
+    response = await post(b'not gzip data', 'gzip')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = await post(gzip.compress(get_bulk_payload(100))[:-20], 'gzip')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_unsupported_content_encoding():
+    response = await post(get_bulk_payload(10), 'compress')
+    assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    assert response.json()['status'] == 'FAIL'
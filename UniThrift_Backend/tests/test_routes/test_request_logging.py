@@ -0,0 +1,85 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import FastAPI, HTTPException, status
+from fastapi.responses import JSONResponse
+from httpx import AsyncClient
+from loguru import logger
+
+from app.server.middlewares.tracker import RequestsTrackerMiddleware
+
+
+def get_app(**options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/ok')
+    async def ok():
+        return {'status': 'SUCCESS'}
+
+    @app.get('/rejected')
+    async def rejected():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Listing not found')
+
+    @app.get('/failed')
+    async def failed():
+        return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={'status': 'FAIL'})
+
+    @app.get('/crashed')
+    async def crashed():
+        raise RuntimeError('database is down')
+
+    app.add_middleware(RequestsTrackerMiddleware, **options)
+    return app
+
+
+@pytest.fixture
+def records():
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record), level='DEBUG', format='{message}')
+    with patch('app.server.middlewares.tracker.request_counters', Mock()):
+        yield records
+    logger.remove(handler_id)
+
+
+def get_logged(records) -> list[tuple[str, str, str]]:
+    return [(record['level'].name, record['message'], record['extra']['url']) for record in records if 'url' in record['extra']]
+
+
+@pytest.mark.asyncio
+@patch('app.server.middlewares.tracker.random.random')
+async def test_request_logging_respects_sample_rate(mock_random, records):
+    mock_random.side_effect = [0.05, 0.5, 0.09, 0.95]
+    async with AsyncClient(app=get_app(sample_rate=0.1, slow_ms=-1), base_url='http://testserver') as client:
+        for _ in range(4):
+            await client.get('/ok')
+
+    assert get_logged(records) == [('DEBUG', 'Request received', '/ok')] * 2
+    assert mock_random.call_count == 4
+
+
+@pytest.mark.asyncio
+@patch('app.server.middlewares.tracker.random.random', return_value=0.99)
+async def test_request_logging_always_logs_errors(_mock_random, records):
+    async with AsyncClient(app=get_app(sample_rate=0, slow_ms=-1), base_url='http://testserver') as client:
+        await client.get('/ok')
+        await client.get('/rejected')
+        await client.get('/failed')
+        with pytest.raises(RuntimeError):
+            await client.get('/crashed')
+
+    assert get_logged(records) == [('WARNING', 'Request rejected', '/rejected'), ('ERROR', 'Request failed', '/failed'), ('ERROR', 'Request failed', '/crashed')]
+    crashed = [record for record in records if record['extra'].get('url') == '/crashed'][0]
+    assert crashed['extra']['status'] is None
+
+
+@pytest.mark.asyncio
+@patch('app.server.middlewares.tracker.random.random', return_value=0.99)
+async def test_request_logging_always_logs_slow_requests(_mock_random, records):
+    async with AsyncClient(app=get_app(sample_rate=0, slow_ms=0), base_url='http://testserver') as client:
+        await client.get('/ok', params={'page': 2})
+
+    assert get_logged(records) == [('WARNING', 'Request slow', '/ok?page=2')]
+    extra = records[-1]['extra']
+    assert extra['status'] == status.HTTP_200_OK
+    assert extra['response_size'] == len(b'{"status":"SUCCESS"}')
+    assert extra['duration_ms'] >= 0
@@ -0,0 +1,111 @@
+import gzip
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient
+
+from app.server.middlewares.compression import CompressionMiddleware
+from app.server.routes.common import router
+from app.server.static.collections import Collections
+from app.server.static.enums import TotalCount
+from app.server.utils import compression_utils
+from app.server.utils.response_cache import response_cache
+
+PAYLOAD = {'data': [{'name': f'University {index}', 'city': 'Sample city'} for index in range(200)], 'status': 'SUCCESS'}
+
+app = FastAPI()
+app.include_router(router)
+app.add_middleware(CompressionMiddleware, minimum_size=1000, route_levels={'/fast': {'gzip': 1}})
+
+
+@app.get('/large')
+async def large():
+    return PAYLOAD
+
+
+@app.get('/fast')
+async def fast():
+    return PAYLOAD
+
+
+@app.get('/small')
+async def small():
+    return {'status': 'SUCCESS'}
+
+
+@app.get('/stream')
+async def stream():
+    return StreamingResponse((b'chunk ' * 1000 for _ in range(5)), media_type='text/plain')
+
+
+async def get(path: str, accept_encoding: str, **kwargs):
+    async with AsyncClient(app=app, base_url='http://testserver') as client:
+        response = await client.get(path, headers={'Accept-Encoding': accept_encoding}, **kwargs)
+    return response
+
+
+@pytest.mark.parametrize(
+    'accept_encoding, expected',
+    [('gzip, deflate', 'gzip'), ('identity', None), ('', None), ('gzip;q=0', None), ('*', compression_utils.ENCODINGS[0]), ('*;q=0.5, gzip;q=1', 'gzip'), ('deflate, gzip;q=0.1', 'gzip')],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    assert compression_utils.negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.asyncio
+async def test_response_compressed_with_negotiated_encoding():
+    response = await get('/large', 'gzip')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert int(response.headers['content-length']) < len(response.content)
+    assert response.json() == PAYLOAD
+
+    response = await get('/large', 'identity')
+    assert 'content-encoding' not in response.headers
+    assert response.json() == PAYLOAD
+
+
+@pytest.mark.asyncio
+async def test_route_compression_level():
+    with patch('app.server.utils.compression_utils.compress', wraps=compression_utils.compress) as mock_compress:
+        default = await get('/large', 'gzip')
+        fast = await get('/fast', 'gzip')
+    assert fast.json() == default.json() == PAYLOAD
+    assert [call.args[1:] for call in mock_compress.call_args_list] == [('gzip', compression_utils.DYNAMIC_LEVELS['gzip']), ('gzip', 1)]
+
+
+@pytest.mark.asyncio
+async def test_small_and_streamed_responses():
+    response = await get('/small', 'gzip')
+    assert 'content-encoding' not in response.headers
+    assert response.json() == {'status': 'SUCCESS'}
+
+    response = await get('/stream', 'gzip')
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.text == 'chunk ' * 5000
+
+
+@pytest.mark.asyncio
+@patch('app.server.services.common.core_service.query_read', new_callable=AsyncMock)
+async def test_universities_served_precompressed_from_cache(mock_query_read):
+    response_cache.clear()
+    mock_query_read.side_effect = [PAYLOAD['data']]
+    params = {'page': 1, 'page_size': 200}
+    with patch('app.server.utils.compression_utils.compress', wraps=compression_utils.compress) as mock_compress:
+        first = await get('/common/get_universities', 'gzip', params=params)
+        second = await get('/common/get_universities', 'gzip', params=params)
+        identity = await get('/common/get_universities', 'identity', params=params)
+    assert first.status_code == status.HTTP_200_OK
+    assert first.json() == second.json() == identity.json() == PAYLOAD
+    assert first.headers['content-encoding'] == second.headers['content-encoding'] == 'gzip'
+    assert 'content-encoding' not in identity.headers
+    # the page is read and compressed in every encoding once, the hits only pick a variant
+    mock_query_read.assert_called_once_with(
+        collection_name=Collections.UNIVERSITIES, aggregate=[], page=1, page_size=200, paging_data=True, sort={'name': 1}, cursor=None, total_count=TotalCount.ESTIMATED
+    )
+    assert mock_compress.call_count == len(compression_utils.ENCODINGS)
+    assert gzip.decompress(response_cache.get(('universities', 1, 200, None, None)).variants['gzip']) == identity.content
+    response_cache.clear()
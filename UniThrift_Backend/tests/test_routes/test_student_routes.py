@@ -1,13 +1,14 @@
-from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, Mock, patch
 
 import pytest
-from fastapi import FastAPI, status
+from fastapi import FastAPI, HTTPException, status
 from httpx import AsyncClient
 
 from app.server.routes.student import router
 from app.server.static import localization
 from app.server.static.collections import Collections
 from app.server.static.enums import Role, VerificationType
+from app.server.utils import crypto_utils, password_utils
 
 app = FastAPI()
 app.include_router(router)
@@ -16,8 +17,9 @@ app.include_router(router)
 @pytest.mark.asyncio
 @patch('app.server.services.student.core_service.read_one', new_callable=AsyncMock)
 @patch('app.server.services.student.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.student.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.services.student.core_service.get_session', new_callable=AsyncMock)
-async def test_student_create_success(mock_get_session, mock_update_one, mock_read_one):
+async def test_student_create_success(mock_get_session, mock_update_one_lean, mock_update_one, mock_read_one):
     mock_session = MagicMock()
     mock_session.__aenter__.return_value = mock_session
     mock_session.__aexit__.return_value = None
@@ -25,7 +27,7 @@ async def test_student_create_success(mock_get_session, mock_update_one, mock_re
 
     mock_read_one.side_effect = [None, None, None]
 
-    mock_update_one.side_effect = [{'_id': 'user123', 'email': 'test@example.com'}, None]
+    mock_update_one.side_effect = [{'_id': 'user123', 'email': 'test@example.com'}]
 
     request_payload = {
         'first_name': 'John',
@@ -62,7 +64,10 @@ async def test_student_create_success(mock_get_session, mock_update_one, mock_re
 
     mock_update_one.assert_any_call(Collections.USERS, data_filter={'email': request_payload['email']}, update={'$set': update_one_payload}, upsert=True, session=mock_session)
 
-    assert mock_update_one.call_count == 2
+    assert mock_update_one.call_count == 1
+    mock_update_one_lean.assert_called_once()
+    assert mock_update_one_lean.call_args.args[0] == Collections.PASSWORD
+    assert mock_update_one_lean.call_args.kwargs['data_filter'] == {'user_id': 'user123'}
     assert mock_get_session.call_count == 1
 
 
@@ -94,16 +99,14 @@ async def test_student_create_fail_1(mock_read_one):
 @pytest.mark.asyncio
 @patch('app.server.services.student.core_service.read_one', new_callable=AsyncMock)
 @patch('app.server.services.student.create_login_token', new_callable=AsyncMock)
-@patch('app.server.services.student.password_utils.check_password', new_callable=Mock)
-@patch('app.server.services.student.core_service.update_one', new_callable=AsyncMock)
-async def test_student_login_success(mock_update_one, mock_check_password, mock_create_login_token, mock_read_one):
+@patch('app.server.services.student.password_utils.check_password', new_callable=AsyncMock)
+@patch('app.server.services.student.token_util.update_last_login', new_callable=Mock)
+async def test_student_login_success(mock_update_last_login, mock_check_password, mock_create_login_token, mock_read_one):
     mock_read_one.side_effect = [{'_id': 'user123', 'is_verified': True, 'user_type': Role.STUDENT}, {'_id': 'id123', 'user_id': 'user123', 'password': 'hashed_password'}]
 
     mock_create_login_token.side_effect = [{'access_token': 'access_token', 'access_token_expiry': 1000, 'refresh_token': 'refresh_token'}]
 
-    mock_check_password.side_effect = [True]
-
-    mock_update_one.side_effect = [None]
+    mock_check_password.side_effect = [None]
 
     request_payload = {'email': 'test@example.com', 'password': 'password123'}
 
@@ -120,7 +123,29 @@ async def test_student_login_success(mock_update_one, mock_check_password, mock_
     assert mock_read_one.call_count == 2
     assert mock_check_password.call_count == 1
     assert mock_create_login_token.call_count == 1
-    assert mock_update_one.call_count == 1
+    mock_update_last_login.assert_called_once_with('user123')
+
+
+@pytest.mark.asyncio
+@patch('app.server.services.student.core_service.read_one', new_callable=AsyncMock)
+@patch('app.server.services.student.core_service.update_one_lean', new_callable=AsyncMock)
+@patch('app.server.services.student.create_login_token', new_callable=AsyncMock)
+@patch('app.server.services.student.token_util.update_last_login', new_callable=Mock)
+async def test_student_login_rehashes_legacy_password(mock_update_last_login, mock_create_login_token, mock_update_one_lean, mock_read_one):
+    legacy_hash = crypto_utils.sha256('password123')
+    mock_read_one.side_effect = [{'_id': 'user123', 'is_verified': True, 'user_type': Role.STUDENT}, {'_id': 'id123', 'user_id': 'user123', 'password': legacy_hash}]
+    mock_create_login_token.side_effect = [{'access_token': 'access_token', 'access_token_expiry': 1000, 'refresh_token': 'refresh_token'}]
+
+    async with AsyncClient(app=app, base_url='http://testserver') as client:
+        response = await client.post('/student/login', json={'email': 'test@example.com', 'password': 'password123'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert mock_update_one_lean.call_count == 1
+    new_hash = mock_update_one_lean.call_args.kwargs['update']['$set']['password']
+    assert new_hash.startswith(f'${password_utils.hasher.algorithm}$')
+    assert await password_utils.check_password('password123', new_hash) is None
+    with pytest.raises(HTTPException):
+        await password_utils.check_password('password124', new_hash)
 
 
 @pytest.mark.asyncio
@@ -181,13 +206,13 @@ async def test_student_send_otp_fail_1(mock_read_one):
 
 @pytest.mark.asyncio
 @patch('app.server.services.student.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.student.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.student.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.services.student.template_util.get_template', new_callable=AsyncMock)
 @patch('app.server.services.student.email_service.send_email', new_callable=AsyncMock)
-async def test_student_send_otp_fail_2(mock_send_email, mock_get_template, mock_update_one, mock_read_one):
+async def test_student_send_otp_fail_2(mock_send_email, mock_get_template, mock_update_one_lean, mock_read_one):
     mock_read_one.side_effect = [{'_id': 'user123', 'email': 'test@example.com', 'first_name': 'John', 'last_name': 'Doe'}]
 
-    mock_update_one.side_effect = [None]
+    mock_update_one_lean.side_effect = [None]
 
     mock_get_template.side_effect = [None]
 
@@ -205,16 +230,16 @@ async def test_student_send_otp_fail_2(mock_send_email, mock_get_template, mock_
 
     mock_read_one.assert_any_call(Collections.USERS, data_filter=read_one_payload)
 
-    assert mock_update_one.call_count == 1
+    assert mock_update_one_lean.call_count == 1
     assert mock_get_template.call_count == 1
     assert mock_send_email.call_count == 1
 
 
 @pytest.mark.asyncio
 @patch('app.server.services.student.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.student.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.student.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.services.student.core_service.get_session', new_callable=AsyncMock)
-async def test_student_verify_otp_success(mock_get_session, mock_update_one, mock_read_one):
+async def test_student_verify_otp_success(mock_get_session, mock_update_one_lean, mock_read_one):
     mock_session = MagicMock()
     mock_session.__aenter__.return_value = mock_session
     mock_session.__aexit__.return_value = None
@@ -225,7 +250,7 @@ async def test_student_verify_otp_success(mock_get_session, mock_update_one, moc
         {'_id': 'id123', 'expiry': 10**20, 'user_id': 'user123', 'otp': '123456', 'is_used': False, 'used_for': VerificationType.AUTHENTICATION},
     ]
 
-    mock_update_one.side_effect = [None, None]
+    mock_update_one_lean.side_effect = [None, None]
 
     request_payload = {'email': 'test@example.com', 'otp': '123456', 'password': 'password123', 'verification_type': VerificationType.AUTHENTICATION}
 
@@ -243,18 +268,18 @@ async def test_student_verify_otp_success(mock_get_session, mock_update_one, moc
 
     mock_read_one.assert_any_call(Collections.OTP, data_filter=otp_read_one_payload)
 
-    mock_update_one.assert_any_call(Collections.USERS, data_filter={'_id': 'user123'}, update={'$set': {'is_verified': True}}, upsert=True, session=mock_session)
+    mock_update_one_lean.assert_any_call(Collections.USERS, data_filter={'_id': 'user123'}, update={'$set': {'is_verified': True}}, upsert=True, session=mock_session)
 
-    mock_update_one.assert_any_call(Collections.OTP, data_filter={'user_id': 'user123'}, update={'$set': {'is_used': True}}, upsert=True, session=mock_session)
+    mock_update_one_lean.assert_any_call(Collections.OTP, data_filter={'user_id': 'user123'}, update={'$set': {'is_used': True}}, upsert=True, session=mock_session)
 
-    assert mock_update_one.call_count == 2
+    assert mock_update_one_lean.call_count == 2
 
 
 @pytest.mark.asyncio
 @patch('app.server.services.student.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.student.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.student.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.services.student.core_service.get_session', new_callable=AsyncMock)
-async def test_student_verify_otp_authentication_success(mock_get_session, mock_update_one, mock_read_one):
+async def test_student_verify_otp_authentication_success(mock_get_session, mock_update_one_lean, mock_read_one):
     mock_session = MagicMock()
     mock_session.__aenter__.return_value = mock_session
     mock_session.__aexit__.return_value = None
@@ -265,7 +290,7 @@ async def test_student_verify_otp_authentication_success(mock_get_session, mock_
         {'_id': 'id123', 'expiry': 10**20, 'user_id': 'user123', 'otp': '123456', 'is_used': False, 'used_for': VerificationType.AUTHENTICATION},
     ]
 
-    mock_update_one.side_effect = [None, None]
+    mock_update_one_lean.side_effect = [None, None]
 
     request_payload = {'email': 'test@example.com', 'otp': '123456', 'password': 'password123', 'verification_type': VerificationType.AUTHENTICATION}
 
@@ -283,18 +308,18 @@ async def test_student_verify_otp_authentication_success(mock_get_session, mock_
 
     mock_read_one.assert_any_call(Collections.OTP, data_filter=otp_read_one_payload)
 
-    mock_update_one.assert_any_call(Collections.USERS, data_filter={'_id': 'user123'}, update={'$set': {'is_verified': True}}, upsert=True, session=mock_session)
+    mock_update_one_lean.assert_any_call(Collections.USERS, data_filter={'_id': 'user123'}, update={'$set': {'is_verified': True}}, upsert=True, session=mock_session)
 
-    mock_update_one.assert_any_call(Collections.OTP, data_filter={'user_id': 'user123'}, update={'$set': {'is_used': True}}, upsert=True, session=mock_session)
+    mock_update_one_lean.assert_any_call(Collections.OTP, data_filter={'user_id': 'user123'}, update={'$set': {'is_used': True}}, upsert=True, session=mock_session)
 
-    assert mock_update_one.call_count == 2
+    assert mock_update_one_lean.call_count == 2
 
 
 @pytest.mark.asyncio
 @patch('app.server.services.student.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.student.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.student.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.services.student.core_service.get_session', new_callable=AsyncMock)
-async def test_student_verify_otp_forgot_password_success(mock_get_session, mock_update_one, mock_read_one):
+async def test_student_verify_otp_forgot_password_success(mock_get_session, mock_update_one_lean, mock_read_one):
     mock_session = MagicMock()
     mock_session.__aenter__.return_value = mock_session
     mock_session.__aexit__.return_value = None
@@ -305,7 +330,7 @@ async def test_student_verify_otp_forgot_password_success(mock_get_session, mock
         {'_id': 'id123', 'expiry': 10**20, 'user_id': 'user123', 'otp': '123456', 'is_used': False, 'used_for': VerificationType.AUTHENTICATION},
     ]
 
-    mock_update_one.side_effect = [None, None]
+    mock_update_one_lean.side_effect = [None, None]
 
     request_payload = {'email': 'test@example.com', 'otp': '123456', 'password': 'password123', 'verification_type': VerificationType.FORGOT_PASSWORD}
 
@@ -323,9 +348,9 @@ async def test_student_verify_otp_forgot_password_success(mock_get_session, mock
 
     mock_read_one.assert_any_call(Collections.OTP, data_filter=otp_read_one_payload)
 
-    mock_update_one.assert_any_call(Collections.OTP, data_filter={'user_id': 'user123'}, update={'$set': {'is_used': True}}, upsert=True, session=mock_session)
+    mock_update_one_lean.assert_any_call(Collections.OTP, data_filter={'user_id': 'user123'}, update={'$set': {'is_used': True}}, upsert=True, session=mock_session)
 
-    assert mock_update_one.call_count == 2
+    assert mock_update_one_lean.call_count == 2
 
 
 @pytest.mark.asyncio
@@ -355,9 +380,9 @@ async def test_student_verify_otp_fail_1(mock_read_one):
 
 @pytest.mark.asyncio
 @patch('app.server.services.student.core_service.read_one', new_callable=AsyncMock)
-@patch('app.server.services.student.core_service.update_one', new_callable=AsyncMock)
+@patch('app.server.services.student.core_service.update_one_lean', new_callable=AsyncMock)
 @patch('app.server.routes.student.JWTAuthUser.__call__', new_callable=Mock)
-async def test_student_update_success(mock_jwt_auth_user, mock_update_one, mock_read_one):
+async def test_student_update_success(mock_jwt_auth_user, mock_update_one_lean, mock_read_one):
     mock_jwt_auth_user.side_effect = [{'user_id': 'user123', 'user_type': Role.STUDENT}]
 
     mock_read_one.side_effect = [{'_id': 'user123', 'email': 'test@example.com', 'first_name': 'John', 'last_name': 'Doe'}]
@@ -374,7 +399,8 @@ async def test_student_update_success(mock_jwt_auth_user, mock_update_one, mock_
 
     mock_read_one.assert_any_call(Collections.USERS, data_filter=read_one_payload)
 
-    mock_update_one.assert_any_call(Collections.USERS, data_filter={'_id': 'user123'}, update={'$set': request_payload}, upsert=True)
+    mock_update_one_lean.assert_any_call(Collections.USERS, data_filter={'_id': 'user123'}, update={'$set': request_payload}, upsert=True)
+    mock_update_one_lean.assert_any_call(Collections.AUTH_INVALIDATIONS, data_filter={'user_id': 'user123'}, update={'$inc': {'version': 1}, '$set': {'invalidated_at': ANY}}, upsert=True)
 
 
 @pytest.mark.asyncio
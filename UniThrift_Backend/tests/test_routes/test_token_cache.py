@@ -0,0 +1,72 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError
+
+from app.server.static.enums import TokenType
+from app.server.utils import token_util
+from app.server.utils.cache_utils import TTLCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = time.monotonic()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def get_scope(token: str) -> dict:
+    return {'type': 'http', 'headers': [(b'authorization', f'Bearer {token}'.encode())]}
+
+
+@pytest.fixture
+def verified_tokens():
+    with patch.object(token_util, '_verified_tokens', TTLCache(maxsize=100, ttl=300)) as verified_tokens:
+        yield verified_tokens
+
+
+def test_request_claims_decoded_once_per_request_and_ttl(verified_tokens):
+    token, _ = token_util.create_jwt_token({'user_id': 'user123', 'user_type': 'student'}, timedelta(days=1), token_type=TokenType.BEARER)
+    clock = Clock()
+
+    with patch('app.server.utils.token_util.jwt.decode', wraps=jwt.decode) as mock_decode, patch('app.server.utils.cache_utils.time.monotonic', clock):
+        scope = get_scope(token)
+        claims = token_util.get_request_claims(scope)
+        assert token_util.get_request_claims(scope) is claims
+        assert claims['user_id'] == 'user123'
+        assert mock_decode.call_count == 1
+
+        # a later request with the same token is served from the verified token cache
+        assert token_util.get_request_claims(get_scope(token))['user_id'] == 'user123'
+        assert mock_decode.call_count == 1
+
+        clock.now += 301
+        assert token_util.get_request_claims(get_scope(token))['user_id'] == 'user123'
+        assert mock_decode.call_count == 2
+
+
+def test_request_claims_of_invalid_token_are_none(verified_tokens):
+    assert token_util.get_request_claims(get_scope('not-a-jwt')) is None
+    assert token_util.get_request_claims({'type': 'http', 'headers': []}) is None
+
+
+def test_expired_token_not_served_from_cache(verified_tokens):
+    token, _ = token_util.create_jwt_token({'user_id': 'user123', 'user_type': 'student'}, timedelta(seconds=10), token_type=TokenType.BEARER)
+    clock = Clock()
+
+    with patch('app.server.utils.token_util.jwt.decode', wraps=jwt.decode) as mock_decode, patch('app.server.utils.cache_utils.time.monotonic', clock):
+        assert token_util.verify_jwt_token(token)['user_id'] == 'user123'
+        clock.now += 5
+        assert token_util.verify_jwt_token(token)['user_id'] == 'user123'
+        assert mock_decode.call_count == 1
+
+        # past its exp the token is decoded again, well before the cache ttl, and rejected
+        clock.now += 6
+        mock_decode.side_effect = ExpiredSignatureError('Signature has expired.')
+        with pytest.raises(ExpiredSignatureError):
+            token_util.verify_jwt_token(token)
+        assert mock_decode.call_count == 2
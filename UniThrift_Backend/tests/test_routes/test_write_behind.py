@@ -0,0 +1,140 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from pymongo.errors import AutoReconnect
+
+from app.server.database.write_behind import CounterBuffer, PresenceBuffer, WriteBehindBuffer
+from app.server.middlewares import tracker
+from app.server.middlewares.tracker import RequestsTrackerMiddleware
+from app.server.static.collections import Collections
+from app.server.utils import token_util
+
+
+def get_counts(operations) -> dict:
+    return {tuple(operation._filter.values()): operation._doc['$inc']['count'] for operation in operations}
+
+
+@pytest.mark.asyncio
+@patch('app.server.database.write_behind.core_service.bulk_write', new_callable=AsyncMock)
+async def test_counter_buffer_merges_increments_in_one_bulk_write(mock_bulk_write):
+    counters = CounterBuffer(Collections.REQUEST_TRACKER, ('user_id', 'ip', 'path'), flush_interval=60, max_size=100)
+    for _ in range(3):
+        counters.increment('user1', '10.0.0.1', 'GET:/a')
+    counters.increment('user2', '10.0.0.2', 'GET:/a', amount=2)
+
+    assert await counters.flush() == 2
+
+    mock_bulk_write.assert_called_once()
+    collection_name, operations = mock_bulk_write.call_args.args
+    assert collection_name == Collections.REQUEST_TRACKER
+    assert mock_bulk_write.call_args.kwargs == {'ordered': False}
+    assert get_counts(operations) == {('user1', '10.0.0.1', 'GET:/a'): 3, ('user2', '10.0.0.2', 'GET:/a'): 2}
+    assert all(operation._upsert for operation in operations)
+    assert counters.stats() == {'pending': 0, 'flushed': 2, 'dropped': 0}
+
+    # nothing pending, nothing written
+    assert await counters.flush() == 0
+    mock_bulk_write.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch('app.server.database.write_behind.core_service.bulk_write', new_callable=AsyncMock)
+async def test_counter_buffer_flushes_on_stop(mock_bulk_write):
+    counters = CounterBuffer(Collections.REQUEST_TRACKER, ('user_id', 'ip', 'path'), flush_interval=60, max_size=100)
+    counters.start()
+    counters.increment('user1', '10.0.0.1', 'GET:/a')
+
+    await counters.stop()
+
+    mock_bulk_write.assert_called_once()
+    assert get_counts(mock_bulk_write.call_args.args[1]) == {('user1', '10.0.0.1', 'GET:/a'): 1}
+
+
+@pytest.mark.asyncio
+@patch('app.server.database.write_behind.logger.error', new_callable=Mock)
+@patch('app.server.database.write_behind.core_service.bulk_write', new_callable=AsyncMock)
+async def test_counter_buffer_failed_flush_is_logged_and_counted(mock_bulk_write, mock_logger_error):
+    mock_bulk_write.side_effect = [AutoReconnect('connection reset')]
+    counters = CounterBuffer(Collections.REQUEST_TRACKER, ('user_id', 'ip', 'path'), flush_interval=60, max_size=100)
+    counters.increment('user1', '10.0.0.1', 'GET:/a')
+    counters.increment('user2', '10.0.0.2', 'GET:/a')
+
+    assert await counters.flush() == 0
+
+    mock_logger_error.assert_called_once()
+    assert counters.stats() == {'pending': 0, 'flushed': 0, 'dropped': 2}
+
+
+@pytest.mark.asyncio
+@patch('app.server.database.write_behind.core_service.bulk_write', new_callable=AsyncMock)
+async def test_counter_buffer_flushes_early_when_full(mock_bulk_write):
+    counters = CounterBuffer(Collections.REQUEST_TRACKER, ('user_id', 'ip', 'path'), flush_interval=60, max_size=2)
+    counters.increment('user1', '10.0.0.1', 'GET:/a')
+    counters.increment('user2', '10.0.0.1', 'GET:/a')
+    # a third key does not fit, the two pending ones are flushed to make room
+    counters.increment('user3', '10.0.0.1', 'GET:/a')
+    await counters.flush()
+
+    assert [get_counts(call.args[1]) for call in mock_bulk_write.call_args_list] == [{('user1', '10.0.0.1', 'GET:/a'): 1, ('user2', '10.0.0.1', 'GET:/a'): 1}, {('user3', '10.0.0.1', 'GET:/a'): 1}]
+
+
+@pytest.mark.asyncio
+@patch('app.server.database.write_behind.core_service.bulk_write', new_callable=AsyncMock)
+async def test_tracker_middleware_counts_requests_per_key(mock_bulk_write):
+    app = FastAPI()
+
+    @app.get('/ping')
+    async def ping():
+        return {'status': 'SUCCESS'}
+
+    app.add_middleware(RequestsTrackerMiddleware, sample_rate=0)
+    counters = CounterBuffer(Collections.REQUEST_TRACKER, ('user_id', 'ip', 'path'), flush_interval=60, max_size=100)
+    with patch.object(tracker, 'request_counters', counters):
+        async with AsyncClient(app=app, base_url='http://testserver') as client:
+            for _ in range(3):
+                await client.get('/ping', headers={'X-Forwarded-For': '10.0.0.1'})
+        await counters.flush()
+
+    mock_bulk_write.assert_called_once()
+    assert get_counts(mock_bulk_write.call_args.args[1]) == {('', '10.0.0.1', 'GET:/ping'): 3}
+
+
+@pytest.mark.asyncio
+@patch('app.server.database.write_behind.time.monotonic')
+@patch('app.server.database.write_behind.core_service.bulk_write', new_callable=AsyncMock)
+async def test_presence_buffer_writes_once_per_user_and_window(mock_bulk_write, mock_monotonic):
+    mock_monotonic.return_value = 1000.0
+    presence = PresenceBuffer(Collections.USERS, window=60, flush_interval=5, max_size=100)
+    with patch.object(token_util, 'presence_updates', presence):
+        for timestamp in (1000, 3000, 2000):
+            presence.touch('user1', 'last_active', timestamp)
+        token_util.update_last_active('user2')
+        await presence.flush()
+
+        mock_bulk_write.assert_called_once()
+        operations = {operation._filter['_id']: operation._doc['$set'] for operation in mock_bulk_write.call_args.args[1]}
+        # the latest timestamp of the window is written, once per user
+        assert operations['user1']['last_active'] == 3000
+        assert set(operations) == {'user1', 'user2'}
+
+        # requests of the same users within the window of the last write are skipped
+        mock_monotonic.return_value = 1030.0
+        for _ in range(5):
+            token_util.update_last_active('user1')
+        await presence.flush()
+        mock_bulk_write.assert_called_once()
+        assert presence.stats()['debounced'] == 5
+
+        # once the window has passed the next request is written again
+        mock_monotonic.return_value = 1061.0
+        token_util.update_last_active('user1')
+        await presence.flush()
+        assert mock_bulk_write.call_count == 2
+        assert [operation._filter for operation in mock_bulk_write.call_args.args[1]] == [{'_id': 'user1'}]
+
+
+def test_write_behind_buffer_is_abstract():
+    with pytest.raises(TypeError):
+        WriteBehindBuffer(Collections.REQUEST_TRACKER, flush_interval=60, max_size=100)  # pylint: disable=abstract-class-instantiated